@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Nexus下载性能对比
+对同一个资产分别使用单流下载和并行Range分块下载，比较耗时和吞吐量
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from refs.nexus_req import NexusReq
+
+
+def file_sha1(file_path):
+    """计算文件SHA1"""
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def run_once(download, url, save_path):
+    """执行一次下载并返回耗时"""
+    if os.path.exists(save_path):
+        os.remove(save_path)
+    start = time.perf_counter()
+    result = download(url, save_path)
+    elapsed = time.perf_counter() - start
+    if not result:
+        raise RuntimeError(f'下载失败: {url}')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nexus下载性能对比 (单流 vs 并行分块)")
+    parser.add_argument('target', help='资产ID或完整下载URL')
+    parser.add_argument('--account', '-a', default='admin', help='使用的账户名 (默认: admin)')
+    parser.add_argument('--rounds', type=int, default=3, help='每种方式下载次数 (默认: 3)')
+    parser.add_argument('--parallel', type=int, default=8, help='并行分块数 (默认: 8)')
+    parser.add_argument('--chunk-size', type=int, default=8, help='分块大小, 单位MB (默认: 8)')
+    args = parser.parse_args()
+
+    nexus = NexusReq(default_account=args.account)
+    downloader = nexus.downloader
+    downloader.max_parallel = args.parallel
+    downloader.chunk_size = args.chunk_size * 1024 * 1024
+    downloader.min_parallel_size = 0
+
+    url = args.target
+    if not url.startswith('http'):
+        asset_info = nexus.get_asset(url)
+        if not asset_info:
+            print(f"❌ 获取资产信息失败: {url}")
+            return 1
+        url = asset_info['downloadUrl']
+
+    size, accept_ranges = downloader.probe(url)
+    print(f"下载地址: {url}")
+    print(f"文件大小: {size} bytes, Accept-Ranges: {'是' if accept_ranges else '否'}")
+    if not accept_ranges:
+        print("⚠️  服务端未声明支持Range，并行下载将退化为单流")
+
+    work_dir = tempfile.mkdtemp(prefix='nexus_bench_')
+    stream_path = os.path.join(work_dir, 'stream.bin')
+    ranged_path = os.path.join(work_dir, 'ranged.bin')
+
+    stream_times = []
+    ranged_times = []
+    for i in range(args.rounds):
+        stream_times.append(run_once(downloader.download_stream, url, stream_path))
+        ranged_times.append(run_once(downloader.download, url, ranged_path))
+        print(f"  第{i + 1}轮: 单流 {stream_times[-1]:.2f}s, 并行 {ranged_times[-1]:.2f}s")
+
+    if file_sha1(stream_path) != file_sha1(ranged_path):
+        print("❌ 两种方式下载的文件内容不一致")
+        return 1
+
+    size = os.path.getsize(ranged_path)
+    best_stream = min(stream_times)
+    best_ranged = min(ranged_times)
+    print(f"\n单流下载: 最佳 {best_stream:.2f}s ({size / best_stream / 1024 / 1024:.1f} MB/s)")
+    print(f"并行下载: 最佳 {best_ranged:.2f}s ({size / best_ranged / 1024 / 1024:.1f} MB/s), "
+          f"并行数 {args.parallel}, 分块 {args.chunk_size}MB")
+    print(f"加速比: {best_stream / best_ranged:.2f}x")
+
+    for path in (stream_path, ranged_path):
+        os.remove(path)
+    os.rmdir(work_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
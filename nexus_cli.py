@@ -15,37 +15,58 @@ from pathlib import Path
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from refs.nexus_req import NexusReq
+from refs.nexus_req import NexusReq, IncompleteListingError
 
 
 def list_components_cmd(args):
     """列出组件命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
     print(f"正在列出仓库 '{args.repository}' 中的组件...")
-    components = nexus.list_components(args.repository)
     
-    if not components:
-        print("❌ 获取组件列表失败")
+    # 流式遍历分页结果；未指定输出文件时显示够limit条即停止
+    output_file = open(args.output, 'w', encoding='utf-8') if args.output else None
+    count = 0
+    try:
+        if output_file:
+            output_file.write('{"items": [\n')
+        
+        for comp in nexus.iter_components(args.repository):
+            count += 1
+            if count <= args.limit:
+                group = comp.get('group', '')
+                name = comp.get('name', '')
+                version = comp.get('version', '')
+                asset_count = len(comp.get('assets', []))
+                
+                print(f"  {count:3d}. {group}.{name}:{version} ({asset_count} assets)")
+                if args.verbose:
+                    print(f"       ID: {comp.get('id', '')}")
+                    print(f"       Format: {comp.get('format', '')}")
+            
+            if output_file:
+                if count > 1:
+                    output_file.write(',\n')
+                output_file.write(json.dumps(comp, indent=2, ensure_ascii=False))
+            elif count >= args.limit:
+                break
+        
+        if output_file:
+            output_file.write('\n]}\n')
+    except IncompleteListingError as e:
+        print(f"❌ {e}")
         return False
+    finally:
+        if output_file:
+            output_file.close()
     
-    items = components.get('items', [])
-    print(f"✅ 找到 {len(items)} 个组件:")
+    if count == 0:
+        print("❌ 未获取到组件")
+        return False
     
-    for i, comp in enumerate(items[:args.limit], 1):
-        group = comp.get('group', '')
-        name = comp.get('name', '')
-        version = comp.get('version', '')
-        asset_count = len(comp.get('assets', []))
-        
-        print(f"  {i:3d}. {group}.{name}:{version} ({asset_count} assets)")
-        if args.verbose:
-            print(f"       ID: {comp.get('id', '')}")
-            print(f"       Format: {comp.get('format', '')}")
+    print(f"✅ 共列出 {count} 个组件")
     
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(components, f, indent=2, ensure_ascii=False)
         print(f"📁 详细信息已保存到: {args.output}")
     
     return True
@@ -53,7 +74,7 @@ def list_components_cmd(args):
 
 def search_components_cmd(args):
     """搜索组件命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
     print(f"正在搜索组件...")
     print(f"  仓库: {args.repository}")
@@ -68,7 +89,8 @@ def search_components_cmd(args):
         repository=args.repository,
         group=args.group,
         name=args.name,
-        version=args.version
+        version=args.version,
+        use_index=args.use_index
     )
     
     if not result:
@@ -94,7 +116,11 @@ def search_components_cmd(args):
 
 def download_cmd(args):
     """下载命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db, cache_dir=args.cache_dir)
+    if args.parallel:
+        nexus.downloader.max_parallel = args.parallel
+    if args.chunk_size:
+        nexus.downloader.chunk_size = args.chunk_size * 1024 * 1024
     
     if args.latest:
         print(f"正在下载最新版本...")
@@ -135,6 +161,11 @@ def download_cmd(args):
     else:
         print("❌ 下载失败")
     
+    cache_stats = nexus.get_cache_stats()
+    if cache_stats and args.verbose:
+        print(f"  缓存命中: {cache_stats['hits']}, 未命中: {cache_stats['misses']}, "
+              f"占用: {cache_stats['size']} bytes")
+    
     return bool(result)
 
 
@@ -175,10 +206,13 @@ def upload_maven_cmd(args):
         sources_file=args.sources,
         javadoc_file=args.javadoc,
         generate_pom=args.generate_pom,
-        packaging=args.packaging
+        packaging=args.packaging,
+        skip_unchanged=args.skip_unchanged
     )
     
-    if result:
+    if result == 'unchanged':
+        print("⏭️  内容未变化，已跳过上传")
+    elif result:
         print("✅ 上传成功")
         if enable_email:
             print(f"📧 邮件通知已发送给: {', '.join(recipients)}")
@@ -217,10 +251,13 @@ def upload_raw_cmd(args):
     result = nexus.upload_raw_component(
         repository=args.repository,
         directory=args.directory,
-        local_files=args.files
+        local_files=args.files,
+        skip_unchanged=args.skip_unchanged
     )
     
-    if result:
+    if result == 'unchanged':
+        print("⏭️  内容未变化，已跳过上传")
+    elif result:
         print("✅ 上传成功")
         if enable_email:
             print(f"📧 邮件通知已发送给: {', '.join(recipients)}")
@@ -230,9 +267,60 @@ def upload_raw_cmd(args):
     return bool(result)
 
 
+def upload_tree_cmd(args):
+    """上传目录树到Raw仓库命令"""
+    enable_email = bool(args.email_recipients)
+    recipients = args.email_recipients.split(',') if args.email_recipients else []
+    
+    nexus = NexusReq(
+        default_account=args.account,
+        enable_email_notification=enable_email,
+        notification_recipients=recipients
+    )
+    
+    if not os.path.isdir(args.local_dir):
+        print(f"❌ 目录不存在: {args.local_dir}")
+        return False
+    
+    print(f"正在上传目录 {args.local_dir} -> {args.repository}/{args.remote_dir or ''}")
+    
+    def show_progress(done, total):
+        print(f"\r  进度: {done}/{total}", end='', flush=True)
+    
+    stats = nexus.upload_tree(
+        args.repository,
+        args.local_dir,
+        remote_dir=args.remote_dir,
+        max_workers=args.workers,
+        skip_unchanged=not args.no_skip,
+        dry_run=args.dry_run,
+        batch_bytes=args.batch_size * 1024 * 1024 if args.batch_size else None,
+        progress_callback=show_progress,
+        verify=args.verify
+    )
+    if stats and stats['batches'] and not stats['dry_run']:
+        print()
+    if not stats:
+        print("❌ 上传失败")
+        return False
+    
+    action = "需要上传" if stats['dry_run'] else "上传"
+    print(f"  文件 {stats['files']}, 跳过 {stats['skipped']}, {action} {stats['uploaded']} "
+          f"({stats['bytes']} bytes, {stats['batches']} 个批次), 耗时 {stats['elapsed']}s")
+    if stats.get('missing'):
+        print(f"  清单中有 {stats['missing']} 个文件在仓库中缺失或不一致，需要重新上传")
+    if stats['failed']:
+        print(f"❌ {stats['failed']} 个文件上传失败 (再次执行将只上传未成功的文件):")
+        for path in stats['failures'][:20]:
+            print(f"  - {path}")
+        return False
+    print("✅ 上传完成")
+    return True
+
+
 def delete_component_cmd(args):
     """删除组件命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
     if not args.force:
         confirm = input(f"确定要删除组件 '{args.component_id}' 吗? (y/N): ")
@@ -282,7 +370,9 @@ def upload_sast_cmd(args):
         repository=args.repository,
         scan_date=args.scan_date,
         additional_info=additional_info if additional_info else None,
-        create_zip=not args.no_zip
+        create_zip=not args.no_zip,
+        compression=args.compression,
+        compress_level=args.compress_level
     )
     
     if result:
@@ -297,7 +387,7 @@ def upload_sast_cmd(args):
 
 def list_sast_cmd(args):
     """列出SAST报告命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
     print(f"正在列出SAST报告...")
     if args.project:
@@ -308,9 +398,13 @@ def list_sast_cmd(args):
     reports = nexus.list_sast_reports(
         project_name=args.project,
         sast_category=args.category,
-        repository=args.repository
+        repository=args.repository,
+        use_index=args.use_index
     )
     
+    if reports is False:
+        print("❌ 列出SAST报告失败")
+        return False
     if not reports:
         print("❌ 未找到SAST报告")
         return False
@@ -335,7 +429,7 @@ def list_sast_cmd(args):
 
 def download_sast_cmd(args):
     """下载SAST报告命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
     print(f"正在下载SAST报告...")
     print(f"  项目: {args.project}")
@@ -348,7 +442,8 @@ def download_sast_cmd(args):
         scan_date=args.scan_date,
         filename=args.filename,
         repository=args.repository,
-        download_dir=args.output
+        download_dir=args.output,
+        max_workers=args.workers
     )
     
     if result:
@@ -365,6 +460,36 @@ def download_sast_cmd(args):
     return bool(result)
 
 
+def download_sast_day_cmd(args):
+    """并行下载某一天的SAST报告命令"""
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
+    
+    projects = args.projects.split(',') if args.projects else None
+    print(f"正在下载 {args.scan_date} 的SAST报告...")
+    print(f"  项目: {', '.join(projects) if projects else '全部'}")
+    if args.category:
+        print(f"  工具类型: {args.category}")
+    
+    results = nexus.download_sast_reports(
+        args.scan_date,
+        project_names=projects,
+        sast_category=args.category,
+        repository=args.repository,
+        download_dir=args.output,
+        max_workers=args.workers
+    )
+    if results is False:
+        print("❌ 下载失败")
+        return False
+    
+    failed = [path for path, result in results.items() if not result]
+    print(f"{'❌' if failed else '✅'} 成功下载 {len(results) - len(failed)}/{len(results)} 个文件")
+    if args.verbose or failed:
+        for path, result in sorted(results.items()):
+            print(f"  {'📄' if result else '❌'} {path}")
+    return not failed
+
+
 def batch_upload_sast_cmd(args):
     """批量上传SAST报告命令"""
     if not os.path.exists(args.config):
@@ -387,7 +512,23 @@ def batch_upload_sast_cmd(args):
         
         print(f"正在批量上传 {len(sast_configs)} 个SAST报告...")
         
-        results = nexus.batch_upload_sast_reports(sast_configs)
+        def show_progress(item, done, total):
+            if item.get('skipped'):
+                print(f"  [{done}/{total}] ⏭️ {item['key']} (已上传，跳过)", flush=True)
+                return
+            status = '✅' if item['success'] else '❌'
+            error = f" {item['error']}" if item['error'] else ''
+            print(f"  [{done}/{total}] {status} {item['key']} {item['bytes']} bytes {item['elapsed']}s{error}",
+                  flush=True)
+        
+        results = nexus.batch_upload_sast_reports(
+            sast_configs,
+            max_workers=args.workers,
+            item_timeout=args.timeout,
+            zip_workers=args.zip_workers,
+            progress_callback=show_progress,
+            job_id=args.job_id
+        )
         success_count = sum(1 for r in results if r)
         
         print(f"✅ 批量上传完成: {success_count}/{len(results)} 成功")
@@ -404,39 +545,195 @@ def batch_upload_sast_cmd(args):
 
 def cleanup_versions_cmd(args):
     """清理版本命令"""
-    nexus = NexusReq(default_account=args.account)
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
     
-    print(f"正在清理旧版本...")
+    print(f"正在{'预演' if args.dry_run else ''}清理旧版本...")
     print(f"  仓库: {args.repository}")
-    print(f"  组: {args.group}")
-    print(f"  名称: {args.name}")
+    print(f"  组: {args.group or '(全部)'}")
+    print(f"  名称: {args.name or '(全部)'}")
     print(f"  保留版本数: {args.keep}")
+    if args.keep_days is not None:
+        print(f"  保留最近天数: {args.keep_days}")
+    if args.keep_pattern:
+        print(f"  保留匹配版本: {args.keep_pattern}")
     
-    if not args.force:
+    if not args.force and not args.dry_run and not args.plan:
         confirm = input("确定要清理旧版本吗? 此操作不可撤销! (y/N): ")
         if confirm.lower() != 'y':
             print("❌ 操作已取消")
             return False
     
-    result = nexus.cleanup_old_versions(
+    summary = nexus.apply_retention(
         repository=args.repository,
         group=args.group,
         name=args.name,
-        keep_latest_count=args.keep
+        keep_latest=args.keep,
+        keep_days=args.keep_days,
+        keep_pattern=args.keep_pattern,
+        dry_run=args.dry_run,
+        use_index=args.use_index,
+        max_workers=args.workers,
+        plan_path=args.plan
     )
     
-    if result:
-        print("✅ 清理完成")
-    else:
+    if not summary:
         print("❌ 清理失败")
+        return False
     
-    return bool(result)
+    print(f"  扫描坐标: {summary['coordinates']}, 组件: {summary['components']}, "
+          f"待删除: {summary['to_delete']} ({summary['bytes']} bytes)")
+    
+    if args.plan:
+        print(f"✅ 删除计划已写入: {summary['plan']['path']}")
+        print(f"  执行计划: python nexus_cli.py apply-plan {summary['plan']['path']}")
+        return True
+    
+    if args.dry_run:
+        for item in summary['deletions'][:args.limit]:
+            print(f"  - {item['group']}:{item['name']}:{item['version']}  ({item['id']}, {item['size']} bytes)")
+        if len(summary['deletions']) > args.limit:
+            print(f"  ... 还有 {len(summary['deletions']) - args.limit} 个")
+        print("✅ 预演完成，未删除任何组件")
+        return True
+    
+    if summary['failed']:
+        print(f"❌ 清理完成: 删除 {summary['deleted']}, 失败 {summary['failed']}")
+        return False
+    print(f"✅ 清理完成: 删除 {summary['deleted']}")
+    return True
+
+
+def apply_plan_cmd(args):
+    """执行删除计划命令"""
+    from refs.nexus_deletion_plan import DeletionPlan
+    
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
+    
+    try:
+        plan = DeletionPlan.load(args.plan)
+    except Exception as e:
+        print(f"❌ 读取删除计划失败: {e}")
+        return False
+    
+    print(f"删除计划: {args.plan}")
+    print(f"  仓库: {plan.repository}")
+    print(f"  组件数: {len(plan.items)}, 释放空间: {plan.total_bytes} bytes")
+    
+    if not args.force:
+        confirm = input("确定要执行删除计划吗? 此操作不可撤销! (y/N): ")
+        if confirm.lower() != 'y':
+            print("❌ 操作已取消")
+            return False
+    
+    result = nexus.execute_deletion_plan(args.plan, max_workers=args.workers)
+    if not result:
+        print("❌ 执行删除计划失败")
+        return False
+    
+    if result['skipped']:
+        print(f"  已从上次中断处继续，跳过 {result['skipped']} 个已删除组件")
+    if result['failed']:
+        print(f"❌ 删除 {result['deleted']}, 失败 {result['failed']} (再次执行将重试失败的组件)")
+        return False
+    print(f"✅ 删除 {result['deleted']} 个组件，释放 {result['bytes_freed']} bytes")
+    return True
+
+
+def sync_index_cmd(args):
+    """同步本地仓库索引命令"""
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
+    
+    print(f"正在同步仓库 '{args.repository}' 的本地索引...")
+    stats = nexus.sync_repository_index(args.repository, full=args.full)
+    
+    if not stats:
+        print("❌ 索引同步失败 (再次执行将从断点继续)")
+        return False
+    
+    if stats['resumed']:
+        print("  已从上次中断的断点继续")
+    print(f"✅ 同步完成: {stats['pages']} 页, 新增 {stats['added']}, 更新 {stats['updated']}, "
+          f"未变化 {stats['unchanged']}, 移除 {stats['removed']}")
+    return True
+
+
+def mirror_cmd(args):
+    """镜像仓库到本地目录命令"""
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
+    
+    print(f"正在同步仓库 '{args.repository}' 到 {args.dest} ...")
+    stats = nexus.sync_repository_to_dir(args.repository, args.dest, prune=args.prune, max_workers=args.workers,
+                                         use_index=args.use_index, dry_run=args.dry_run)
+    if not stats:
+        print("❌ 同步失败")
+        return False
+    
+    action = "需要下载" if stats['dry_run'] else "下载"
+    print(f"  资产 {stats['assets']}, 未变化 {stats['unchanged']}, {action} {stats['downloaded']} "
+          f"({stats['bytes']} bytes), 清理 {stats['pruned']}, 耗时 {stats['elapsed']}s")
+    if not stats['complete']:
+        print("❌ 资产列表获取不完整，已跳过清理 (再次执行将继续同步)")
+        return False
+    if stats['failed']:
+        print(f"❌ {stats['failed']} 个文件下载失败 (再次执行将重试):")
+        for path in stats['failures'][:20]:
+            print(f"  - {path}")
+        return False
+    print("✅ 同步完成")
+    return True
+
+
+def promote_cmd(args):
+    """批量晋级组件命令"""
+    from refs.nexus_promote import load_manifest
+    
+    nexus = NexusReq(default_account=args.account, index_db=args.index_db)
+    
+    coordinates = None
+    query = None
+    if args.manifest:
+        try:
+            coordinates = load_manifest(args.manifest)
+        except Exception as e:
+            print(f"❌ 读取清单失败: {e}")
+            return False
+        print(f"正在晋级清单中的 {len(coordinates)} 个组件: {args.source} -> {args.target}")
+    else:
+        query = {k: v for k, v in {'group': args.group, 'name': args.name,
+                                   'version': args.version, 'format_type': args.format}.items() if v}
+        if not query:
+            print("❌ 请指定 --manifest 或至少一个查询条件 (--group/--name/--version/--format)")
+            return False
+        print(f"正在晋级匹配 {query} 的组件: {args.source} -> {args.target}")
+    
+    workers = {
+        'resolve': args.resolve_workers,
+        'transfer': args.transfer_workers,
+        'verify': args.verify_workers,
+        'delete': args.delete_workers
+    }
+    summary = nexus.promote_many(args.source, args.target, coordinates=coordinates, query=query,
+                                 copy=args.copy, verify=not args.no_verify,
+                                 journal_path=args.journal, workers=workers)
+    if not summary:
+        print("❌ 晋级失败")
+        return False
+    
+    print(f"{'✅' if not summary['failed'] else '❌'} 晋级完成: 共 {summary['total']}, 成功 {summary['promoted']}, "
+          f"已完成跳过 {summary['skipped']}, 未找到 {summary['not_found']}, 失败 {summary['failed']}")
+    print(f"  传输: {summary['bytes']} bytes, 耗时: {summary['elapsed']}s")
+    for failure in summary['failures']:
+        print(f"  ❌ [{failure['stage']}] {failure['key']}: {failure['error']}")
+    if summary['failed']:
+        print(f"  进度日志: {summary['journal']} (再次执行相同命令将从断点继续)")
+    return summary['failed'] == 0
 
 
 def main():
     parser = argparse.ArgumentParser(description="Nexus Repository 命令行工具")
     parser.add_argument('--account', '-a', default='admin', help='使用的账户名 (默认: admin)')
     parser.add_argument('--verbose', '-v', action='store_true', help='详细输出')
+    parser.add_argument('--index-db', help='本地仓库索引数据库路径 (默认: ~/.nexus_tool/index.db)')
     
     subparsers = parser.add_subparsers(dest='command', help='可用命令')
     
@@ -453,6 +750,7 @@ def main():
     search_parser.add_argument('--name', '-n', help='组件名称')
     search_parser.add_argument('--version', help='版本')
     search_parser.add_argument('--limit', '-l', type=int, default=20, help='显示数量限制 (默认: 20)')
+    search_parser.add_argument('--use-index', action='store_true', help='从本地索引查询')
     
     # 下载命令
     download_parser = subparsers.add_parser('download', help='下载组件')
@@ -464,6 +762,9 @@ def main():
     download_parser.add_argument('--classifier', help='分类器 (如: sources, javadoc)')
     download_parser.add_argument('--output', '-o', help='保存文件路径')
     download_parser.add_argument('--latest', action='store_true', help='下载最新版本')
+    download_parser.add_argument('--parallel', type=int, help='单文件并行分块数 (默认取配置)')
+    download_parser.add_argument('--chunk-size', type=int, help='并行分块大小, 单位MB (默认取配置)')
+    download_parser.add_argument('--cache-dir', help='本地构件缓存目录 (指定后启用缓存)')
     
     # 上传Maven组件命令
     upload_maven_parser = subparsers.add_parser('upload-maven', help='上传Maven组件')
@@ -484,6 +785,19 @@ def main():
     upload_raw_parser.add_argument('directory', help='目标目录路径')
     upload_raw_parser.add_argument('files', nargs='+', help='要上传的文件列表')
     
+    # 上传目录树命令
+    upload_tree_parser = subparsers.add_parser('upload-tree', help='上传本地目录树到Raw仓库(保留相对路径)')
+    upload_tree_parser.add_argument('repository', help='仓库名称')
+    upload_tree_parser.add_argument('local_dir', help='本地目录')
+    upload_tree_parser.add_argument('--remote-dir', default='', help='仓库内的目标目录 (默认: 仓库根目录)')
+    upload_tree_parser.add_argument('--workers', type=int, help='并行上传的批次数')
+    upload_tree_parser.add_argument('--batch-size', type=int, help='单个批次的大小上限(MB)')
+    upload_tree_parser.add_argument('--no-skip', action='store_true', help='不跳过未变化的文件(忽略上传清单)')
+    upload_tree_parser.add_argument('--verify', action='store_true',
+                                    help='跳过前HEAD确认清单中的文件仍在仓库中，缺失或不一致的重新上传')
+    upload_tree_parser.add_argument('--dry-run', action='store_true', help='只统计需要上传的文件')
+    upload_tree_parser.add_argument('--email-recipients', help='邮件通知收件人列表 (逗号分隔)')
+    
     # 删除组件命令
     delete_parser = subparsers.add_parser('delete', help='删除组件')
     delete_parser.add_argument('component_id', help='组件ID')
@@ -492,10 +806,23 @@ def main():
     # 清理版本命令
     cleanup_parser = subparsers.add_parser('cleanup', help='清理旧版本')
     cleanup_parser.add_argument('repository', help='仓库名称')
-    cleanup_parser.add_argument('group', help='组ID')
-    cleanup_parser.add_argument('name', help='组件名称')
-    cleanup_parser.add_argument('--keep', type=int, default=5, help='保留版本数 (默认: 5)')
+    cleanup_parser.add_argument('group', nargs='?', help='组ID (不指定时处理整个仓库)')
+    cleanup_parser.add_argument('name', nargs='?', help='组件名称 (不指定时处理整个仓库)')
+    cleanup_parser.add_argument('--keep', type=int, default=5, help='每个组件保留的最新版本数 (默认: 5)')
+    cleanup_parser.add_argument('--keep-days', type=int, help='保留最近N天内修改过的版本')
+    cleanup_parser.add_argument('--keep-pattern', help='保留版本号匹配该正则的版本')
+    cleanup_parser.add_argument('--dry-run', action='store_true', help='只列出将被删除的版本，不执行删除')
+    cleanup_parser.add_argument('--workers', type=int, help='并发删除数')
+    cleanup_parser.add_argument('--limit', type=int, default=100, help='预演时显示的数量 (默认: 100)')
+    cleanup_parser.add_argument('--plan', help='只生成删除计划文件，稍后用 apply-plan 执行')
     cleanup_parser.add_argument('--force', action='store_true', help='强制清理，不询问确认')
+    cleanup_parser.add_argument('--use-index', action='store_true', help='从本地索引查询版本')
+    
+    # 执行删除计划命令
+    apply_plan_parser = subparsers.add_parser('apply-plan', help='执行删除计划')
+    apply_plan_parser.add_argument('plan', help='删除计划文件 (cleanup --plan 生成)')
+    apply_plan_parser.add_argument('--workers', type=int, help='并发删除数')
+    apply_plan_parser.add_argument('--force', action='store_true', help='不询问确认')
     
     # SAST报告上传命令
     upload_sast_parser = subparsers.add_parser('upload-sast', help='上传SAST工具报告')
@@ -508,6 +835,10 @@ def main():
     upload_sast_parser.add_argument('--scan-date', help='扫描日期 (YYYY-MM-DD格式，默认当前日期)')
     upload_sast_parser.add_argument('--description', help='附加描述信息')
     upload_sast_parser.add_argument('--no-zip', action='store_true', help='多文件时不创建zip压缩包')
+    upload_sast_parser.add_argument('--compression', choices=['auto', 'deflate', 'store'],
+                                    help='zip压缩方式 (默认auto: PDF等已压缩格式直接存储)')
+    upload_sast_parser.add_argument('--compress-level', type=int, choices=range(0, 10), metavar='0-9',
+                                    help='deflate压缩级别')
     upload_sast_parser.add_argument('--email-recipients', help='邮件通知收件人列表 (逗号分隔)')
     
     # SAST报告列表命令
@@ -518,6 +849,7 @@ def main():
                                  help='SAST工具类型 (可选)')
     list_sast_parser.add_argument('--repository', help='仓库名称 (默认: sast-reports-raw)')
     list_sast_parser.add_argument('--limit', type=int, default=50, help='显示数量限制 (默认: 50)')
+    list_sast_parser.add_argument('--use-index', action='store_true', help='从本地索引查询')
     
     # SAST报告下载命令
     download_sast_parser = subparsers.add_parser('download-sast', help='下载SAST工具报告')
@@ -529,15 +861,61 @@ def main():
     download_sast_parser.add_argument('--filename', help='特定文件名 (可选，不指定则下载所有文件)')
     download_sast_parser.add_argument('--repository', help='源仓库 (默认: sast-reports-raw)')
     download_sast_parser.add_argument('--output', help='下载目录 (默认: ./sast_downloads)')
+    download_sast_parser.add_argument('--workers', type=int, help='并行下载数')
+    
+    # 下载某一天的SAST报告命令
+    download_sast_day_parser = subparsers.add_parser('download-sast-day', help='并行下载某一天所有项目的SAST报告')
+    download_sast_day_parser.add_argument('scan_date', help='扫描日期 (YYYY-MM-DD格式)')
+    download_sast_day_parser.add_argument('--projects', help='项目名称列表 (逗号分隔，默认全部项目)')
+    download_sast_day_parser.add_argument('--category', help='SAST工具类型 (可选)')
+    download_sast_day_parser.add_argument('--repository', help='源仓库 (默认: sast-reports-raw)')
+    download_sast_day_parser.add_argument('--output', help='下载目录 (默认: ./sast_downloads)')
+    download_sast_day_parser.add_argument('--workers', type=int, help='并行下载数')
     
     # 批量上传SAST报告命令
     batch_sast_parser = subparsers.add_parser('batch-upload-sast', help='批量上传SAST工具报告')
     batch_sast_parser.add_argument('config', help='批量上传配置文件 (JSON格式)')
     batch_sast_parser.add_argument('--email-recipients', help='邮件通知收件人列表 (逗号分隔)')
+    batch_sast_parser.add_argument('--workers', type=int, help='并发上传数')
+    batch_sast_parser.add_argument('--timeout', type=int, help='单个项目的超时秒数 (默认300, 0为不限制)')
+    batch_sast_parser.add_argument('--zip-workers', type=int, help='共享压缩线程数')
+    batch_sast_parser.add_argument('--job-id', help='任务ID，中断后以相同ID重新执行时跳过已上传的项目')
+    
+    # 同步本地索引命令
+    sync_parser = subparsers.add_parser('sync', help='同步仓库内容到本地索引')
+    sync_parser.add_argument('repository', help='仓库名称')
+    sync_parser.add_argument('--full', action='store_true', help='忽略断点，从头同步')
+    
+    # 镜像仓库到本地目录命令
+    mirror_parser = subparsers.add_parser('mirror', help='镜像仓库到本地目录(只下载新增或变化的文件)')
+    mirror_parser.add_argument('repository', help='仓库名称')
+    mirror_parser.add_argument('dest', help='本地目录')
+    mirror_parser.add_argument('--prune', action='store_true', help='删除上游已不存在的本地文件')
+    mirror_parser.add_argument('--workers', type=int, help='并发下载数')
+    mirror_parser.add_argument('--use-index', action='store_true', help='从已同步的本地索引读取资产列表')
+    mirror_parser.add_argument('--dry-run', action='store_true', help='只统计需要下载和清理的文件')
+    
+    # 批量晋级命令
+    promote_parser = subparsers.add_parser('promote', help='批量晋级组件到目标仓库')
+    promote_parser.add_argument('source', help='源仓库')
+    promote_parser.add_argument('target', help='目标仓库')
+    promote_parser.add_argument('--manifest', help='坐标清单 (每行group:name:version，或JSON列表)')
+    promote_parser.add_argument('--group', help='按组ID查询')
+    promote_parser.add_argument('--name', help='按组件名称查询')
+    promote_parser.add_argument('--version', help='按版本查询')
+    promote_parser.add_argument('--format', help='按格式查询')
+    promote_parser.add_argument('--copy', action='store_true', help='只复制，不删除源组件')
+    promote_parser.add_argument('--no-verify', action='store_true', help='跳过目标仓库校验')
+    promote_parser.add_argument('--journal', help='进度日志路径 (默认按参数自动生成)')
+    promote_parser.add_argument('--resolve-workers', type=int, help='解析坐标的线程数')
+    promote_parser.add_argument('--transfer-workers', type=int, help='转移组件的线程数')
+    promote_parser.add_argument('--verify-workers', type=int, help='校验的线程数')
+    promote_parser.add_argument('--delete-workers', type=int, help='删除源组件的线程数')
     
     # 为所有现有命令添加邮件通知支持
     for cmd_parser in [upload_maven_parser, upload_raw_parser]:
         cmd_parser.add_argument('--email-recipients', help='邮件通知收件人列表 (逗号分隔)')
+        cmd_parser.add_argument('--skip-unchanged', action='store_true', help='仓库中已存在相同内容时跳过上传')
     
     args = parser.parse_args()
     
@@ -553,12 +931,18 @@ def main():
             'download': download_cmd,
             'upload-maven': upload_maven_cmd,
             'upload-raw': upload_raw_cmd,
+            'upload-tree': upload_tree_cmd,
             'delete': delete_component_cmd,
             'cleanup': cleanup_versions_cmd,
+            'apply-plan': apply_plan_cmd,
             'upload-sast': upload_sast_cmd,
             'list-sast': list_sast_cmd,
             'download-sast': download_sast_cmd,
-            'batch-upload-sast': batch_upload_sast_cmd
+            'download-sast-day': download_sast_day_cmd,
+            'batch-upload-sast': batch_upload_sast_cmd,
+            'sync': sync_index_cmd,
+            'mirror': mirror_cmd,
+            'promote': promote_cmd
         }
         
         if args.command in command_map:
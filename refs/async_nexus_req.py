@@ -0,0 +1,660 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import asyncio
+import functools
+import traceback
+import urllib.parse
+from loguru import logger
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.env_config import EnvConfig
+from refs.nexus_session import get_perf_config
+from refs.nexus_req import IncompleteListingError
+from refs.nexus_retry import RetryPolicy, RetryExecutor, CircuitOpenError
+from refs.nexus_governor import get_governor
+from refs.nexus_resolver import ArtifactResolver, LATEST, maven_params
+from refs.nexus_response_cache import ResponseCache, DEFAULT_RESPONSE_CACHE_CONFIG, endpoint_class
+
+
+DEFAULT_ASYNC_CONFIG = {
+    'max_concurrency': 100,
+    'block_size': 1024 * 1024,
+    'connect_timeout': 30,
+    'read_timeout': 300
+}
+
+
+class AsyncRetryPolicy(RetryPolicy):
+    """按aiohttp异常类型判断是否重试的策略"""
+
+    transient_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError) if aiohttp else (asyncio.TimeoutError,)
+    connect_errors = (aiohttp.ClientConnectorError,) if aiohttp else ()
+
+
+class AsyncRetryExecutor(RetryExecutor):
+    """与RetryExecutor共用策略、熔断器和统计，退避等待使用asyncio.sleep，不阻塞事件循环"""
+
+    policy_class = AsyncRetryPolicy
+
+    async def call(self, call_class, method, url, send):
+        """await send()发送请求，按策略重试可恢复的失败
+
+        返回最后一次的aiohttp响应；熔断时抛出CircuitOpenError，
+        不可重试或重试耗尽的异常原样抛出。
+        """
+        call_class, policy, breaker = self._begin(call_class, url)
+
+        attempt = 0
+        while True:
+            self._admit(call_class, breaker)
+
+            try:
+                res = await send()
+            except Exception as e:
+                delay = self._delay_after_exception(call_class, policy, breaker, method, e, attempt)
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            else:
+                delay = self._delay_after_status(call_class, policy, breaker, method, res.status,
+                                                 res.headers, attempt)
+                if delay is None:
+                    return res
+                reason = res.status
+                res.release()
+
+            attempt += 1
+            self._note_retry(call_class, method, url, reason, delay, attempt)
+            await asyncio.sleep(delay)
+
+
+class AsyncArtifactResolver(ArtifactResolver):
+    """ArtifactResolver的异步版本，共用TTL缓存，查询通过AsyncNexusReq发出"""
+
+    async def resolve_asset(self, asset_id):
+        """按资产ID解析，返回资产元数据或None"""
+        key = ('asset', asset_id)
+        asset = self._get(key)
+        if asset:
+            return asset
+        with self._lock:
+            self._stats['lookups'] += 1
+        asset = await self.nexus.get_asset(asset_id)
+        if not asset or not isinstance(asset, dict):
+            return None
+        self._put(key, asset, self.ttl)
+        return asset
+
+    async def resolve(self, repository, group, name, version=None, **params):
+        """按坐标解析单个资产，version为None或'latest'时取最新版本"""
+        key = self.coordinate_key(repository, group, name, version, params)
+        asset = self._get(key)
+        if asset:
+            return asset
+
+        with self._lock:
+            self._stats['lookups'] += 1
+        query = dict(params)
+        if version and version != LATEST:
+            query['version'] = version
+        else:
+            query.update({'sort': 'version', 'direction': 'desc'})
+        result = await self.nexus.search_assets(repository=repository, group=group, name=name, **query)
+        if not result or not isinstance(result, dict) or not result.get('items'):
+            return None
+
+        asset = result['items'][0]
+        self._put(key, asset, self.latest_ttl if key[3] == LATEST else self.ttl)
+        self.remember(asset)
+        return asset
+
+    async def resolve_many(self, coordinates, max_workers=None):
+        """批量解析坐标，返回与coordinates一一对应的资产元数据，未找到为None"""
+        async def resolve_one(coordinate):
+            params = {}
+            if coordinate.get('extension'):
+                params = maven_params(coordinate['extension'], coordinate.get('classifier'))
+            return await self.resolve(coordinate.get('repository'), coordinate.get('group'),
+                                      coordinate.get('name'), coordinate.get('version') or LATEST, **params)
+
+        return list(await asyncio.gather(*[resolve_one(c) for c in coordinates]))
+
+
+class AsyncNexusReq(object):
+    """基于asyncio/aiohttp的Nexus客户端，方法与NexusReq保持一致
+
+    所有请求共享一个ClientSession，并由信号量限制同时在途的请求数，
+    单个进程即可驱动数百个并发请求。请求与NexusReq一样经过按主机共享的熔断器和预算（governor），
+    按调用类别重试，可缓存的GET请求使用REST响应缓存。使用方式：
+
+        async with AsyncNexusReq(default_account='admin') as nexus:
+            async for component in nexus.iter_components('maven-releases'):
+                ...
+    """
+
+    def __init__(self, default_account='admin', default_nexus='nexus', max_concurrency=None, response_cache=None):
+        if aiohttp is None:
+            raise ImportError('AsyncNexusReq需要aiohttp，请执行: pip install aiohttp')
+
+        config = get_perf_config('async', DEFAULT_ASYNC_CONFIG)
+        self._check_succ_code = [200, 201, 204, 302]
+        self._def_account = default_account
+        self.max_concurrency = max_concurrency or config['max_concurrency']
+        self.block_size = config['block_size']
+        self.connect_timeout = config['connect_timeout']
+        self.read_timeout = config['read_timeout']
+
+        if default_nexus == 'nexus':
+            self.domain = EnvConfig.NEXUS_INFO['domain']
+            self.root_url = EnvConfig.NEXUS_INFO['root_url']
+            self.accounts = EnvConfig.NEXUS_INFO['accounts']
+
+        self._session = None
+        # 信号量属于客户端而不是会话，会话重建后并发上限仍然有效
+        self._semaphore = None
+
+        self.retry = AsyncRetryExecutor()
+        self.governor = get_governor(self.root_url)
+        self.resolver = AsyncArtifactResolver(self)
+
+        # REST响应缓存（response_cache=True或配置启用时生效，也可直接传入ResponseCache实例）
+        self.response_cache = None
+        if isinstance(response_cache, ResponseCache):
+            self.response_cache = response_cache
+        elif response_cache or (response_cache is None and
+                                get_perf_config('response_cache', DEFAULT_RESPONSE_CACHE_CONFIG)['enabled']):
+            self.response_cache = ResponseCache()
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._transfer_timeout())
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """关闭底层ClientSession"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _transfer_timeout(self):
+        """上传/下载不限总时长，只限制建立连接和两次读取之间的间隔"""
+        return aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+
+    def _auth(self, account=None):
+        account = account or self._def_account
+        return aiohttp.BasicAuth(self.accounts[account]['username'], self.accounts[account]['password'])
+
+    def _api_url(self, api_name):
+        if api_name.startswith('/service/rest'):
+            return f'{self.root_url}{api_name}'
+        return f'{self.root_url}/service/rest/v1{api_name}'
+
+    @staticmethod
+    def _call_class(api_name, method, transfer):
+        """按接口和方法判断调用类别，用于选择重试策略"""
+        if method == 'DELETE':
+            return 'delete'
+        if api_name.startswith('/search'):
+            return 'search'
+        if transfer:
+            return 'upload'
+        return 'default'
+
+    @staticmethod
+    async def _in_thread(func, *args, **kwargs):
+        """在线程池中执行同步调用（如响应缓存的SQLite读写），不阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def _exec(self, api_name, data=None, method='GET', account=None, timeout=120, return_json=True, headers=None,
+                    transfer=False, call_class=None):
+        """执行HTTP请求的核心方法
+
+        元数据请求以timeout限制总时长；transfer=True（上传）时不限总时长，只限制连接和读取间隔。
+        data可以是无参函数，每次尝试调用它生成新的请求体（表单只能发送一次，重试时需重新构造）。
+        """
+        account = account or self._def_account
+        api_url = self._api_url(api_name)
+
+        if not headers:
+            headers = {}
+            if method in ['POST', 'PUT'] and isinstance(data, (str, bytes)):
+                headers['Content-Type'] = 'application/json'
+
+        call_class = call_class or self._call_class(api_name, method, transfer)
+        budget = 'bulk' if call_class in ['upload', 'download'] else 'metadata'
+        request_timeout = self._transfer_timeout() if transfer else aiohttp.ClientTimeout(total=timeout)
+        session = await self._get_session()
+
+        async def send():
+            async with self.governor.async_slot(budget) as slot:
+                res = await session.request(method, api_url, data=data() if callable(data) else data,
+                                            auth=self._auth(account), headers=headers, allow_redirects=False,
+                                            timeout=request_timeout)
+                try:
+                    await res.read()
+                finally:
+                    res.release()
+                slot.mark(res.status)
+                return res
+
+        # 可缓存的GET请求：新鲜条目直接返回，过期条目带校验器发送条件请求
+        cache = self.response_cache
+        path, _, query = api_name.partition('?')
+        endpoint, resource = endpoint_class(path) if cache else (None, None)
+        cache_key = cached = None
+        try:
+            if cache and method == 'GET' and return_json and cache.ttl_for(endpoint):
+                cache_key = cache.make_key(account, api_url)
+                cached = await self._in_thread(cache.get, cache_key)
+                if cached and cache.is_fresh(cached):
+                    cache.hit()
+                    return json.loads(cached['body'])
+                if cached and (cached['etag'] or cached['last_modified']):
+                    headers = dict(headers)
+                    if cached['etag']:
+                        headers['If-None-Match'] = cached['etag']
+                    if cached['last_modified']:
+                        headers['If-Modified-Since'] = cached['last_modified']
+
+            async with self._semaphore:
+                logger.debug(f'nexus api: {method} | {api_url}')
+                res = await self.retry.call(call_class, method, api_url, send)
+            logger.debug(f'response code: {res.status}')
+            text = await res.text()
+
+            if res.status == 304 and cached:
+                await self._in_thread(cache.refresh, cache_key, cached)
+                cache.hit(revalidated=True)
+                return json.loads(cached['body'])
+
+            if res.status not in self._check_succ_code:
+                logger.error(f'{res.status} | {text}')
+                return False
+
+            if cache and method in ['POST', 'PUT', 'DELETE']:
+                # 写操作成功后使受影响的缓存条目失效；被删除资源的缓存体用于定位其所在仓库
+                previous = None
+                if method == 'DELETE' and resource:
+                    previous = await self._in_thread(cache.get, cache.make_key(account, self._api_url(path)))
+                await self._in_thread(cache.invalidate_for_write, path, query, previous['body'] if previous else None)
+
+            if method in ['POST', 'PUT', 'DELETE']:
+                # 上传/删除后"latest"等解析结果可能已变化
+                self.resolver.invalidate()
+
+            if res.status == 302:  # 重定向用于下载
+                return res.headers.get('Location', str(res.url))
+
+            if return_json and text:
+                try:
+                    body = json.loads(text)
+                except json.JSONDecodeError:
+                    return text
+                if cache_key and res.status == 200:
+                    cache.miss()
+                    repository = urllib.parse.parse_qs(query).get('repository', [None])[0]
+                    if isinstance(body, dict) and endpoint in ['component', 'asset']:
+                        repository = body.get('repository')
+                    await self._in_thread(cache.store, cache_key, endpoint, text, repository=repository,
+                                          resource=resource, etag=res.headers.get('ETag'),
+                                          last_modified=res.headers.get('Last-Modified'))
+                return body
+
+            return True
+        except CircuitOpenError as e:
+            logger.error(f'Request rejected: {e}')
+            return False
+        except Exception:
+            logger.error(f'Request failed: {traceback.format_exc()}')
+            return False
+
+    def _with_params(self, api_name, params):
+        return f'{api_name}?{urllib.parse.urlencode(params)}'
+
+    '''
+    ############################## Component APIs ##############################
+    '''
+
+    async def list_components(self, repository, continuation_token=None):
+        """列出仓库中的组件"""
+        params = {'repository': repository}
+        if continuation_token:
+            params['continuationToken'] = continuation_token
+        return await self._exec(self._with_params('/components', params), timeout=60)
+
+    async def get_component(self, component_id):
+        """获取单个组件的详细信息"""
+        return await self._exec(f'/components/{component_id}')
+
+    async def delete_component(self, component_id):
+        """删除组件"""
+        return await self._exec(f'/components/{component_id}', method='DELETE', return_json=False)
+
+    async def _upload_form(self, repository, fields, files):
+        """以multipart表单上传组件，文件由aiohttp按块读取发送；重试时重新打开文件构造表单"""
+        handles = []
+
+        def build_form():
+            form = aiohttp.FormData()
+            for name, value in fields.items():
+                form.add_field(name, str(value))
+            for name, file_path in files.items():
+                handle = open(file_path, 'rb')
+                handles.append(handle)
+                form.add_field(name, handle, filename=os.path.basename(file_path))
+            return form
+
+        try:
+            return await self._exec(f'/components?repository={repository}', data=build_form,
+                                    method='POST', return_json=False, transfer=True)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+        finally:
+            for handle in handles:
+                handle.close()
+
+    async def upload_maven_component(self, repository, group_id, artifact_id, version,
+                                     jar_file=None, pom_file=None, sources_file=None,
+                                     javadoc_file=None, generate_pom=False, packaging='jar'):
+        """上传Maven组件"""
+        fields = {
+            'maven2.groupId': group_id,
+            'maven2.artifactId': artifact_id,
+            'maven2.version': version,
+            'maven2.packaging': packaging,
+            'maven2.generate-pom': str(generate_pom).lower()
+        }
+        files = {}
+        asset_count = 1
+        for file_path, extension, classifier in [(jar_file, 'jar', None), (pom_file, 'pom', None),
+                                                 (sources_file, 'jar', 'sources'),
+                                                 (javadoc_file, 'jar', 'javadoc')]:
+            if not file_path:
+                continue
+            files[f'maven2.asset{asset_count}'] = file_path
+            fields[f'maven2.asset{asset_count}.extension'] = extension
+            if classifier:
+                fields[f'maven2.asset{asset_count}.classifier'] = classifier
+            asset_count += 1
+
+        result = await self._upload_form(repository, fields, files)
+        if result:
+            logger.info(f'Maven组件上传成功: {group_id}:{artifact_id}:{version}')
+        return result
+
+    async def upload_raw_component(self, repository, directory, local_files):
+        """上传Raw格式的组件"""
+        if isinstance(local_files, str):
+            local_files = [local_files]
+        fields = {'raw.directory': directory}
+        files = {}
+        for index, file_path in enumerate(local_files, 1):
+            files[f'raw.asset{index}'] = file_path
+            fields[f'raw.asset{index}.filename'] = os.path.basename(file_path)
+
+        result = await self._upload_form(repository, fields, files)
+        if result:
+            logger.info(f'Raw组件上传成功: {directory}')
+        return result
+
+    async def upload_npm_component(self, repository, npm_package_file):
+        """上传NPM包"""
+        return await self._upload_form(repository, {}, {'npm.asset': npm_package_file})
+
+    '''
+    ############################## Asset APIs ##############################
+    '''
+
+    async def list_assets(self, repository, continuation_token=None):
+        """列出仓库中的资产"""
+        params = {'repository': repository}
+        if continuation_token:
+            params['continuationToken'] = continuation_token
+        return await self._exec(self._with_params('/assets', params), timeout=60)
+
+    async def get_asset(self, asset_id):
+        """获取单个资产的详细信息"""
+        return await self._exec(f'/assets/{asset_id}')
+
+    async def delete_asset(self, asset_id):
+        """删除资产"""
+        return await self._exec(f'/assets/{asset_id}', method='DELETE', return_json=False)
+
+    async def _download_url(self, download_url, save_path, account=None):
+        """流式下载到save_path.part，完成后原子替换为save_path
+
+        文件读写在线程池中执行，不阻塞事件循环。每次尝试占用一个传输预算名额：会被重试的响应立即归还，
+        最终响应的名额保持到响应体读完。
+        """
+        session = await self._get_session()
+        loop = asyncio.get_running_loop()
+        retry_statuses = self.retry.policies['download'].retry_statuses
+        part_path = f'{save_path}.part'
+        held = []
+
+        async def send():
+            slot = self.governor.async_slot('bulk')
+            await slot.__aenter__()
+            try:
+                res = await session.get(download_url, auth=self._auth(account), timeout=self._transfer_timeout())
+            except BaseException:
+                await slot.__aexit__(None, None, None)
+                raise
+            slot.mark(res.status)
+            if res.status in retry_statuses:
+                await slot.__aexit__(None, None, None)
+            else:
+                held.append(slot)
+            return res
+
+        try:
+            async with self._semaphore:
+                res = await self.retry.call('download', 'GET', download_url, send)
+                try:
+                    if res.status != 200:
+                        logger.error(f'Download failed: {res.status}')
+                        return False
+                    f = await loop.run_in_executor(None, open, part_path, 'wb')
+                    try:
+                        async for block in res.content.iter_chunked(self.block_size):
+                            await loop.run_in_executor(None, f.write, block)
+                    finally:
+                        await loop.run_in_executor(None, f.close)
+                finally:
+                    res.release()
+                    while held:
+                        await held.pop().__aexit__(None, None, None)
+            await loop.run_in_executor(None, os.replace, part_path, save_path)
+            logger.info(f'Asset downloaded successfully: {save_path}')
+            return save_path
+        except CircuitOpenError as e:
+            logger.error(f'Request rejected: {e}')
+        except Exception:
+            logger.error(traceback.format_exc())
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return False
+
+    async def download_asset(self, asset_id, save_path=None):
+        """下载资产"""
+        return await self._download_asset(asset_id, save_path)
+
+    async def _download_asset(self, asset_id, save_path=None, download_dir=None):
+        """下载资产，未指定save_path时按资产路径的文件名保存到download_dir（默认当前目录）"""
+        asset_info = await self.resolver.resolve_asset(asset_id)
+        if not asset_info:
+            return False
+
+        download_url = asset_info.get('downloadUrl')
+        if not download_url:
+            logger.error('Asset download URL not found')
+            return False
+
+        if not save_path:
+            save_path = os.path.join(download_dir or '', os.path.basename(asset_info.get('path', f'asset_{asset_id}')))
+        return await self._download_url(download_url, save_path)
+
+    '''
+    ############################## Search APIs ##############################
+    '''
+
+    def _search_params(self, repository, group, name, version, format_type, continuation_token, kwargs):
+        params = {}
+        for key, value in (('repository', repository), ('group', group), ('name', name),
+                           ('version', version), ('format', format_type),
+                           ('continuationToken', continuation_token)):
+            if value:
+                params[key] = value
+        params.update(kwargs)
+        return params
+
+    async def search_components(self, repository=None, group=None, name=None, version=None,
+                                format_type=None, continuation_token=None, **kwargs):
+        """搜索组件"""
+        params = self._search_params(repository, group, name, version, format_type, continuation_token, kwargs)
+        return await self._exec(self._with_params('/search', params), timeout=60)
+
+    async def search_assets(self, repository=None, group=None, name=None, version=None,
+                            format_type=None, continuation_token=None, **kwargs):
+        """搜索资产"""
+        params = self._search_params(repository, group, name, version, format_type, continuation_token, kwargs)
+        return await self._exec(self._with_params('/search/assets', params), timeout=60)
+
+    async def search_and_download_asset(self, save_path=None, repository=None, group=None,
+                                        name=None, version=None, **kwargs):
+        """搜索并下载资产
+
+        通过解析层得到资产元数据后直接下载downloadUrl；未指定version时下载最新版本。
+        """
+        # 排序由解析层处理
+        kwargs.pop('sort', None)
+        kwargs.pop('direction', None)
+
+        asset_info = await self.resolver.resolve(repository, group, name, version, **kwargs)
+        if not asset_info:
+            logger.error(f'Asset not found: {group}:{name}:{version or LATEST}')
+            return False
+        if not save_path:
+            save_path = os.path.basename(asset_info.get('path', f'{name}-{version or LATEST}'))
+        return await self._download_url(asset_info['downloadUrl'], save_path)
+
+    async def download_latest_version(self, repository, group, name, extension='jar',
+                                      classifier=None, save_path=None):
+        """下载最新版本的资产（最新版本的解析结果按latest_ttl短期缓存）"""
+        return await self.search_and_download_asset(save_path, repository=repository, group=group, name=name,
+                                                    version=LATEST, **maven_params(extension, classifier))
+
+    '''
+    ############################## Iteration ##############################
+    '''
+
+    async def _iter_pages(self, fetch_page, prefetch=True):
+        """按continuationToken逐页产出条目，处理当前页时预取下一页
+
+        某一页获取失败时抛出IncompleteListingError，不会静默截断
+        """
+        next_page = None
+        yielded = 0
+        try:
+            continuation_token = None
+            result = await fetch_page(None)
+            while True:
+                if not result:
+                    logger.error(f'Failed to fetch page: {continuation_token}')
+                    raise IncompleteListingError(continuation_token, yielded)
+                continuation_token = result.get('continuationToken')
+                if continuation_token and prefetch:
+                    next_page = asyncio.ensure_future(fetch_page(continuation_token))
+
+                for item in result.get('items', []):
+                    yielded += 1
+                    yield item
+
+                if not continuation_token:
+                    break
+                result = await (next_page if next_page else fetch_page(continuation_token))
+                next_page = None
+        finally:
+            if next_page and not next_page.done():
+                next_page.cancel()
+
+    def iter_components(self, repository, prefetch=True):
+        """异步遍历仓库中的组件"""
+        return self._iter_pages(lambda token: self.list_components(repository, token), prefetch)
+
+    def iter_assets(self, repository, prefetch=True):
+        """异步遍历仓库中的资产"""
+        return self._iter_pages(lambda token: self.list_assets(repository, token), prefetch)
+
+    def iter_search(self, repository=None, group=None, name=None, version=None,
+                    format_type=None, prefetch=True, **kwargs):
+        """异步遍历组件搜索结果"""
+        return self._iter_pages(
+            lambda token: self.search_components(repository, group, name, version, format_type,
+                                                 continuation_token=token, **kwargs),
+            prefetch)
+
+    def iter_search_assets(self, repository=None, group=None, name=None, version=None,
+                           format_type=None, prefetch=True, **kwargs):
+        """异步遍历资产搜索结果"""
+        return self._iter_pages(
+            lambda token: self.search_assets(repository, group, name, version, format_type,
+                                             continuation_token=token, **kwargs),
+            prefetch)
+
+    async def get_all_components_in_repository(self, repository):
+        """获取仓库中的所有组件"""
+        return [component async for component in self.iter_components(repository)]
+
+    '''
+    ############################## Batch Operations ##############################
+    '''
+
+    async def batch_download_assets(self, asset_list, download_dir='./downloads'):
+        """批量下载资产，并发度由max_concurrency限制"""
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
+
+        async def download_single_asset(asset_info):
+            if isinstance(asset_info, str):
+                asset_id, filename = asset_info, None
+            else:
+                asset_id = asset_info.get('asset_id') or asset_info.get('id')
+                filename = asset_info.get('filename')
+            save_path = os.path.join(download_dir, filename) if filename else None
+            return asset_id, await self._download_asset(asset_id, save_path, download_dir)
+
+        results = {}
+        for asset_id, result in await asyncio.gather(*[download_single_asset(a) for a in asset_list]):
+            results[asset_id] = result
+            if not result:
+                logger.error(f'Failed to download asset: {asset_id}')
+        return results
+
+    async def batch_delete_components(self, component_ids):
+        """批量删除组件，并发度由max_concurrency限制"""
+        results = await asyncio.gather(*[self.delete_component(c) for c in component_ids])
+        for component_id, result in zip(component_ids, results):
+            if not result:
+                logger.error(f'Failed to delete component: {component_id}')
+        return dict(zip(component_ids, results))
@@ -17,6 +17,7 @@ import jinja2
 PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
 sys.path.append(PUBLIC_LIBS_PATH)
 from refs.env_config import EnvConfig
+from refs.email_smtp_pool import get_smtp_pool, get_smtp_pool_config
 
 
 class EmailNotifier:
@@ -210,14 +211,15 @@ class EmailNotifier:
             f.write(sast_template)
     
     def _get_smtp_connection(self, account=None):
-        """获取SMTP连接"""
+        """建立新的SMTP连接（STARTTLS并登录），失败时抛出异常"""
         if not account:
             account = self._def_account
         
         account_info = self.smtp_config['accounts'][account]
         
         try:
-            server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'])
+            server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'],
+                                  timeout=get_smtp_pool_config()['timeout'])
             
             if self.smtp_config.get('use_tls', True):
                 server.starttls()
@@ -226,7 +228,16 @@ class EmailNotifier:
             return server
         except Exception as e:
             logger.error(f"SMTP连接失败: {e}")
-            return None
+            raise
+    
+    def _get_smtp_pool(self, account=None):
+        """获取账户对应的进程级共享SMTP连接池，所有EmailNotifier实例复用同一组连接"""
+        if not account:
+            account = self._def_account
+        
+        key = (self.smtp_config['smtp_server'], self.smtp_config['smtp_port'],
+               self.smtp_config['accounts'][account]['username'])
+        return get_smtp_pool(key, lambda: self._get_smtp_connection(account))
     
     def _render_template(self, template_name, **kwargs):
         """渲染邮件模板"""
@@ -306,11 +317,8 @@ class EmailNotifier:
                             )
                             msg.attach(part)
             
-            # 发送邮件
-            smtp_server = self._get_smtp_connection(account)
-            if not smtp_server:
-                return False
-            
+            # 发送邮件：通过连接池复用已登录的连接
+            messages = []
             for recipient in recipients:
                 msg_copy = MIMEMultipart('alternative')
                 for key, value in msg.items():
@@ -320,11 +328,11 @@ class EmailNotifier:
                 # 复制所有部分
                 for part in msg.get_payload():
                     msg_copy.attach(part)
-                
-                smtp_server.send_message(msg_copy)
-                logger.info(f"邮件发送成功: {recipient}")
+                messages.append(msg_copy)
             
-            smtp_server.quit()
+            self._get_smtp_pool(account).send_messages(messages)
+            for recipient in recipients:
+                logger.info(f"邮件发送成功: {recipient}")
             return True
             
         except Exception as e:
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import atexit
+import smtplib
+import threading
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.env_config import EnvConfig
+
+
+DEFAULT_SMTP_POOL_CONFIG = {
+    'max_connections': 2,
+    'idle_timeout': 60,
+    'check_interval': 10,
+    'timeout': 30
+}
+
+
+def get_smtp_pool_config():
+    """读取SMTP_INFO中的连接池配置，缺失的键使用默认值"""
+    config = dict(DEFAULT_SMTP_POOL_CONFIG)
+    config.update(getattr(EnvConfig, 'SMTP_INFO', {}).get('pool') or {})
+    return config
+
+
+def _is_disconnect(error):
+    """连接已被服务器关闭（包括421服务不可用），换一个连接重发即可"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError)):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == 421
+
+
+class SMTPConnectionPool(object):
+    """线程安全的SMTP长连接池
+
+    连接建立（STARTTLS、登录）后放回池中复用；空闲超过check_interval的连接取出时先发NOOP确认可用，
+    空闲超过idle_timeout的连接由后台线程关闭。发送中途被服务器断开时重新连接并重发当前邮件。
+
+    Args:
+        connect: 建立并登录一个新连接的函数，失败时抛出异常
+        max_connections: 同时打开的最大连接数，超出时等待其他线程归还
+    """
+
+    def __init__(self, connect, max_connections=None, idle_timeout=None, check_interval=None):
+        config = get_smtp_pool_config()
+        self._connect = connect
+        self.max_connections = max_connections or config['max_connections']
+        self.idle_timeout = idle_timeout or config['idle_timeout']
+        self.check_interval = check_interval if check_interval is not None else config['check_interval']
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._idle = []  # [(server, last_used)]，后进先出，优先复用最近用过的连接
+        self._stop = threading.Event()
+        self._reaper = None
+        self._stats = {
+            'messages_sent': 0,
+            'connections_opened': 0,
+            'connections_reused': 0,
+            'health_check_failures': 0,
+            'reconnects': 0,
+            'idle_closed': 0
+        }
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _open(self):
+        server = self._connect()
+        self._count('connections_opened')
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _healthy(server):
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self):
+        """取出一个可用连接，必须通过release归还"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    server, last_used = self._idle.pop()
+                idle = time.monotonic() - last_used
+                if idle >= self.idle_timeout:
+                    self._close(server)
+                    self._count('idle_closed')
+                    continue
+                if idle >= self.check_interval and not self._healthy(server):
+                    logger.debug('SMTP连接NOOP检查失败，重新连接')
+                    self._close(server)
+                    self._count('health_check_failures')
+                    continue
+                self._count('connections_reused')
+                return server
+            return self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server, broken=False):
+        """归还连接，broken=True时直接关闭"""
+        try:
+            if broken or self._stop.is_set():
+                self._close(server)
+            else:
+                with self._lock:
+                    self._idle.append((server, time.monotonic()))
+                self._ensure_reaper()
+        finally:
+            self._slots.release()
+
+    def send_messages(self, messages):
+        """通过池中的一个连接依次发送邮件，返回发送数量"""
+        server = self.acquire()
+        broken = False
+        sent = 0
+        try:
+            for msg in messages:
+                try:
+                    server.send_message(msg)
+                except Exception as e:
+                    if not _is_disconnect(e):
+                        raise
+                    logger.warning(f'SMTP连接已断开，重新连接后重发: {e}')
+                    self._close(server)
+                    self._count('reconnects')
+                    broken = True
+                    server = self._open()
+                    broken = False
+                    server.send_message(msg)
+                sent += 1
+            return sent
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self._count('messages_sent', sent)
+            self.release(server, broken=broken)
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name='smtp-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while not self._stop.wait(max(self.idle_timeout / 2.0, 1)):
+            now = time.monotonic()
+            with self._lock:
+                expired = [entry for entry in self._idle if now - entry[1] >= self.idle_timeout]
+                self._idle = [entry for entry in self._idle if now - entry[1] < self.idle_timeout]
+                self._stats['idle_closed'] += len(expired)
+                finished = not self._idle
+                if finished:
+                    # 没有空闲连接时退出，下次归还连接时再启动
+                    self._reaper = None
+            for server, _ in expired:
+                self._close(server)
+            if finished:
+                return
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle_connections'] = len(self._idle)
+        return stats
+
+    def close(self):
+        """关闭所有空闲连接，之后归还的连接也直接关闭"""
+        self._stop.set()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(key, connect):
+    """获取key（服务器、端口、账户）对应的进程级共享连接池"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(connect)
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def close_smtp_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
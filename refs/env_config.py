@@ -101,11 +101,144 @@ class EnvConfig(object):
         }
     }
 
+    # Nexus性能调优配置
+    NEXUS_PERF_INFO = {
+        'session': {
+            'pool_connections': 10,  # 每个账户缓存的主机连接池数量
+            'pool_maxsize': 20,  # 每个主机的最大保持连接数
+            'host_pool_maxsize': {},  # 按主机覆盖pool_maxsize, 例: {'nexus.example.com:8081': 50}
+            'connection_ttl': 300  # 会话最长存活秒数, 超时后重建连接
+        },
+        'index': {
+            'db_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'index.db'),  # 本地仓库索引
+            'commit_every_pages': 1  # 每同步多少页提交一次断点
+        },
+        'download': {
+            'chunk_size': 8 * 1024 * 1024,  # 并行下载时每个Range分块大小
+            'max_parallel': 4,  # 单个文件的最大并行分块数
+            'min_parallel_size': 16 * 1024 * 1024,  # 小于该大小的文件使用单流下载
+            'block_size': 1024 * 1024  # 读取响应体的块大小
+        },
+        'cache': {
+            'enabled': False,  # 是否默认启用本地构件缓存
+            'cache_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'cas'),  # 缓存目录
+            'max_size': 10 * 1024 * 1024 * 1024,  # 缓存容量上限, 超出后按LRU淘汰
+            'link_mode': 'auto'  # auto(reflink>复制) / reflink / hardlink(与缓存共用inode, 命中时校验) / copy
+        },
+        'digest': {
+            'db_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'digests.db'),  # 本地文件摘要缓存
+            'max_workers': 4,  # 并行计算摘要的文件数
+            'block_size': 1024 * 1024
+        },
+        'retry': {
+            # 按调用类别的重试策略, 类别中未配置的项使用default
+            'policies': {
+                'default': {
+                    'max_retries': 3,  # 最大重试次数
+                    'backoff_base': 0.5,  # 指数退避基数(秒), 实际等待在[0, base*2^n]内随机
+                    'backoff_max': 30,  # 单次退避上限(秒)
+                    'max_retry_after': 120,  # Retry-After超过该秒数时不再等待
+                    'retry_statuses': [429, 502, 503, 504],
+                    'retry_non_idempotent': False  # POST等非幂等请求是否按状态码重试(429始终重试)
+                },
+                'search': {'max_retries': 5},
+                'download': {'max_retries': 5, 'backoff_max': 60},
+                'delete': {'max_retries': 3},
+                'upload': {'max_retries': 2, 'backoff_max': 60}
+            },
+            'breaker_failure_threshold': 5,  # 同一主机连续失败多少次后熔断
+            'breaker_reset_timeout': 30  # 熔断持续秒数, 之后放行一个探测请求
+        },
+        'governor': {
+            # 每个Nexus主机共享的请求预算, 元数据调用与大文件传输(上传/下载)分开
+            'metadata': {
+                'rate': 50,  # 每秒请求数上限(令牌桶速率)
+                'burst': 100,  # 令牌桶容量
+                'max_concurrency': 32,  # 并发上限, 同时也是批量删除线程池的默认大小
+                'min_concurrency': 2,
+                'target_latency': 2.0  # 延迟超过该秒数时收缩并发
+            },
+            'bulk': {
+                'rate': 20,
+                'burst': 20,
+                'max_concurrency': 16,  # 同时也是批量下载/上传线程池的默认大小
+                'min_concurrency': 1,
+                'target_latency': 10.0  # 以收到响应头的时间计
+            },
+            'decrease_factor': 0.5  # 429或延迟超标时并发(及429时速率)的收缩比例
+        },
+        'promote': {
+            # 批量晋级流水线各阶段线程数
+            'resolve_workers': 8,
+            'transfer_workers': 8,
+            'verify_workers': 4,
+            'delete_workers': 4,
+            'queue_size': 100,  # 阶段之间的队列长度
+            'journal_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'jobs')  # 进度日志目录
+        },
+        'response_cache': {
+            'enabled': False,  # 是否默认启用REST响应缓存(搜索/列表/组件/资产的GET结果)
+            'memory_max_bytes': 32 * 1024 * 1024,  # 内存层容量, 超出后按LRU淘汰
+            'disk_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'responses.db'),  # 磁盘层
+            'disk_max_bytes': 256 * 1024 * 1024,  # 磁盘层容量, 为0时只使用内存层
+            'ttl': {
+                # 各接口类别的缓存秒数, 为0时不缓存; 过期后如有ETag/Last-Modified则发送条件请求
+                'search': 60,
+                'list': 30,
+                'component': 300,
+                'asset': 300
+            }
+        },
+        'resolver': {
+            'ttl': 600,  # 坐标/资产ID解析结果的缓存秒数
+            'latest_ttl': 30,  # "latest"版本解析结果的缓存秒数
+            'max_entries': 100000
+        },
+        'mirror': {
+            'manifest_name': '.nexus_mirror.db',  # 镜像目录中的本地清单文件名
+            'commit_every': 500  # 清单每写入多少条提交一次
+        },
+        'tree_upload': {
+            'manifest_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'uploads.db'),  # 已上传文件清单
+            'batch_bytes': 32 * 1024 * 1024,  # 同一目录的小文件合并为一个multipart请求的字节数上限
+            'batch_files': 100,  # 单个请求的文件数上限
+            'large_file_size': 64 * 1024 * 1024  # 不小于该大小的文件单独流式上传
+        },
+        'zip': {
+            'compression': 'auto',  # SAST多文件打包方式: deflate / store / auto(PDF等已压缩格式直接存储)
+            'compress_level': 6,  # deflate压缩级别 0-9
+            'block_size': 1024 * 1024,  # 压缩线程交给上传线程的块大小
+            'queue_size': 8  # 压缩线程最多领先上传的块数
+        },
+        'batch': {
+            'item_timeout': 300,  # 批量操作中单项的超时秒数, 为0时不限制
+            'poll_interval': 1.0,  # 检查单项超时的间隔秒数
+            'zip_workers': 2  # 批量上传SAST报告时共享的压缩线程数
+        },
+        'journal': {
+            'journal_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'jobs'),  # 按任务ID保存的进度日志目录
+            'fsync_every': 200,  # 进度日志每写入多少条fsync一次
+            'fsync_interval': 1.0  # 距上次fsync超过该秒数时也会fsync
+        },
+        'async': {
+            'max_concurrency': 100,  # AsyncNexusReq同时在途的最大请求数
+            'block_size': 1024 * 1024,  # 下载时读取响应体的块大小
+            'connect_timeout': 30,  # 上传/下载建立连接的超时秒数
+            'read_timeout': 300  # 上传/下载两次读取之间的最长间隔秒数，传输总时长不限
+        }
+    }
+
     # SMTP邮件配置
     SMTP_INFO = {
         'smtp_server': 'smtp.gmail.com',  # SMTP服务器地址
         'smtp_port': 587,  # SMTP端口
         'use_tls': True,  # 是否使用TLS
+        'pool': {
+            'max_connections': 2,  # 每个账户同时打开的最大SMTP连接数
+            'idle_timeout': 60,  # 空闲超过该秒数的连接被关闭
+            'check_interval': 10,  # 空闲超过该秒数的连接复用前先发NOOP检查
+            'timeout': 30  # 连接和命令超时秒数
+        },
         'accounts': {
             'default': {
                 'username': 'your-email@gmail.com',  # 发送邮箱
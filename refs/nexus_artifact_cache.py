@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import stat
+import errno
+import shutil
+import hashlib
+import threading
+import traceback
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+DEFAULT_CACHE_CONFIG = {
+    'enabled': False,
+    'cache_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'cas'),
+    'max_size': 10 * 1024 * 1024 * 1024,
+    'link_mode': 'auto'
+}
+
+# 优先使用的校验和算法
+CHECKSUM_ALGORITHMS = ('sha256', 'sha1')
+
+# linux/fs.h: FICLONE = _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+class FileLock(object):
+    """基于lockfile的跨进程互斥锁"""
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ArtifactCache(object):
+    """按Nexus校验和寻址的本地构件缓存
+
+    对象存放在 <cache_dir>/objects/<算法>/<前两位>/<摘要>，同一文件的sha256和sha1
+    条目互为硬链接。写入时复制（或reflink）调用方的文件，对象设为只读；命中时以reflink/复制的方式
+    放到目标路径，显式配置link_mode='hardlink'时才硬链接，此时命中前先校验对象摘要。
+    文件mtime作为最近访问时间。缓存占用记录在 <cache_dir>/usage 中，各进程在文件锁内增减，
+    超出容量上限时才扫描并按LRU淘汰，淘汰后按扫描结果校正。
+    """
+
+    def __init__(self, cache_dir=None, max_size=None, link_mode=None):
+        config = get_perf_config('cache', DEFAULT_CACHE_CONFIG)
+        self.cache_dir = os.path.expanduser(cache_dir or config['cache_dir'])
+        self.max_size = max_size if max_size is not None else config['max_size']
+        self.link_mode = link_mode or config['link_mode']
+
+        self.objects_dir = os.path.join(self.cache_dir, 'objects')
+        self.locks_dir = os.path.join(self.cache_dir, 'locks')
+        self.tmp_dir = os.path.join(self.cache_dir, 'tmp')
+        self.usage_path = os.path.join(self.cache_dir, 'usage')
+        for path in (self.objects_dir, self.locks_dir, self.tmp_dir):
+            if not os.path.exists(path):
+                os.makedirs(path, exist_ok=True)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+    def _count(self, key, value=1):
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def _object_path(self, algorithm, digest):
+        digest = digest.lower()
+        return os.path.join(self.objects_dir, algorithm, digest[:2], digest)
+
+    def _lock(self, name):
+        return FileLock(os.path.join(self.locks_dir, f'{name}.lock'))
+
+    def lookup(self, checksum):
+        """按校验和查找缓存对象，返回对象路径或None"""
+        for algorithm in CHECKSUM_ALGORITHMS:
+            digest = (checksum or {}).get(algorithm)
+            if digest:
+                path = self._object_path(algorithm, digest)
+                if os.path.exists(path):
+                    return path
+        return None
+
+    @staticmethod
+    def _clone(source, target, reflink=True):
+        """复制文件内容到新文件target，支持时用reflink共享数据块（写时复制），返回使用的方式"""
+        if reflink and fcntl:
+            try:
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return 'reflink'
+            except OSError:
+                if os.path.exists(target):
+                    os.remove(target)
+        shutil.copyfile(source, target)
+        return 'copy'
+
+    def _place(self, source, target):
+        """将缓存对象放到目标路径：reflink > 复制；link_mode='hardlink'时硬链接"""
+        target_dir = os.path.dirname(os.path.abspath(target))
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir, exist_ok=True)
+        tmp_target = f'{target}.cas-{os.getpid()}-{threading.get_ident()}'
+
+        try:
+            if self.link_mode == 'hardlink':
+                try:
+                    os.link(source, tmp_target)
+                    os.replace(tmp_target, target)
+                    return 'hardlink'
+                except OSError:
+                    if os.path.exists(tmp_target):
+                        os.remove(tmp_target)
+
+            mode = self._clone(source, tmp_target, reflink=self.link_mode in ('auto', 'reflink'))
+            os.chmod(tmp_target, 0o644)
+            os.replace(tmp_target, target)
+            return mode
+        finally:
+            if os.path.exists(tmp_target):
+                os.remove(tmp_target)
+
+    def _verify(self, path, checksum):
+        """校验缓存对象内容与校验和一致"""
+        for algorithm in CHECKSUM_ALGORITHMS:
+            expected = (checksum or {}).get(algorithm)
+            if not expected:
+                continue
+            digest = hashlib.new(algorithm)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            return digest.hexdigest().lower() == expected.lower()
+        return True
+
+    def _discard(self, checksum):
+        """删除校验和对应的所有对象条目"""
+        inodes = {}
+        for algorithm in CHECKSUM_ALGORITHMS:
+            digest = (checksum or {}).get(algorithm)
+            if digest and os.path.exists(self._object_path(algorithm, digest)):
+                st = os.stat(self._object_path(algorithm, digest))
+                inodes[(st.st_dev, st.st_ino)] = st.st_size
+                os.remove(self._object_path(algorithm, digest))
+        if inodes:
+            self._adjust_usage(-sum(inodes.values()), -len(inodes))
+
+    def fetch(self, checksum, save_path):
+        """命中缓存时把文件放到save_path并返回True，未命中返回False"""
+        digest = next((checksum.get(a) for a in CHECKSUM_ALGORITHMS if (checksum or {}).get(a)), None)
+        if not digest:
+            return False
+
+        try:
+            with self._lock(digest[:2]):
+                path = self.lookup(checksum)
+                if path and self.link_mode == 'hardlink' and not self._verify(path, checksum):
+                    # 硬链接出去的文件被原地修改过，对象已损坏
+                    logger.warning(f'缓存对象校验失败，已删除: {path}')
+                    self._discard(checksum)
+                    path = None
+                if not path:
+                    self._count('misses')
+                    return False
+                # mtime记录最近访问时间，供LRU淘汰使用
+                os.utime(path, None)
+                mode = self._place(path, save_path)
+
+            self._count('hits')
+            self._count('bytes_saved', os.path.getsize(save_path))
+            logger.info(f'缓存命中({mode}): {save_path}')
+            return True
+        except Exception:
+            logger.warning(f'读取缓存失败，改为下载: {traceback.format_exc()}')
+            self._count('misses')
+            return False
+
+    def store(self, file_path, checksum):
+        """将已校验的文件加入缓存"""
+        entries = [(a, checksum[a]) for a in CHECKSUM_ALGORITHMS if (checksum or {}).get(a)]
+        if not entries:
+            return False
+
+        try:
+            with self._lock(entries[0][1][:2]):
+                if self.lookup(checksum):
+                    return True
+                tmp_path = os.path.join(self.tmp_dir, f'{entries[0][1]}.{os.getpid()}.{threading.get_ident()}')
+                # 不与调用方的文件共用inode，之后原地修改下载的文件不会影响缓存对象
+                self._clone(file_path, tmp_path)
+                os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                size = os.path.getsize(tmp_path)
+
+                for algorithm, digest in entries:
+                    object_path = self._object_path(algorithm, digest)
+                    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                    try:
+                        os.link(tmp_path, object_path)
+                    except OSError as e:
+                        if e.errno != errno.EEXIST:
+                            raise
+                os.remove(tmp_path)
+
+            self._count('stores')
+            total = self._adjust_usage(size, 1)
+            if self.max_size and total > self.max_size:
+                self.evict()
+            return True
+        except Exception:
+            logger.warning(f'写入缓存失败: {traceback.format_exc()}')
+            return False
+
+    def _scan(self):
+        """扫描缓存对象，按inode去重，返回[(mtime, size, [paths])]"""
+        inodes = {}
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key not in inodes:
+                    inodes[key] = [st.st_mtime, st.st_size, []]
+                inodes[key][2].append(path)
+        return list(inodes.values())
+
+    def _read_usage(self):
+        """读取共享的占用记录，返回(字节数, 对象数)，不存在或损坏时返回None"""
+        try:
+            with open(self.usage_path, 'r', encoding='utf-8') as f:
+                size, objects = f.read().split()
+            return int(size), int(objects)
+        except (OSError, ValueError):
+            return None
+
+    def _write_usage(self, size, objects):
+        tmp_path = f'{self.usage_path}.{os.getpid()}.{threading.get_ident()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f'{max(size, 0)} {max(objects, 0)}')
+        os.replace(tmp_path, self.usage_path)
+
+    def _scan_usage(self):
+        entries = self._scan()
+        return sum(size for _, size, _ in entries), len(entries)
+
+    def _adjust_usage(self, size_delta, objects_delta):
+        """在文件锁内增减共享占用记录并返回最新字节数，记录缺失时扫描得到（已包含本次变化）"""
+        with self._lock('usage'):
+            usage = self._read_usage()
+            if usage is None:
+                size, objects = self._scan_usage()
+            else:
+                size, objects = usage[0] + size_delta, usage[1] + objects_delta
+            self._write_usage(size, objects)
+        return size
+
+    def _usage(self):
+        with self._lock('usage'):
+            usage = self._read_usage()
+            if usage is None:
+                usage = self._scan_usage()
+                self._write_usage(*usage)
+        return usage
+
+    def evict(self):
+        """超出容量上限时按最近访问时间淘汰
+
+        持有占用记录的文件锁完成扫描、删除和校正，其他进程的写入在此期间等待，
+        淘汰依据的是所有进程共同的实际占用。
+        """
+        if not self.max_size:
+            return 0
+        with self._lock('usage'):
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            objects = len(entries)
+
+            evicted = 0
+            for mtime, size, paths in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_size:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                objects -= 1
+                evicted += 1
+            self._write_usage(total, objects)
+
+        if evicted:
+            self._count('evictions', evicted)
+            logger.info(f'缓存淘汰 {evicted} 个对象')
+        return evicted
+
+    def get_stats(self):
+        """返回命中统计及当前缓存占用"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['size'], stats['objects'] = self._usage()
+        stats['max_size'] = self.max_size
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+import traceback
+import concurrent.futures
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_BATCH_CONFIG = {
+    'item_timeout': 300,
+    'poll_interval': 1.0,
+    'zip_workers': 2
+}
+
+
+class BatchRunner(object):
+    """批量任务执行器：有界线程池并行执行，按完成顺序逐项产出结果
+
+    每项结果包含耗时和字节数；单项超时从该项开始执行时计时，超时后立即产出失败结果，
+    不再等待其完成（工作线程无法被强制终止，会继续占用一个并发槽直到返回）。
+
+    Args:
+        max_workers: 并发数
+        item_timeout: 单项超时秒数，为0或None时不限制
+    """
+
+    def __init__(self, max_workers, item_timeout=None, poll_interval=None):
+        config = get_perf_config('batch', DEFAULT_BATCH_CONFIG)
+        self.max_workers = max(1, max_workers)
+        self.item_timeout = config['item_timeout'] if item_timeout is None else item_timeout
+        self.poll_interval = poll_interval or config['poll_interval']
+
+    def run(self, items, func, key=None, on_timeout=None):
+        """执行批量任务
+
+        Args:
+            items: 任务参数列表
+            func: func(item) 返回 (结果, 字节数)，结果为真值表示成功
+            key: key(item) 返回用于日志和结果的名称
+            on_timeout: on_timeout(item) 在某项超时时调用，用于通知仍在执行的任务尽快放弃
+
+        Yields:
+            dict: {index, key, success, result, elapsed, bytes, error}，按完成顺序
+        """
+        items = list(items)
+        if not items:
+            return
+        started = {}
+        lock = threading.Lock()
+
+        def execute(index):
+            with lock:
+                started[index] = time.monotonic()
+            return func(items[index])
+
+        def record(index, success, result=None, nbytes=0, error=None):
+            with lock:
+                begin = started.get(index)
+            return {
+                'index': index,
+                'key': key(items[index]) if key else index,
+                'success': bool(success),
+                'result': result,
+                'elapsed': round(time.monotonic() - begin, 3) if begin else 0.0,
+                'bytes': nbytes or 0,
+                'error': error
+            }
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)))
+        try:
+            future_to_index = {executor.submit(execute, index): index for index in range(len(items))}
+            pending = set(future_to_index)
+            while pending:
+                done, pending = concurrent.futures.wait(pending, timeout=self.poll_interval,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index = future_to_index[future]
+                    try:
+                        result, nbytes = future.result()
+                        yield record(index, result, result, nbytes)
+                    except Exception as e:
+                        logger.error(traceback.format_exc())
+                        yield record(index, False, error=str(e) or type(e).__name__)
+
+                if not self.item_timeout:
+                    continue
+                now = time.monotonic()
+                for future in list(pending):
+                    index = future_to_index[future]
+                    with lock:
+                        begin = started.get(index)
+                    if begin and now - begin > self.item_timeout:
+                        pending.discard(future)
+                        logger.error(f'批量任务超时({self.item_timeout}s): {key(items[index]) if key else index}')
+                        if on_timeout:
+                            try:
+                                on_timeout(items[index])
+                            except Exception:
+                                logger.error(traceback.format_exc())
+                        yield record(index, False, error='timeout')
+        finally:
+            # 超时或提前结束时不等待仍在执行的任务，尚未开始的任务直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import hashlib
+from datetime import datetime
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_journal import JobJournal
+from refs.nexus_retention import component_summary
+
+
+class DeletionPlan(object):
+    """持久化的删除计划
+
+    计划文件为JSON，包含待删除组件的ID、坐标和资产大小合计；执行进度记录在
+    <plan>.progress.jsonl中，中断后再次执行只处理尚未成功删除的组件。
+    """
+
+    def __init__(self, items=None, repository=None, description=None):
+        self.items = items or []
+        self.repository = repository
+        self.description = description or {}
+        self.created = None
+        self.path = None
+
+    @property
+    def total_bytes(self):
+        return sum(item.get('size') or 0 for item in self.items)
+
+    def summary(self):
+        return {
+            'path': self.path,
+            'repository': self.repository,
+            'components': len(self.items),
+            'bytes': self.total_bytes,
+            'created': self.created
+        }
+
+    def save(self, path):
+        """写入计划文件（先写临时文件再替换）"""
+        self.path = os.path.expanduser(path)
+        self.created = datetime.now().isoformat()
+        plan_dir = os.path.dirname(self.path)
+        if plan_dir and not os.path.exists(plan_dir):
+            os.makedirs(plan_dir, exist_ok=True)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': self.created,
+                'repository': self.repository,
+                'description': self.description,
+                'components': len(self.items),
+                'bytes': self.total_bytes,
+                'items': self.items
+            }, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        # 新计划覆盖旧计划时，旧的执行进度不再有效
+        progress_path = self.progress_path()
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
+        return self.path
+
+    @classmethod
+    def load(cls, path):
+        path = os.path.expanduser(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        plan = cls(data.get('items', []), data.get('repository'), data.get('description'))
+        plan.created = data.get('created')
+        plan.path = path
+        return plan
+
+    def progress_path(self):
+        return self.path + '.progress.jsonl'
+
+    def digest(self):
+        with open(self.path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @classmethod
+    def from_components(cls, components, component_ids, repository=None):
+        """从流式遍历的组件中挑出指定ID生成计划，返回(计划, 未找到的ID列表)"""
+        wanted = set(component_ids)
+        items = []
+        for component in components:
+            if component['id'] in wanted:
+                items.append(component_summary(component))
+                wanted.discard(component['id'])
+                if not wanted:
+                    break
+        missing = [c for c in component_ids if c in wanted]
+        return cls(items, repository, {'source': 'batch_delete'}), missing
+
+    def execute(self, engine):
+        """按计划删除，已成功的组件记录在进度日志中，重复执行时跳过
+
+        Returns:
+            dict: {components, deleted, skipped, failed, bytes_freed, failures}
+        """
+        journal = JobJournal(self.progress_path(), 'delete-plan', {'plan': self.digest()})
+        journal.open()
+
+        pending = []
+        skipped = 0
+        for item in self.items:
+            if journal.stage(item['id']) == 'deleted':
+                skipped += 1
+            else:
+                pending.append(item)
+        if skipped:
+            logger.info(f'从进度日志恢复：跳过已删除的 {skipped} 个组件')
+
+        def on_result(item, ok):
+            journal.record(item['id'], 'deleted' if ok else 'failed')
+
+        try:
+            results = engine.delete(pending, on_result=on_result) if pending else {}
+        finally:
+            journal.close()
+
+        deleted = [item for item in pending if results.get(item['id'])]
+        failures = [item for item in pending if not results.get(item['id'])]
+        return {
+            'components': len(self.items),
+            'deleted': len(deleted),
+            'skipped': skipped,
+            'failed': len(failures),
+            'bytes_freed': sum(item.get('size') or 0 for item in deleted),
+            'failures': [item['id'] for item in failures]
+        }
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import sqlite3
+import hashlib
+import threading
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_DIGEST_CONFIG = {
+    'db_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'digests.db'),
+    'max_workers': 4,
+    'block_size': 1024 * 1024
+}
+
+
+def hash_file(file_path, block_size=1024 * 1024):
+    """流式计算文件的sha1和sha256"""
+    sha1 = hashlib.sha1()
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha1.update(block)
+            sha256.update(block)
+    return {'sha1': sha1.hexdigest(), 'sha256': sha256.hexdigest()}
+
+
+class FileDigestCache(object):
+    """本地文件摘要缓存，以(path, size, mtime)为键，避免重复计算大文件哈希"""
+
+    def __init__(self, db_path=None, max_workers=None):
+        config = get_perf_config('digest', DEFAULT_DIGEST_CONFIG)
+        self.db_path = os.path.expanduser(db_path or config['db_path'])
+        self.max_workers = max_workers or config['max_workers']
+        self.block_size = config['block_size']
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS digests (
+                   path TEXT PRIMARY KEY,
+                   size INTEGER,
+                   mtime_ns INTEGER,
+                   sha1 TEXT,
+                   sha256 TEXT
+               )''')
+        self._conn.commit()
+
+    def get(self, file_path):
+        """返回文件摘要{'sha1', 'sha256'}，文件未变化时直接使用缓存"""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, sha1, sha256 FROM digests WHERE path = ?', (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return {'sha1': row[2], 'sha256': row[3]}
+
+        digests = hash_file(path, self.block_size)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO digests (path, size, mtime_ns, sha1, sha256) VALUES (?, ?, ?, ?, ?)',
+                (path, st.st_size, st.st_mtime_ns, digests['sha1'], digests['sha256']))
+            self._conn.commit()
+        return digests
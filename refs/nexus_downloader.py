@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import hashlib
+import threading
+import traceback
+import contextlib
+import concurrent.futures
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_DOWNLOAD_CONFIG = {
+    'chunk_size': 8 * 1024 * 1024,
+    'max_parallel': 4,
+    'min_parallel_size': 16 * 1024 * 1024,
+    'block_size': 1024 * 1024
+}
+
+
+class _NullSlot(object):
+    def mark(self, status_code):
+        pass
+
+
+class RangeNotSupported(Exception):
+    """服务端未按Range返回206"""
+
+
+class PartJournal(object):
+    """.part文件旁的断点日志，记录已完成的字节区间和期望校验和"""
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.url = None
+        self.size = None
+        self.checksum = {}
+        self.completed = []
+        self._lock = threading.Lock()
+
+    def load(self):
+        """读取日志，不存在或损坏时返回False"""
+        if not os.path.exists(self.journal_path):
+            return False
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.url = data['url']
+            self.size = data['size']
+            self.checksum = data.get('checksum') or {}
+            self.completed = [tuple(r) for r in data.get('completed', [])]
+            return True
+        except Exception:
+            logger.warning(f'断点日志损坏，将重新下载: {self.journal_path}')
+            return False
+
+    def matches(self, url, size, checksum):
+        """判断日志是否属于同一个文件"""
+        if self.size != size:
+            return False
+        for algorithm in ('sha256', 'sha1'):
+            if checksum.get(algorithm) and self.checksum.get(algorithm):
+                return checksum[algorithm] == self.checksum[algorithm]
+        return self.url == url
+
+    def reset(self, url, size, checksum):
+        self.url = url
+        self.size = size
+        self.checksum = dict(checksum)
+        self.completed = []
+        self.save()
+
+    def save(self):
+        # 先写临时文件再替换，避免中断时留下半截日志
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': self.url,
+                'size': self.size,
+                'checksum': self.checksum,
+                'completed': [list(r) for r in self.completed]
+            }, f)
+        os.replace(tmp_path, self.journal_path)
+
+    def add(self, start, end):
+        """记录一个已写入的区间
+        
+        进程被杀时已写入的数据仍在页缓存中，这里不做fsync；
+        断电等情况造成的数据不一致由最终的校验和验证兜底。
+        """
+        with self._lock:
+            self.completed.append((start, end))
+            self.save()
+
+    def missing(self):
+        """返回尚未完成的区间（end包含在内）"""
+        gaps = []
+        offset = 0
+        for start, end in sorted(self.completed):
+            if start > offset:
+                gaps.append((offset, start - 1))
+            offset = max(offset, end + 1)
+        if offset < self.size:
+            gaps.append((offset, self.size - 1))
+        return gaps
+
+    def remove(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+class RangeDownloader(object):
+    """基于HTTP Range的并行分块下载器
+
+    文件先按Content-Length预分配，各分块由连接池中的连接并行获取，
+    通过pwrite写入各自偏移；小文件只用一个连接按区间顺序获取，
+    服务端不支持Range时退化为单流下载。
+    """
+
+    def __init__(self, session_pool, account, chunk_size=None, max_parallel=None,
+                 min_parallel_size=None, block_size=None, retry=None, governor=None):
+        config = get_perf_config('download', DEFAULT_DOWNLOAD_CONFIG)
+        self.session_pool = session_pool
+        self.account = account
+        self.chunk_size = chunk_size or config['chunk_size']
+        self.max_parallel = max_parallel or config['max_parallel']
+        self.min_parallel_size = min_parallel_size if min_parallel_size is not None else config['min_parallel_size']
+        self.block_size = block_size or config['block_size']
+        self.retry = retry
+        self.governor = governor
+        self._write_lock = threading.Lock()
+
+    def _slot(self, kind):
+        """占用主机预算名额，未配置governor时为空操作"""
+        return self.governor.slot(kind) if self.governor else contextlib.nullcontext(_NullSlot())
+
+    def _request(self, method, url, kind, **kwargs):
+        """发送不读取响应体的请求，每次尝试各自占用名额，重试的退避等待期间不占用"""
+        def send():
+            with self._slot(kind) as slot:
+                res = self.session_pool.request(method, url, self.account, **kwargs)
+                slot.mark(res.status_code)
+                return res
+        if self.retry:
+            return self.retry.call('download', method, url, send)
+        return send()
+
+    @contextlib.contextmanager
+    def open_stream(self, method, url, kind='bulk', account=None, **kwargs):
+        """发送流式请求，返回的响应在退出上下文时关闭
+
+        名额在每次尝试内部占用：会被重试的响应（429/5xx等）立即归还名额，退避等待期间不占用；
+        最终响应的名额保持到响应体读完、退出上下文时才归还。account为空时使用下载器的默认账户。
+        """
+        retry_statuses = self.retry.policies['download'].retry_statuses if self.retry else set()
+        account = account or self.account
+        held = []
+
+        def send():
+            slot_cm = self._slot(kind)
+            slot = slot_cm.__enter__()
+            try:
+                res = self.session_pool.request(method, url, account, **kwargs)
+            except BaseException:
+                slot_cm.__exit__(None, None, None)
+                raise
+            slot.mark(res.status_code)
+            if res.status_code in retry_statuses:
+                slot_cm.__exit__(None, None, None)
+            else:
+                held.append(slot_cm)
+            return res
+
+        res = self.retry.call('download', method, url, send) if self.retry else send()
+        try:
+            yield res
+        finally:
+            res.close()
+            while held:
+                held.pop().__exit__(None, None, None)
+
+    def probe(self, url):
+        """HEAD探测文件大小及是否支持Range，返回(size, accept_ranges)"""
+        try:
+            res = self._request('HEAD', url, 'metadata', allow_redirects=True, timeout=60)
+            if res.status_code != 200:
+                return None, False
+            size = res.headers.get('Content-Length')
+            accept_ranges = res.headers.get('Accept-Ranges', '').lower() == 'bytes'
+            return (int(size) if size else None), accept_ranges
+        except Exception:
+            logger.debug(f'HEAD probe failed: {url}')
+            return None, False
+
+    def _pwrite(self, fd, data, offset):
+        """按偏移写入，无os.pwrite的平台（Windows）退化为加锁seek+write"""
+        if hasattr(os, 'pwrite'):
+            while data:
+                written = os.pwrite(fd, data, offset)
+                data = data[written:]
+                offset += written
+        else:
+            with self._write_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                os.write(fd, data)
+
+    def _preallocate(self, fd, size):
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                pass
+        os.ftruncate(fd, size)
+
+    def split_ranges(self, size, start=0):
+        """按chunk_size切分字节区间，返回[(start, end)]（end包含在内）"""
+        ranges = []
+        offset = start
+        while offset < size:
+            end = min(offset + self.chunk_size, size) - 1
+            ranges.append((offset, end))
+            offset = end + 1
+        return ranges
+
+    def _split_gaps(self, gaps):
+        ranges = []
+        for start, end in gaps:
+            ranges.extend(self.split_ranges(end + 1, start))
+        return ranges
+
+    def _fetch_range(self, url, fd, start, end, on_done=None):
+        """获取单个分块并写入文件"""
+        headers = {'Range': f'bytes={start}-{end}'}
+        with self.open_stream('GET', url, headers=headers, stream=True, timeout=120) as res:
+            if res.status_code != 206:
+                raise RangeNotSupported(f'range request returned {res.status_code}')
+            offset = start
+            for block in res.iter_content(chunk_size=self.block_size):
+                if block:
+                    self._pwrite(fd, block, offset)
+                    offset += len(block)
+            if offset != end + 1:
+                raise IOError(f'incomplete range {start}-{end}: got {offset - start} bytes')
+        if on_done:
+            on_done(start, end)
+        return end - start + 1
+
+    def download_ranges(self, url, save_path, size, ranges, on_done=None):
+        """并行下载给定区间到已存在（或新建）的文件"""
+        fd = os.open(save_path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+        try:
+            if os.fstat(fd).st_size != size:
+                self._preallocate(fd, size)
+            max_parallel = self.max_parallel if size >= self.min_parallel_size else 1
+            workers = max(1, min(max_parallel, len(ranges)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._fetch_range, url, fd, start, end, on_done)
+                           for start, end in ranges]
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        future.result()
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            os.close(fd)
+
+    def download_stream(self, url, save_path):
+        """单连接流式下载"""
+        with self.open_stream('GET', url, stream=True, timeout=120) as res:
+            if res.status_code != 200:
+                logger.error(f'Download failed: {res.status_code}')
+                return False
+            with open(save_path, 'wb') as f:
+                for block in res.iter_content(chunk_size=self.block_size):
+                    if block:
+                        f.write(block)
+            return save_path
+
+    def _download_single(self, url, part_path, journal):
+        """单流下载到.part，不支持断点续传
+
+        先删除断点日志和旧的.part：单流下载会覆盖日志中记录为已完成的区间，
+        日志残留时下次运行会在被覆盖的数据上续传。
+        """
+        journal.remove()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        try:
+            if self.download_stream(url, part_path):
+                return True
+        except Exception:
+            logger.error(traceback.format_exc())
+        journal.remove()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return False
+
+    @staticmethod
+    def verify_checksum(file_path, checksum):
+        """按sha256优先、sha1其次校验文件，无可用校验和时视为通过"""
+        for algorithm in ('sha256', 'sha1'):
+            expected = (checksum or {}).get(algorithm)
+            if not expected:
+                continue
+            digest = hashlib.new(algorithm)
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            if digest.hexdigest().lower() != expected.lower():
+                logger.error(f'校验和不匹配 {file_path}: {algorithm} {digest.hexdigest()} != {expected}')
+                return False
+            return True
+        return True
+
+    def download(self, url, save_path, expected_size=None, checksum=None):
+        """下载url到save_path
+        
+        数据先写入save_path.part，并在save_path.part.json记录已完成区间；
+        再次下载同一文件时只请求缺失的区间，校验通过后原子重命名为save_path。
+        """
+        checksum = checksum or {}
+        part_path = save_path + '.part'
+        journal = PartJournal(part_path + '.json')
+        try:
+            if expected_size is not None and expected_size < self.min_parallel_size and not os.path.exists(part_path):
+                # 已知大小的小文件不做HEAD探测，直接单流下载
+                size, accept_ranges = expected_size, False
+            else:
+                size, accept_ranges = self.probe(url)
+                size = size or expected_size
+
+            if accept_ranges and size:
+                try:
+                    if journal.load() and journal.matches(url, size, checksum) and os.path.exists(part_path):
+                        ranges = self._split_gaps(journal.missing())
+                        done = size - sum(end - start + 1 for start, end in ranges)
+                        logger.info(f'断点续传 {save_path}: 已完成 {done}/{size} bytes')
+                    else:
+                        if os.path.exists(part_path):
+                            os.remove(part_path)
+                        journal.reset(url, size, checksum)
+                        ranges = self.split_ranges(size)
+                    self.download_ranges(url, part_path, size, ranges, on_done=journal.add)
+                except RangeNotSupported as e:
+                    logger.warning(f'分块下载不可用，改为单流下载: {e}')
+                    if not self._download_single(url, part_path, journal):
+                        return False
+            elif not self._download_single(url, part_path, journal):
+                return False
+
+            if not self.verify_checksum(part_path, checksum):
+                os.remove(part_path)
+                journal.remove()
+                return False
+
+            os.replace(part_path, save_path)
+            journal.remove()
+            return save_path
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
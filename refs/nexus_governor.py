@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import urllib.parse
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_GOVERNOR_CONFIG = {
+    'metadata': {
+        'rate': 50,
+        'burst': 100,
+        'max_concurrency': 32,
+        'min_concurrency': 2,
+        'target_latency': 2.0
+    },
+    'bulk': {
+        'rate': 20,
+        'burst': 20,
+        'max_concurrency': 16,
+        'min_concurrency': 1,
+        'target_latency': 10.0
+    },
+    'decrease_factor': 0.5
+}
+
+BUDGET_KINDS = ('metadata', 'bulk')
+
+
+class AdaptiveBudget(object):
+    """令牌桶限速 + AIMD并发上限
+
+    每个请求先占用一个并发名额，再从令牌桶取一个令牌。请求结束时按结果调整：
+    返回429或延迟超过target_latency时并发上限和速率乘以decrease_factor（每个延迟周期最多一次），
+    否则并发上限每轮加1、速率缓慢回升到配置值。
+
+    已持有名额的线程再次申请（如流式复制时上传请求体内发起的下载）不等待并发名额，只计入in_flight
+    并取令牌，避免所有名额都被外层请求占住时互相等待。
+    """
+
+    def __init__(self, name, rate=50, burst=100, max_concurrency=32, min_concurrency=1,
+                 target_latency=2.0, decrease_factor=0.5):
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._cond = threading.Condition()
+        self._held = threading.local()
+        self._stats = {'requests': 0, 'throttled': 0, 'slow': 0, 'decreases': 0, 'wait_time': 0.0}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self):
+        """阻塞直到拿到并发名额和令牌"""
+        started = time.monotonic()
+        depth = getattr(self._held, 'depth', 0)
+        with self._cond:
+            while not depth and self.in_flight >= max(int(self.limit), self.min_concurrency):
+                self._cond.wait()
+            self.in_flight += 1
+            self._held.depth = depth + 1
+
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                self._cond.wait((1 - self._tokens) / self.rate)
+
+            self._stats['requests'] += 1
+            self._stats['wait_time'] += time.monotonic() - started
+
+    def try_acquire(self, waited=0.0):
+        """非阻塞申请，供asyncio调用方轮询
+
+        拿到并发名额和令牌时返回0，否则返回建议的等待秒数。事件循环中的请求都在同一线程，
+        不按线程区分嵌套，每个请求都要等待并发名额。waited为调用方已等待的秒数，成功时计入统计。
+        """
+        with self._cond:
+            if self.in_flight >= max(int(self.limit), self.min_concurrency):
+                return 0.05
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            self.in_flight += 1
+            self._stats['requests'] += 1
+            self._stats['wait_time'] += waited
+            return 0
+
+    def release(self, latency, status_code=None, threaded=True):
+        """归还并发名额，并根据延迟和状态码调整预算；threaded=False表示名额由try_acquire取得"""
+        with self._cond:
+            self.in_flight -= 1
+            if threaded:
+                self._held.depth = max(getattr(self._held, 'depth', 1) - 1, 0)
+            throttled = status_code == 429
+            slow = latency > self.target_latency
+            if throttled:
+                self._stats['throttled'] += 1
+            if slow:
+                self._stats['slow'] += 1
+
+            now = time.monotonic()
+            if throttled or slow:
+                if now - self._decreased_at >= self.target_latency:
+                    self._decreased_at = now
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+                    if throttled:
+                        self.rate = max(1.0, self.rate * self.decrease_factor)
+                    self._stats['decreases'] += 1
+                    logger.debug(f'{self.name} budget decreased: concurrency={self.limit:.1f} rate={self.rate:.1f}/s')
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.01)
+            self._cond.notify_all()
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['wait_time'] = round(stats['wait_time'], 3)
+            stats['concurrency_limit'] = round(self.limit, 2)
+            stats['rate'] = round(self.rate, 2)
+            stats['in_flight'] = self.in_flight
+        return stats
+
+
+class GovernorSlot(object):
+    """一次请求占用的预算名额
+
+    流式传输时可在拿到响应头后调用mark()记录延迟，名额在退出上下文时归还。
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.status_code = None
+        self.latency = None
+        self._started = None
+
+    def __enter__(self):
+        self.budget.acquire()
+        self._started = time.monotonic()
+        return self
+
+    def mark(self, status_code):
+        self.status_code = status_code
+        self.latency = time.monotonic() - self._started
+
+    def __exit__(self, *exc):
+        latency = self.latency if self.latency is not None else time.monotonic() - self._started
+        self.budget.release(latency, self.status_code)
+
+
+class AsyncGovernorSlot(GovernorSlot):
+    """asyncio版本的预算名额，等待期间让出事件循环"""
+
+    async def __aenter__(self):
+        started = time.monotonic()
+        while True:
+            wait = self.budget.try_acquire(time.monotonic() - started)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        self._started = time.monotonic()
+        return self
+
+    async def __aexit__(self, *exc):
+        latency = self.latency if self.latency is not None else time.monotonic() - self._started
+        self.budget.release(latency, self.status_code, threaded=False)
+
+
+class NexusGovernor(object):
+    """单个Nexus主机的请求预算，元数据调用与大文件传输分开限流"""
+
+    def __init__(self, host):
+        config = get_perf_config('governor', DEFAULT_GOVERNOR_CONFIG)
+        self.host = host
+        self.budgets = {}
+        for kind in BUDGET_KINDS:
+            params = dict(DEFAULT_GOVERNOR_CONFIG[kind])
+            params.update(config.get(kind) or {})
+            self.budgets[kind] = AdaptiveBudget(f'{host}/{kind}', decrease_factor=config['decrease_factor'], **params)
+
+    def slot(self, kind='metadata'):
+        """返回占用kind预算的上下文管理器"""
+        return GovernorSlot(self.budgets[kind])
+
+    def async_slot(self, kind='metadata'):
+        """返回占用kind预算的异步上下文管理器"""
+        return AsyncGovernorSlot(self.budgets[kind])
+
+    def max_workers(self, kind='metadata'):
+        """线程池大小建议值：预算的并发上限"""
+        return self.budgets[kind].max_concurrency
+
+    def get_stats(self):
+        return {kind: budget.get_stats() for kind, budget in self.budgets.items()}
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(url):
+    """获取url所属主机的进程级共享预算"""
+    host = urllib.parse.urlsplit(url).netloc or url
+    with _governors_lock:
+        governor = _governors.get(host)
+        if governor is None:
+            governor = NexusGovernor(host)
+            _governors[host] = governor
+        return governor
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import threading
+import traceback
+from datetime import datetime
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_INDEX_CONFIG = {
+    'db_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'index.db'),
+    'commit_every_pages': 1
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    id TEXT PRIMARY KEY,
+    repository TEXT NOT NULL,
+    format TEXT,
+    grp TEXT,
+    name TEXT,
+    version TEXT,
+    last_modified TEXT,
+    fingerprint TEXT,
+    sync_gen INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_components_coord ON components (repository, grp, name, version);
+CREATE INDEX IF NOT EXISTS idx_components_name ON components (repository, name);
+CREATE INDEX IF NOT EXISTS idx_components_version ON components (repository, version);
+CREATE INDEX IF NOT EXISTS idx_components_modified ON components (repository, last_modified);
+CREATE INDEX IF NOT EXISTS idx_components_gen ON components (repository, sync_gen);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    component_id TEXT,
+    repository TEXT NOT NULL,
+    path TEXT,
+    sha1 TEXT,
+    sha256 TEXT,
+    size INTEGER,
+    last_modified TEXT,
+    download_url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assets_component ON assets (component_id);
+CREATE INDEX IF NOT EXISTS idx_assets_path ON assets (repository, path);
+CREATE INDEX IF NOT EXISTS idx_assets_sha1 ON assets (sha1);
+CREATE INDEX IF NOT EXISTS idx_assets_sha256 ON assets (sha256);
+CREATE INDEX IF NOT EXISTS idx_assets_modified ON assets (repository, last_modified);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    repository TEXT PRIMARY KEY,
+    sync_gen INTEGER NOT NULL,
+    continuation_token TEXT,
+    status TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    last_completed_at TEXT
+);
+"""
+
+# 前缀查询上界，配合BINARY排序走索引范围扫描
+_PREFIX_UPPER = '\U0010ffff'
+
+
+class NexusIndex(object):
+    """仓库组件/资产的本地SQLite索引
+
+    sync()按continuationToken遍历仓库并逐页提交断点；每个组件保存指纹，
+    未变化的组件只刷新同步代数，不重写行；同步完成后清除上游已删除的组件。
+    """
+
+    def __init__(self, db_path=None):
+        config = get_perf_config('index', DEFAULT_INDEX_CONFIG)
+        self.db_path = os.path.expanduser(db_path or config['db_path'])
+        self.commit_every_pages = max(int(config['commit_every_pages']), 1)
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _fingerprint(component):
+        """根据资产路径、校验和与修改时间计算组件指纹"""
+        parts = [component.get('version') or '']
+        for asset in sorted(component.get('assets', []), key=lambda a: a.get('id', '')):
+            checksum = asset.get('checksum') or {}
+            parts.append('|'.join([
+                asset.get('id', ''),
+                asset.get('path', ''),
+                checksum.get('sha1', ''),
+                str(asset.get('lastModified', ''))
+            ]))
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    '''
+    ############################## Sync ##############################
+    '''
+
+    def get_sync_state(self, repository):
+        """获取仓库的同步状态"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM sync_state WHERE repository = ?', (repository,)).fetchone()
+            return dict(row) if row else None
+
+    def is_synced(self, repository):
+        """仓库是否至少完成过一次完整同步"""
+        state = self.get_sync_state(repository)
+        return bool(state and state.get('last_completed_at'))
+
+    def _save_state(self, repository, sync_gen, continuation_token, status, started_at=None, completed_at=None):
+        self._conn.execute(
+            '''INSERT INTO sync_state (repository, sync_gen, continuation_token, status, started_at, completed_at, last_completed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(repository) DO UPDATE SET
+                   sync_gen = excluded.sync_gen,
+                   continuation_token = excluded.continuation_token,
+                   status = excluded.status,
+                   started_at = COALESCE(excluded.started_at, sync_state.started_at),
+                   completed_at = excluded.completed_at,
+                   last_completed_at = COALESCE(excluded.completed_at, sync_state.last_completed_at)''',
+            (repository, sync_gen, continuation_token, status, started_at, completed_at, completed_at)
+        )
+
+    def _upsert_component(self, repository, component, sync_gen, fingerprint):
+        assets = component.get('assets', [])
+        last_modified = max([str(a.get('lastModified') or '') for a in assets] or [''])
+        self._conn.execute(
+            '''INSERT OR REPLACE INTO components
+               (id, repository, format, grp, name, version, last_modified, fingerprint, sync_gen, data)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (component['id'], repository, component.get('format'), component.get('group'),
+             component.get('name'), component.get('version'), last_modified or None,
+             fingerprint, sync_gen, json.dumps(component, ensure_ascii=False))
+        )
+        self._conn.execute('DELETE FROM assets WHERE component_id = ?', (component['id'],))
+        self._conn.executemany(
+            '''INSERT OR REPLACE INTO assets
+               (id, component_id, repository, path, sha1, sha256, size, last_modified, download_url)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            [(a.get('id'), component['id'], repository, a.get('path'),
+              (a.get('checksum') or {}).get('sha1'), (a.get('checksum') or {}).get('sha256'),
+              a.get('fileSize'), a.get('lastModified'), a.get('downloadUrl'))
+             for a in assets if a.get('id')]
+        )
+
+    def sync(self, nexus, repository, full=False):
+        """同步仓库内容到本地索引
+
+        Args:
+            nexus: NexusReq实例
+            repository: 仓库名称
+            full: 忽略上次中断的断点，从头开始同步
+        """
+        stats = {'pages': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'resumed': False}
+
+        with self._lock:
+            state = self.get_sync_state(repository)
+            if state and state['status'] == 'running' and state['continuation_token'] and not full:
+                sync_gen = state['sync_gen']
+                continuation_token = state['continuation_token']
+                stats['resumed'] = True
+                logger.info(f'从断点继续同步索引: {repository}')
+            else:
+                sync_gen = (state['sync_gen'] + 1) if state else 1
+                continuation_token = None
+            self._save_state(repository, sync_gen, continuation_token, 'running',
+                             started_at=datetime.now().isoformat())
+            self._conn.commit()
+
+        try:
+            while True:
+                result = nexus.list_components(repository, continuation_token)
+                if not result:
+                    logger.error(f'索引同步中断, 可稍后重试继续: {repository}')
+                    return False
+
+                with self._lock:
+                    for component in result.get('items', []):
+                        fingerprint = self._fingerprint(component)
+                        row = self._conn.execute(
+                            'SELECT fingerprint FROM components WHERE id = ?', (component['id'],)).fetchone()
+                        if row and row['fingerprint'] == fingerprint:
+                            self._conn.execute(
+                                'UPDATE components SET sync_gen = ? WHERE id = ?', (sync_gen, component['id']))
+                            stats['unchanged'] += 1
+                            continue
+                        self._upsert_component(repository, component, sync_gen, fingerprint)
+                        stats['updated' if row else 'added'] += 1
+
+                    continuation_token = result.get('continuationToken')
+                    stats['pages'] += 1
+                    self._save_state(repository, sync_gen, continuation_token, 'running')
+                    if not continuation_token or stats['pages'] % self.commit_every_pages == 0:
+                        self._conn.commit()
+
+                if not continuation_token:
+                    break
+
+            # 清除本轮未出现的组件（上游已删除）
+            with self._lock:
+                stale_ids = [r['id'] for r in self._conn.execute(
+                    'SELECT id FROM components WHERE repository = ? AND sync_gen < ?', (repository, sync_gen))]
+                for component_id in stale_ids:
+                    self._remove_component(component_id)
+                stats['removed'] = len(stale_ids)
+                self._save_state(repository, sync_gen, None, 'complete',
+                                 completed_at=datetime.now().isoformat())
+                self._conn.commit()
+
+            logger.info(f'索引同步完成 {repository}: {stats}')
+            return stats
+        except Exception:
+            logger.error(traceback.format_exc())
+            with self._lock:
+                self._conn.commit()
+            return False
+
+    def _remove_component(self, component_id):
+        self._conn.execute('DELETE FROM assets WHERE component_id = ?', (component_id,))
+        self._conn.execute('DELETE FROM components WHERE id = ?', (component_id,))
+
+    def remove_component(self, component_id):
+        """从索引中移除组件（本客户端删除组件后调用）"""
+        with self._lock:
+            self._remove_component(component_id)
+            self._conn.commit()
+
+    '''
+    ############################## Query ##############################
+    '''
+
+    def query_components(self, repository, group=None, name=None, version=None,
+                         name_prefix=None, group_prefix=None, modified_after=None, limit=None):
+        """查询索引中的组件，返回与REST接口一致的组件字典列表"""
+        sql = 'SELECT data FROM components WHERE repository = ?'
+        params = [repository]
+        if group is not None:
+            sql += ' AND grp = ?'
+            params.append(group)
+        if name is not None:
+            sql += ' AND name = ?'
+            params.append(name)
+        if version is not None:
+            sql += ' AND version = ?'
+            params.append(version)
+        if name_prefix:
+            sql += ' AND name >= ? AND name < ?'
+            params.extend([name_prefix, name_prefix + _PREFIX_UPPER])
+        if group_prefix:
+            sql += ' AND grp >= ? AND grp < ?'
+            params.extend([group_prefix, group_prefix + _PREFIX_UPPER])
+        if modified_after:
+            sql += ' AND last_modified > ?'
+            params.append(modified_after)
+        sql += ' ORDER BY grp, name, version'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        with self._lock:
+            return [json.loads(row['data']) for row in self._conn.execute(sql, params)]
+
+    def query_assets(self, repository=None, path=None, path_prefix=None, sha1=None, sha256=None, limit=None):
+        """查询索引中的资产"""
+        sql = 'SELECT * FROM assets WHERE 1 = 1'
+        params = []
+        if repository:
+            sql += ' AND repository = ?'
+            params.append(repository)
+        if path is not None:
+            sql += ' AND path = ?'
+            params.append(path)
+        if path_prefix:
+            sql += ' AND path >= ? AND path < ?'
+            params.extend([path_prefix, path_prefix + _PREFIX_UPPER])
+        if sha1:
+            sql += ' AND sha1 = ?'
+            params.append(sha1)
+        if sha256:
+            sql += ' AND sha256 = ?'
+            params.append(sha256)
+        sql += ' ORDER BY path'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_JOURNAL_CONFIG = {
+    'journal_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'jobs'),
+    'fsync_every': 200,
+    'fsync_interval': 1.0
+}
+
+
+class JobJournal(object):
+    """追加写入的任务进度日志（JSON Lines）
+
+    第一行为任务头，记录任务类型和参数；之后每行记录一个条目到达的阶段及附加字段，
+    同一条目的多条记录按顺序合并。重新打开参数相同的日志时按行回放，得到每个条目的最新状态，用于断点续跑；
+    参数不同则视为新任务，旧日志被覆盖。
+
+    每条记录写入后立即flush，进程被杀死时已写入的记录不会丢失；fsync按条数或时间间隔批量执行，
+    不会拖慢批量任务的吞吐。
+    """
+
+    def __init__(self, path, job_type, params=None, fsync_every=None, fsync_interval=None):
+        config = get_perf_config('journal', DEFAULT_JOURNAL_CONFIG)
+        self.path = os.path.expanduser(path)
+        self.job_type = job_type
+        self.params = params or {}
+        self.fsync_every = fsync_every or config['fsync_every']
+        self.fsync_interval = fsync_interval if fsync_interval is not None else config['fsync_interval']
+        self.entries = {}
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_job(cls, job_id, job_type, params=None):
+        """按任务ID在日志目录下打开日志（<journal_dir>/<job_type>-<job_id>.jsonl）"""
+        config = get_perf_config('journal', DEFAULT_JOURNAL_CONFIG)
+        safe_id = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in str(job_id))
+        return cls(os.path.join(os.path.expanduser(config['journal_dir']), f'{job_type}-{safe_id}.jsonl'),
+                   job_type, params)
+
+    def open(self):
+        """打开日志，返回回放得到的条目数"""
+        journal_dir = os.path.dirname(self.path)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir, exist_ok=True)
+
+        self.entries = {}
+        if os.path.exists(self.path) and self._replay():
+            self._file = open(self.path, 'a', encoding='utf-8')
+            return len(self.entries)
+
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({'type': 'header', 'job': self.job_type, 'params': self.params,
+                     'created': datetime.now().isoformat()})
+        return 0
+
+    def _replay(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        if not lines:
+            return False
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            return False
+        if header.get('job') != self.job_type or header.get('params') != self.params:
+            logger.info(f'任务参数已变化，重新开始: {self.path}')
+            return False
+
+        if not lines[-1].endswith('\n'):
+            # 进程中断时可能留下半行，截掉后再追加
+            lines.pop()
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.entries.setdefault(record['key'], {}).update(record)
+        return True
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def record(self, key, stage, **fields):
+        """记录条目key到达stage阶段"""
+        record = {'key': key, 'stage': stage}
+        record.update(fields)
+        with self._lock:
+            self.entries.setdefault(key, {}).update(record)
+            self._write(record)
+
+    def get(self, key):
+        """返回条目合并后的最新状态，没有时返回None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            return dict(entry) if entry else None
+
+    def stage(self, key):
+        record = self.get(key)
+        return record['stage'] if record else None
+
+    def completed(self, stage='done'):
+        """返回最新阶段为stage的条目 {key: 合并后的状态}"""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self.entries.items() if entry.get('stage') == stage}
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                if self._unsynced:
+                    self._sync()
+                self._file.close()
+                self._file = None
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+import traceback
+import concurrent.futures
+from datetime import datetime
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_MIRROR_CONFIG = {
+    'manifest_name': '.nexus_mirror.db',
+    'commit_every': 500
+}
+
+# 清单数据库结构版本（PRAGMA user_version），2起按(Nexus地址, 仓库, 路径)区分记录
+MANIFEST_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirrored_files (
+    server TEXT,
+    repository TEXT,
+    path TEXT,
+    asset_id TEXT,
+    sha1 TEXT,
+    sha256 TEXT,
+    size INTEGER,
+    last_modified TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (server, repository, path)
+);
+CREATE TABLE IF NOT EXISTS mirror_runs (
+    server TEXT,
+    repository TEXT,
+    last_completed_at TEXT,
+    PRIMARY KEY (server, repository)
+);
+"""
+
+
+def asset_from_index(row):
+    """把索引中的资产行转换为REST资产结构"""
+    return {
+        'id': row['id'],
+        'path': row['path'],
+        'downloadUrl': row['download_url'],
+        'checksum': {k: row[k] for k in ('sha1', 'sha256') if row.get(k)},
+        'fileSize': row['size'],
+        'lastModified': row['last_modified']
+    }
+
+
+class MirrorManifest(object):
+    """镜像目录的本地清单（SQLite），按(Nexus地址, 仓库, 路径)记录每个文件对应的资产校验和与大小
+
+    同一目录可以镜像多个仓库或多个服务器，各自的记录互不覆盖。旧版清单只按路径记录，
+    无法区分来源，升级时保留为legacy_files，仅用于本次同步跳过内容未变化的文件，
+    一次完整同步后删除。
+    """
+
+    def __init__(self, db_path, server, repository, commit_every=None):
+        self.db_path = db_path
+        self.server = server
+        self.repository = repository
+        self.commit_every = commit_every or DEFAULT_MIRROR_CONFIG['commit_every']
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] < MANIFEST_SCHEMA_VERSION:
+            tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'files' in tables:
+                self._conn.execute('ALTER TABLE files RENAME TO legacy_files')
+            self._conn.execute('DROP TABLE IF EXISTS mirror_state')
+            self._conn.execute(f'PRAGMA user_version = {MANIFEST_SCHEMA_VERSION}')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._has_legacy = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'legacy_files'").fetchone() is not None
+
+    def load(self, include_legacy=True):
+        """读出本仓库的全部条目：{path: (sha1, sha256, size, last_modified)}
+
+        include_legacy=True时用旧版清单补充本仓库尚无记录的路径，只用于判断文件是否需要重新下载
+        """
+        entries = {}
+        with self._lock:
+            if include_legacy and self._has_legacy:
+                for row in self._conn.execute('SELECT path, sha1, sha256, size, last_modified FROM legacy_files'):
+                    entries[row['path']] = (row['sha1'], row['sha256'], row['size'], row['last_modified'])
+            for row in self._conn.execute(
+                    'SELECT path, sha1, sha256, size, last_modified FROM mirrored_files '
+                    'WHERE server = ? AND repository = ?', (self.server, self.repository)):
+                entries[row['path']] = (row['sha1'], row['sha256'], row['size'], row['last_modified'])
+        return entries
+
+    def upsert(self, asset):
+        checksum = asset.get('checksum') or {}
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO mirrored_files '
+                '(server, repository, path, asset_id, sha1, sha256, size, last_modified, synced_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.server, self.repository, asset['path'], asset.get('id'), checksum.get('sha1'),
+                 checksum.get('sha256'), asset.get('fileSize'), asset.get('lastModified'),
+                 datetime.now().isoformat()))
+            self._maybe_commit()
+
+    def remove(self, path):
+        with self._lock:
+            self._conn.execute('DELETE FROM mirrored_files WHERE server = ? AND repository = ? AND path = ?',
+                               (self.server, self.repository, path))
+            self._maybe_commit()
+
+    def shared(self, path):
+        """同一路径是否还被其他仓库或服务器的镜像记录占用"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM mirrored_files WHERE path = ? AND NOT (server = ? AND repository = ?) LIMIT 1',
+                (path, self.server, self.repository)).fetchone() is not None
+
+    def _maybe_commit(self):
+        # 逐条增量写入，按批提交，中断后已下载的文件不会重复下载
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def mark_completed(self):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO mirror_runs (server, repository, last_completed_at) VALUES (?, ?, ?)',
+                (self.server, self.repository, datetime.now().isoformat()))
+            if self._has_legacy:
+                # 已完整同步一次，本仓库的文件都已按新结构记录，旧版清单不再需要
+                self._conn.execute('DROP TABLE IF EXISTS legacy_files')
+                self._has_legacy = False
+            self._conn.commit()
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class RepositoryMirror(object):
+    """把仓库同步到本地目录
+
+    流式遍历仓库资产，与本地清单按路径和校验和比较，只下载新增或变化的资产；
+    清单中存在但本地文件缺失或大小不符的文件也会重新下载。prune=True时，
+    在完整遍历成功后删除上游已不存在的本地文件。
+    """
+
+    def __init__(self, nexus, repository, dest, prune=False, max_workers=None, use_index=False,
+                 manifest_path=None):
+        config = get_perf_config('mirror', DEFAULT_MIRROR_CONFIG)
+        self.nexus = nexus
+        self.repository = repository
+        self.server = nexus.root_url.rstrip('/')
+        self.dest = os.path.abspath(os.path.expanduser(dest))
+        self.prune = prune
+        self.max_workers = max_workers or nexus.governor.max_workers('bulk')
+        self.use_index = use_index
+        self.manifest_path = manifest_path or os.path.join(self.dest, config['manifest_name'])
+        self.commit_every = config['commit_every']
+
+    def _local_path(self, path):
+        """资产路径映射为本地路径，拒绝越出镜像目录的路径"""
+        local_path = os.path.abspath(os.path.join(self.dest, path.lstrip('/')))
+        if not local_path.startswith(self.dest + os.sep):
+            return None
+        return local_path
+
+    def _iter_source(self):
+        """遍历源仓库资产，分页获取失败时抛出IncompleteListingError，由run标记列表不完整"""
+        index = self.nexus._indexed(self.repository) if self.use_index else None
+        if index:
+            return (asset_from_index(row) for row in index.query_assets(self.repository))
+        return self.nexus.iter_assets(self.repository)
+
+    @staticmethod
+    def _unchanged(asset, known, local_path):
+        if not known:
+            return False
+        sha1, sha256, size, last_modified = known
+        checksum = asset.get('checksum') or {}
+        if checksum.get('sha256') and sha256:
+            same = checksum['sha256'] == sha256
+        elif checksum.get('sha1') and sha1:
+            same = checksum['sha1'] == sha1
+        else:
+            same = asset.get('fileSize') == size and asset.get('lastModified') == last_modified
+        if not same:
+            return False
+        try:
+            return size is None or os.stat(local_path).st_size == size
+        except OSError:
+            return False
+
+    def run(self, dry_run=False):
+        """执行同步
+
+        Returns:
+            dict: {assets, downloaded, unchanged, failed, pruned, bytes, elapsed, complete, failures}
+        """
+        started = time.monotonic()
+        os.makedirs(self.dest, exist_ok=True)
+        manifest = MirrorManifest(self.manifest_path, self.server, self.repository, self.commit_every)
+        known = manifest.load()
+        recorded = set(manifest.load(include_legacy=False))
+        seen = set()
+        complete = True
+        lock = threading.Lock()
+        stats = {'assets': 0, 'downloaded': 0, 'unchanged': 0, 'failed': 0, 'pruned': 0, 'bytes': 0,
+                 'elapsed': 0.0, 'complete': True, 'dry_run': dry_run, 'failures': []}
+
+        def download(asset, local_path):
+            try:
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                result = self.nexus._download_with_cache(asset['downloadUrl'], local_path, asset)
+            except Exception:
+                logger.error(traceback.format_exc())
+                result = False
+            with lock:
+                if result:
+                    stats['downloaded'] += 1
+                    stats['bytes'] += asset.get('fileSize') or 0
+                else:
+                    stats['failed'] += 1
+                    stats['failures'].append(asset['path'])
+            if result:
+                manifest.upsert(asset)
+
+        window = threading.BoundedSemaphore(self.max_workers * 2)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for asset in self._iter_source():
+                    path = asset.get('path')
+                    if not path or path in seen:
+                        continue
+                    local_path = self._local_path(path)
+                    if not local_path or not asset.get('downloadUrl'):
+                        logger.warning(f'跳过无法镜像的资产: {path}')
+                        continue
+                    seen.add(path)
+                    stats['assets'] += 1
+                    if self._unchanged(asset, known.get(path), local_path):
+                        stats['unchanged'] += 1
+                        if path not in recorded and not dry_run:
+                            # 旧版清单中的记录，按新结构补记到本仓库名下
+                            manifest.upsert(asset)
+                        continue
+                    if dry_run:
+                        stats['downloaded'] += 1
+                        stats['bytes'] += asset.get('fileSize') or 0
+                        continue
+                    window.acquire()
+                    future = executor.submit(download, asset, local_path)
+                    future.add_done_callback(lambda _: window.release())
+        except Exception:
+            logger.error(traceback.format_exc())
+            complete = False
+
+        stats['complete'] = complete
+        if self.prune:
+            if complete:
+                stats['pruned'] = self._prune(manifest, seen, dry_run)
+            else:
+                logger.warning(f'资产列表未完整获取，跳过清理本地文件: {self.repository}')
+
+        if complete and not dry_run and not stats['failed']:
+            manifest.mark_completed()
+        manifest.close()
+        stats['elapsed'] = round(time.monotonic() - started, 2)
+        return stats
+
+    def _prune(self, manifest, seen, dry_run):
+        # 只清理本仓库自己记录过的文件；同一路径被其他仓库的镜像占用时只删除本仓库的记录
+        removed = 0
+        for path in manifest.load(include_legacy=False):
+            if path in seen:
+                continue
+            local_path = self._local_path(path)
+            if not dry_run:
+                if local_path and os.path.exists(local_path) and not manifest.shared(path):
+                    os.remove(local_path)
+                manifest.remove(path)
+            removed += 1
+        return removed
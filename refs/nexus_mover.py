@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+import traceback
+import posixpath
+import urllib.parse
+import concurrent.futures
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+
+
+# 组件上传接口支持的格式及其单资产字段
+SINGLE_ASSET_FORMATS = ('npm', 'pypi', 'nuget', 'rubygems', 'helm', 'apt', 'r', 'yum')
+UPLOAD_FORMATS = ('maven2', 'raw') + SINGLE_ASSET_FORMATS
+
+# 由Nexus自动生成、无需复制的文件
+GENERATED_SUFFIXES = ('.md5', '.sha1', '.sha256', '.sha512')
+
+
+class DownloadStream(object):
+    """把资产下载响应体作为multipart文件来源
+
+    每次迭代重新发起GET并按块产出数据，可随上传请求重试而重放；下载占用传输预算名额直到响应体读完。
+    产出的字节数与声明大小不一致时抛出IOError，使上传失败而不是写入残缺文件。
+    """
+
+    def __init__(self, nexus, url, size=None, block_size=1024 * 1024, account=None):
+        self.nexus = nexus
+        self.url = url
+        self.size = size
+        self.block_size = block_size
+        self.account = account
+
+    def __iter__(self):
+        with self.nexus.downloader.open_stream('GET', self.url, account=self.account,
+                                               stream=True, timeout=120) as res:
+            if res.status_code != 200:
+                raise IOError(f'download {self.url} returned {res.status_code}')
+            received = 0
+            for block in res.iter_content(chunk_size=self.block_size):
+                if block:
+                    received += len(block)
+                    yield block
+            if self.size is not None and received != self.size:
+                raise IOError(f'download {self.url} incomplete: {received}/{self.size} bytes')
+
+
+class ComponentMover(object):
+    """仓库间复制/移动组件
+
+    优先调用staging/move接口在服务端完成移动；接口不可用（OSS版本）或按组件坐标搜索不能唯一命中时，
+    把源资产的下载流直接作为上传请求体写入目标仓库，不经过本地磁盘，成功后再删除源组件。
+    account为空时使用NexusReq的默认账户。
+    """
+
+    def __init__(self, nexus):
+        self.nexus = nexus
+        self.block_size = nexus.downloader.block_size
+        self._staging_available = None
+        self._probe_lock = threading.Lock()
+
+    @staticmethod
+    def _copyable_assets(component):
+        assets = []
+        for asset in component.get('assets', []):
+            path = asset.get('path', '')
+            if path.endswith(GENERATED_SUFFIXES) or posixpath.basename(path).startswith('maven-metadata.xml'):
+                continue
+            assets.append(asset)
+        return assets
+
+    @staticmethod
+    def _maven_coordinates(component, asset):
+        """返回资产的(extension, classifier)"""
+        attributes = asset.get('maven2') or {}
+        if attributes.get('extension'):
+            return attributes['extension'], attributes.get('classifier')
+
+        filename = posixpath.basename(asset['path'])
+        prefix = f"{component['name']}-{component['version']}"
+        if filename.startswith(prefix):
+            rest = filename[len(prefix):]
+            if rest.startswith('-'):
+                classifier, _, extension = rest[1:].partition('.')
+                return extension, classifier
+            return rest.lstrip('.'), None
+        return filename.rpartition('.')[2], None
+
+    def build_uploads(self, component):
+        """按组件格式生成上传请求列表 [(fields, {field_name: asset})]"""
+        format_type = component.get('format')
+        assets = self._copyable_assets(component)
+        if not assets:
+            return []
+
+        if format_type == 'maven2':
+            fields = {
+                'maven2.groupId': component['group'],
+                'maven2.artifactId': component['name'],
+                'maven2.version': component['version'],
+                'maven2.generate-pom': 'false'
+            }
+            files = {}
+            for index, asset in enumerate(assets, 1):
+                extension, classifier = self._maven_coordinates(component, asset)
+                fields[f'maven2.asset{index}.extension'] = extension
+                if classifier:
+                    fields[f'maven2.asset{index}.classifier'] = classifier
+                files[f'maven2.asset{index}'] = asset
+            return [(fields, files)]
+
+        if format_type == 'raw':
+            uploads = {}
+            for asset in assets:
+                directory = posixpath.dirname(asset['path'].lstrip('/')) or '/'
+                fields, files = uploads.setdefault(directory, ({'raw.directory': directory}, {}))
+                index = len(files) + 1
+                fields[f'raw.asset{index}.filename'] = posixpath.basename(asset['path'])
+                files[f'raw.asset{index}'] = asset
+            return list(uploads.values())
+
+        uploads = []
+        for asset in assets:
+            fields = {}
+            if format_type == 'r':
+                fields['r.asset.pathId'] = asset['path'].lstrip('/')
+            elif format_type == 'yum':
+                fields['yum.directory'] = posixpath.dirname(asset['path'].lstrip('/'))
+                fields['yum.asset.filename'] = posixpath.basename(asset['path'])
+            uploads.append((fields, {f'{format_type}.asset': asset}))
+        return uploads
+
+    def _file_spec(self, asset, account=None):
+        url = asset['downloadUrl']
+        size = asset.get('fileSize')
+        if size is None:
+            size, _ = self.nexus.downloader.probe(url)
+        filename = posixpath.basename(urllib.parse.urlparse(url).path) or posixpath.basename(asset['path'])
+        stream = DownloadStream(self.nexus, url, size, self.block_size, account=account)
+        return (filename, stream, asset.get('contentType'), size)
+
+    def copy(self, component, target_repo, account=None):
+        """把组件流式复制到目标仓库"""
+        format_type = component.get('format')
+        if format_type not in UPLOAD_FORMATS:
+            logger.error(f'不支持通过上传接口复制的格式: {format_type}')
+            return False
+
+        uploads = self.build_uploads(component)
+        if not uploads:
+            logger.error(f"组件没有可复制的资产: {component.get('id')}")
+            return False
+
+        for fields, assets in uploads:
+            files = {name: self._file_spec(asset, account) for name, asset in assets.items()}
+            if not self.nexus._upload_multipart(target_repo, fields, files, account=account):
+                return False
+        return True
+
+    def _send(self, method, api_url, account):
+        nexus = self.nexus
+
+        def send():
+            with nexus.governor.slot('metadata') as slot:
+                res = nexus.session_pool.request(method, api_url, account or nexus._def_account, data='',
+                                                 headers={'Content-Type': 'application/json'}, timeout=120)
+                slot.mark(res.status_code)
+                return res
+        return nexus.retry.call('default', method, api_url, send)
+
+    def _probe_staging(self, target_repo, account=None):
+        """探测staging/move接口是否存在，返回True/False，无法判断（网络错误、5xx）时返回None
+
+        接口只接受POST，存在时GET返回405；OSS版本没有该接口，返回404。
+        """
+        with self._probe_lock:
+            if self._staging_available is not None:
+                return self._staging_available
+            api_url = f'{self.nexus.root_url}/service/rest/v1/staging/move/{urllib.parse.quote(target_repo)}'
+            try:
+                res = self._send('GET', api_url, account)
+            except Exception as e:
+                logger.warning(f'探测staging/move接口失败: {e}')
+                return None
+            res.close()
+            if res.status_code == 404:
+                logger.info('staging/move接口不可用，改为流式复制')
+                self._staging_available = False
+            elif res.status_code < 500:
+                self._staging_available = True
+            return self._staging_available
+
+    def _unique_match(self, params, component):
+        """staging/move按搜索条件移动所有匹配的组件，只有恰好命中当前组件时才使用"""
+        result = self.nexus.search_components(params['repository'], params.get('group'), params.get('name'),
+                                              params.get('version'), params.get('format'))
+        items = (result or {}).get('items') or []
+        return (len(items) == 1 and not result.get('continuationToken')
+                and items[0].get('id') == component.get('id'))
+
+    def _staging_move(self, component, target_repo, account=None):
+        """调用staging/move接口在服务端移动组件，未移动时返回None由调用方改为流式复制
+
+        接口是否存在由_probe_staging单独判断；移动请求本身返回404表示搜索没有命中，只对当前组件回退。
+        组件缺少version，或按坐标搜索不能唯一命中该组件时也回退，避免移动其他同名组件。
+        """
+        if self._staging_available is False or not component.get('version'):
+            return None
+        if not self._probe_staging(target_repo, account):
+            return None
+
+        nexus = self.nexus
+        params = {'repository': component['repository']}
+        for key in ('format', 'group', 'name', 'version'):
+            if component.get(key):
+                params[key] = component[key]
+        if not self._unique_match(params, component):
+            logger.debug(f"staging/move搜索条件不能唯一命中组件 {component.get('id')}，改为流式复制")
+            return None
+
+        path = f'/staging/move/{target_repo}'
+        query = urllib.parse.urlencode(params)
+        try:
+            res = self._send('POST', f'{nexus.root_url}/service/rest/v1{path}?{query}', account)
+        except Exception as e:
+            logger.warning(f'staging/move请求失败，本次改为流式复制: {e}')
+            return None
+
+        try:
+            if res.status_code == 404:
+                logger.info(f"staging/move未找到组件 {component.get('id')}，改为流式复制")
+                return None
+            if res.status_code not in nexus._check_succ_code:
+                logger.warning(f'staging/move失败({res.status_code} | {res.text})，本次改为流式复制')
+                return None
+        finally:
+            res.close()
+
+        if nexus.response_cache:
+            nexus.response_cache.invalidate_for_write(path, query)
+        nexus.resolver.invalidate()
+        return True
+
+    def transfer(self, component_id, target_repo, copy=False, account=None):
+        """复制或移动单个组件"""
+        try:
+            component = self.nexus.get_component(component_id, account=account)
+            if not component:
+                logger.error(f'Failed to get component info: {component_id}')
+                return False
+
+            if not copy and self._staging_move(component, target_repo, account):
+                if self.nexus._index is not None:
+                    self.nexus._index.remove_component(component_id)
+                logger.info(f"Successfully moved component {component_id} from {component['repository']} to {target_repo}")
+                return True
+
+            if not self.copy(component, target_repo, account):
+                logger.error(f'Failed to copy component {component_id} to {target_repo}')
+                return False
+
+            if copy:
+                logger.info(f'Successfully copied component {component_id} to {target_repo}')
+                return True
+
+            if not self.nexus.delete_component(component_id, account=account):
+                logger.warning(f"Component uploaded to {target_repo} but failed to delete from {component['repository']}")
+            else:
+                logger.info(f"Successfully moved component {component_id} from {component['repository']} to {target_repo}")
+            return True
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def transfer_many(self, component_ids, target_repo, copy=False, max_workers=None, account=None):
+        """并行复制或移动多个组件，返回{component_id: 结果}"""
+        max_workers = max_workers or self.nexus.governor.max_workers('bulk')
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_id = {executor.submit(self.transfer, c, target_repo, copy, account): c for c in component_ids}
+            for future in concurrent.futures.as_completed(future_to_id):
+                component_id = future_to_id[future]
+                try:
+                    results[component_id] = future.result()
+                except Exception as exc:
+                    logger.error(f'Component {component_id} transfer generated an exception: {exc}')
+                    results[component_id] = False
+        return results
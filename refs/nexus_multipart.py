@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import os
+import mmap
+import uuid
+import mimetypes
+
+
+class StreamingMultipartEncoder(object):
+    """按需生成multipart/form-data请求体
+
+    文件内容在发送时按块从磁盘读取，不会整体读入内存。所有部分长度已知时
+    通过len属性提供Content-Length；每次迭代都会从头重新生成，可用于请求重试。
+    """
+
+    def __init__(self, fields=None, files=None, boundary=None, block_size=1024 * 1024,
+                 progress_callback=None):
+        """
+        Args:
+            fields: 普通表单字段 {name: value}
+            files: 文件字段 {name: path} 或 {name: (filename, 来源, content_type, size)}，来源可以是
+                   文件路径、文件对象、mmap/bytes缓冲区或产出bytes的可迭代对象；
+                   后两项可省略；size为None的流式来源会使请求改为chunked传输
+            block_size: 读取文件的块大小
+            progress_callback: 进度回调 callback(bytes_sent, total_bytes)，total_bytes未知时为None
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.block_size = block_size
+        self.progress_callback = progress_callback
+        self._parts = []
+
+        for name, value in (fields or {}).items():
+            header = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{name}"\r\n\r\n').encode('utf-8')
+            value = str(value).encode('utf-8')
+            self._parts.append((header, value, len(value)))
+
+        for name, spec in (files or {}).items():
+            filename, source, content_type, size = self._normalize_file(spec)
+            header = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                      f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+            self._parts.append((header, source, size))
+
+        self._closing = f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    @staticmethod
+    def _normalize_file(spec):
+        if not isinstance(spec, tuple):
+            spec = (None, spec)
+        filename, source = spec[0], spec[1]
+        content_type = spec[2] if len(spec) > 2 and spec[2] else None
+        size = spec[3] if len(spec) > 3 else None
+
+        if isinstance(source, (str, os.PathLike)):
+            filename = filename or os.path.basename(source)
+            size = os.path.getsize(source)
+        elif size is None and isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            size = len(source)
+        elif size is None and hasattr(source, 'fileno'):
+            try:
+                size = os.fstat(source.fileno()).st_size
+            except (OSError, ValueError):
+                size = None
+        filename = filename or 'file'
+        content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        return filename, source, content_type, size
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    @property
+    def len(self):
+        """请求体总长度，存在长度未知的流式部分时返回None"""
+        total = len(self._closing)
+        for header, source, size in self._parts:
+            if size is None:
+                return None
+            total += len(header) + size + 2
+        return total
+
+    def _iter_source(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for offset in range(0, len(view), self.block_size):
+                yield bytes(view[offset:offset + self.block_size])
+        elif isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(self.block_size), b''):
+                    yield block
+        elif hasattr(source, 'read'):
+            if hasattr(source, 'seek'):
+                try:
+                    source.seek(0)
+                except (OSError, ValueError):
+                    pass
+            for block in iter(lambda: source.read(self.block_size), b''):
+                yield block
+        else:
+            for block in source:
+                if block:
+                    yield block
+
+    def __iter__(self):
+        total = self.len
+        sent = 0
+        for header, source, _ in self._parts:
+            sent += len(header)
+            yield header
+            for block in self._iter_source(source):
+                sent += len(block)
+                yield block
+                if self.progress_callback:
+                    self.progress_callback(sent, total)
+            sent += 2
+            yield b'\r\n'
+        sent += len(self._closing)
+        yield self._closing
+        if self.progress_callback:
+            self.progress_callback(sent, total)
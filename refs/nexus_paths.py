@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import mimetypes
+import threading
+import traceback
+import urllib.parse
+import concurrent.futures
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_mirror import asset_from_index
+
+
+def content_url(root_url, repository, path):
+    """仓库内容地址 /repository/<repo>/<path>"""
+    return f"{root_url}/repository/{repository}/{urllib.parse.quote(path.strip('/'))}"
+
+
+class _SizedStream(object):
+    """已知长度的可迭代请求体"""
+
+    def __init__(self, iterable, size):
+        self._iterable = iterable
+        self._size = size
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def __len__(self):
+        return self._size
+
+
+class ContentClient(object):
+    """直接读写仓库内容地址（/repository/<repo>/<path>）
+
+    HEAD检查文件是否存在，GET时可带If-None-Match做条件请求，PUT以流式请求体上传单个文件；
+    请求经过主机预算和重试，但不调用REST元数据接口。Nexus内容地址的ETag为文件sha1，
+    因此本地已有文件时可直接用其sha1做条件请求。
+    """
+
+    def __init__(self, nexus, block_size=1024 * 1024):
+        self.nexus = nexus
+        self.block_size = block_size
+
+    def _send(self, call_class, method, url, budget, **kwargs):
+        def send():
+            with self.nexus.governor.slot(budget) as slot:
+                res = self.nexus.session_pool.request(method, url, self.nexus._def_account, **kwargs)
+                slot.mark(res.status_code)
+                return res
+        return self.nexus.retry.call(call_class, method, url, send)
+
+    def head(self, repository, path):
+        """返回文件信息{size, etag, last_modified}，不存在返回None"""
+        url = content_url(self.nexus.root_url, repository, path)
+        res = self._send('default', 'HEAD', url, 'metadata', timeout=60, allow_redirects=True)
+        if res.status_code == 404:
+            return None
+        if res.status_code != 200:
+            raise IOError(f'HEAD {url} returned {res.status_code}')
+        size = res.headers.get('Content-Length')
+        return {
+            'size': int(size) if size else None,
+            'etag': res.headers.get('ETag'),
+            'last_modified': res.headers.get('Last-Modified')
+        }
+
+    def fetch(self, repository, path, save_path=None, etag=None):
+        """GET文件内容
+
+        Args:
+            save_path: 保存路径，为None时返回内容bytes；文件已存在且未指定etag时以其sha1做条件请求
+            etag: If-None-Match的值
+
+        Returns:
+            dict: {status: 'downloaded'/'not_modified'/'not_found', content, path, etag, size}
+        """
+        url = content_url(self.nexus.root_url, repository, path)
+        if etag is None and save_path and os.path.exists(save_path):
+            etag = '"%s"' % self.nexus.get_digest_cache().get(save_path)['sha1']
+        headers = {'If-None-Match': etag} if etag else {}
+
+        with self.nexus.downloader.open_stream('GET', url, headers=headers, stream=True, timeout=120) as res:
+            if res.status_code == 304:
+                return {'status': 'not_modified', 'path': save_path, 'etag': etag, 'size': None}
+            if res.status_code == 404:
+                return {'status': 'not_found', 'path': save_path, 'etag': None, 'size': None}
+            if res.status_code != 200:
+                raise IOError(f'GET {url} returned {res.status_code}')
+
+            result = {'status': 'downloaded', 'path': save_path, 'etag': res.headers.get('ETag'), 'size': 0}
+            if not save_path:
+                result['content'] = res.content
+                result['size'] = len(result['content'])
+                return result
+
+            part_path = save_path + '.part'
+            with open(part_path, 'wb') as f:
+                for block in res.iter_content(chunk_size=self.block_size):
+                    if block:
+                        f.write(block)
+                        result['size'] += len(block)
+            os.replace(part_path, save_path)
+            return result
+
+    def put(self, repository, path, source, size=None, content_type=None):
+        """以流式请求体PUT上传单个文件，返回HTTP状态码
+
+        Args:
+            source: 本地文件路径、bytes、每次调用返回新数据的无参函数，或产出bytes的可迭代对象；
+                    可迭代对象只能读取一次，只发送一次，失败不重试
+            size: 数据长度，提供时以Content-Length发送，否则chunked传输
+        """
+        url = content_url(self.nexus.root_url, repository, path)
+        headers = {'Content-Type': content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'}
+        is_path = isinstance(source, (str, os.PathLike))
+        one_shot = not (is_path or callable(source) or isinstance(source, (bytes, bytearray)))
+
+        def request(data):
+            if size is not None and not isinstance(data, (bytes, bytearray)) and not hasattr(data, 'read'):
+                # 带__len__的包装让requests只发Content-Length，不再同时声明chunked
+                data = _SizedStream(data, size) if size else b''
+            return self.nexus.session_pool.request('PUT', url, self.nexus._def_account, data=data,
+                                                   headers=headers, timeout=600)
+
+        def send():
+            with self.nexus.governor.slot('bulk') as slot:
+                if is_path:
+                    # 每次尝试重新打开文件，重试时从头发送
+                    with open(source, 'rb') as f:
+                        res = request(f)
+                elif callable(source):
+                    data = source()
+                    try:
+                        res = request(data)
+                    finally:
+                        if hasattr(data, 'close'):
+                            data.close()
+                else:
+                    res = request(source)
+                slot.mark(res.status_code)
+                return res
+
+        if one_shot:
+            # 已读过的迭代器重发只会得到空的或截断的请求体
+            res = send()
+        else:
+            res = self.nexus.retry.call('upload', 'PUT', url, send)
+        if res.status_code not in (200, 201, 204):
+            logger.error(f'PUT {url} failed: {res.status_code} | {res.text[:200]}')
+        return res.status_code
+
+
+class PathDownloader(object):
+    """按仓库路径下载Raw/Maven2等仓库中的文件
+
+    单个文件直接请求内容地址，不查询资产元数据；目录按路径前缀搜索列出文件后，
+    通过有界线程池并行下载，本地保留相对于前缀的目录结构。
+    """
+
+    def __init__(self, nexus, max_workers=None):
+        self.nexus = nexus
+        self.max_workers = max_workers or nexus.governor.max_workers('bulk')
+
+    def local_path(self, path, download_dir, base_prefix=''):
+        """仓库路径映射为download_dir下的本地路径，拒绝越出下载目录的路径
+
+        base_prefix下的文件保留相对于前缀的目录结构，其余只保留文件名；base_prefix为None时保留完整路径。
+        """
+        path = path.strip('/')
+        if base_prefix is None:
+            relative = path
+        elif base_prefix.strip('/') and path.startswith(base_prefix.strip('/') + '/'):
+            relative = path[len(base_prefix.strip('/')):].strip('/')
+        else:
+            relative = os.path.basename(path)
+        download_dir = os.path.abspath(download_dir)
+        local_path = os.path.abspath(os.path.join(download_dir, relative))
+        if not local_path.startswith(download_dir + os.sep):
+            return None
+        return local_path
+
+    def download(self, repository, path, save_path, asset=None):
+        """下载单个文件
+
+        提供资产元数据时按其downloadUrl下载并校验，并可命中本地缓存；本地已有同名文件时
+        以条件GET请求，内容未变化则不重新下载；否则直接下载内容地址（大文件并行分块）。
+        """
+        save_dir = os.path.dirname(save_path)
+        if save_dir and not os.path.exists(save_dir):
+            os.makedirs(save_dir, exist_ok=True)
+        if asset and asset.get('downloadUrl'):
+            return self.nexus._download_with_cache(asset['downloadUrl'], save_path, asset)
+        if os.path.exists(save_path):
+            result = ContentClient(self.nexus).fetch(repository, path, save_path)
+            return save_path if result['status'] in ('downloaded', 'not_modified') else False
+        return self.nexus.downloader.download(content_url(self.nexus.root_url, repository, path), save_path)
+
+    def list_prefix(self, repository, prefix, use_index=False):
+        """列出路径前缀下的所有资产（递归）"""
+        prefix = prefix.strip('/')
+        index = self.nexus._indexed(repository) if use_index else None
+        if index:
+            return [asset_from_index(row) for row in index.query_assets(repository, path_prefix=prefix + '/')]
+
+        # Raw组件名即文件路径，按名称前缀通配搜索后再按路径精确过滤
+        assets = []
+        for asset in self.nexus.iter_search_assets(repository=repository, name=f'{prefix}/*'):
+            if asset.get('path', '').strip('/').startswith(prefix + '/'):
+                assets.append(asset)
+        return assets
+
+    def download_many(self, repository, assets, download_dir, base_prefix='', on_result=None):
+        """并行下载一组资产
+
+        Returns:
+            dict: {仓库路径: 本地路径或False}
+        """
+        results = {}
+        lock = threading.Lock()
+
+        def download_single(asset):
+            path = asset['path'].strip('/')
+            save_path = self.local_path(path, download_dir, base_prefix)
+            result = False
+            if not save_path:
+                logger.warning(f'跳过越出下载目录的路径: {path}')
+            else:
+                try:
+                    result = self.download(repository, path, save_path, asset)
+                except Exception:
+                    logger.error(traceback.format_exc())
+            with lock:
+                results[path] = result
+            if on_result:
+                on_result(path, result)
+
+        if not assets:
+            return results
+        workers = max(1, min(self.max_workers, len(assets)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(download_single, assets))
+        return results
+
+    def download_prefix(self, repository, prefix, download_dir, use_index=False):
+        """下载路径前缀下的所有文件，返回{仓库路径: 本地路径或False}"""
+        assets = self.list_prefix(repository, prefix, use_index)
+        if not assets:
+            logger.warning(f'目录下没有文件: {repository}/{prefix}')
+            return {}
+        logger.info(f'并行下载 {len(assets)} 个文件: {repository}/{prefix}')
+        return self.download_many(repository, assets, download_dir, base_prefix=prefix)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import threading
+import traceback
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+from refs.nexus_journal import JobJournal
+
+
+DEFAULT_PROMOTE_CONFIG = {
+    'resolve_workers': 8,
+    'transfer_workers': 8,
+    'verify_workers': 4,
+    'delete_workers': 4,
+    'queue_size': 100,
+    'journal_dir': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'jobs')
+}
+
+STAGES = ('resolve', 'transfer', 'verify', 'delete')
+
+_DONE = object()
+
+
+def load_manifest(manifest_path):
+    """读取晋级清单
+
+    .json文件为坐标列表，元素可以是"group:name:version"字符串或{group, name, version}对象；
+    其他文件每行一个"group:name:version"，#开头的行为注释。
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+    coordinates = []
+    for entry in entries:
+        if isinstance(entry, str):
+            parts = entry.rsplit(':', 2)
+            if len(parts) != 3:
+                raise ValueError(f'无效的坐标: {entry}')
+            entry = {'group': parts[0], 'name': parts[1], 'version': parts[2]}
+        coordinates.append({k: entry.get(k) for k in ('group', 'name', 'version')})
+    return coordinates
+
+
+def coordinate_key(item):
+    return f"{item.get('group') or ''}:{item.get('name') or ''}:{item.get('version') or ''}"
+
+
+class Promoter(object):
+    """批量晋级组件的流水线：resolve → transfer → verify → delete
+
+    各阶段由独立线程组处理，阶段之间通过有界队列衔接；每个条目到达的阶段写入
+    JobJournal，相同参数的任务再次运行时跳过已完成条目、从中断的阶段继续。
+    """
+
+    def __init__(self, nexus, source_repo, target_repo, copy=False, verify=True,
+                 journal_path=None, workers=None):
+        config = get_perf_config('promote', DEFAULT_PROMOTE_CONFIG)
+        self.nexus = nexus
+        self.mover = nexus.mover
+        self.source_repo = source_repo
+        self.target_repo = target_repo
+        self.copy = copy
+        self.verify = verify
+        self.journal_path = journal_path
+        self.journal_dir = os.path.expanduser(config['journal_dir'])
+        self.queue_size = config['queue_size']
+        self.workers = {stage: config[f'{stage}_workers'] for stage in STAGES}
+        self.workers.update({k: v for k, v in (workers or {}).items() if v})
+
+        self.journal = None
+        self._lock = threading.Lock()
+        self._summary = None
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._summary[key] += value
+
+    def _fail(self, key, stage, error):
+        logger.error(f'晋级失败 [{stage}] {key}: {error}')
+        with self._lock:
+            self._summary['failed'] += 1
+            self._summary['failures'].append({'key': key, 'stage': stage, 'error': error})
+        try:
+            self.journal.record(key, 'failed', failed_stage=stage, error=error)
+        except Exception:
+            logger.error(f'写入进度日志失败 {key}: {traceback.format_exc()}')
+
+    def _stage_worker(self, stage, fn, in_q, out_q, remaining):
+        # 无论单个条目如何出错，线程都要处理到_DONE并在退出时交接，否则run()会一直等待join
+        try:
+            while True:
+                item = in_q.get()
+                if item is _DONE:
+                    in_q.put(_DONE)
+                    break
+                try:
+                    try:
+                        outputs = fn(item)
+                    except Exception:
+                        self._fail(item.get('key') or coordinate_key(item), stage, traceback.format_exc(limit=3))
+                        outputs = []
+                    for output in outputs:
+                        out_q.put(output)
+                except Exception:
+                    logger.error(f'晋级阶段 {stage} 处理条目出错: {traceback.format_exc()}')
+        finally:
+            with self._lock:
+                remaining[stage] -= 1
+                last = remaining[stage] == 0
+            if last and out_q is not None:
+                out_q.put(_DONE)
+
+    def _resolve(self, item):
+        """把坐标或查询结果解析为待晋级的组件"""
+        key = coordinate_key(item)
+        entry = self.journal.get(key) or {}
+        if entry.get('stage') == 'done':
+            self._count('skipped')
+            return []
+
+        components = [item['component']] if item.get('component') else None
+        if components is None:
+            result = self.nexus.search_components(repository=self.source_repo, group=item.get('group'),
+                                                  name=item.get('name'), version=item.get('version'))
+            if result is False:
+                self._fail(key, 'resolve', 'search failed')
+                return []
+            components = result.get('items', [])
+
+        if not components:
+            # 上次运行已转移但未完成删除/记录时，源组件可能已不存在
+            if 'moved' in entry and entry.get('component'):
+                return [{'key': key, 'component': entry['component'], 'source_gone': True}]
+            logger.warning(f'源仓库中未找到组件: {key}')
+            self._count('not_found')
+            return []
+
+        outputs = []
+        for component in components:
+            component_key = key if len(components) == 1 else f"{key}@{component['id']}"
+            if component_key != key and (self.journal.get(component_key) or {}).get('stage') == 'done':
+                self._count('skipped')
+                continue
+            if 'moved' not in (self.journal.get(component_key) or {}):
+                self.journal.record(component_key, 'resolved', component=component)
+            outputs.append({'key': component_key, 'component': component})
+        return outputs
+
+    def _transfer(self, item):
+        key, component = item['key'], item['component']
+        # 已转移过的条目（包括之后的阶段失败）不再重复转移
+        if 'moved' in (self.journal.get(key) or {}):
+            return [item]
+
+        moved = False
+        if not self.copy:
+            moved = self.mover._staging_move(component, self.target_repo) is True
+        if not moved and not self.mover.copy(component, self.target_repo):
+            self._fail(key, 'transfer', f'copy to {self.target_repo} failed')
+            return []
+
+        size = sum(a.get('fileSize') or 0 for a in self.mover._copyable_assets(component))
+        self._count('bytes', size)
+        self.journal.record(key, 'transferred', moved=moved)
+        return [item]
+
+    def _verify(self, item):
+        key, component = item['key'], item['component']
+        if not self.verify or (self.journal.get(key) or {}).get('verified'):
+            return [item]
+
+        found = {}
+        for asset in self.nexus.iter_search_assets(repository=self.target_repo, group=component.get('group'),
+                                                   name=component.get('name'), version=component.get('version')):
+            found[asset['path']] = (asset.get('checksum') or {}).get('sha1')
+
+        mismatched = []
+        for asset in self.mover._copyable_assets(component):
+            sha1 = (asset.get('checksum') or {}).get('sha1')
+            if asset['path'] not in found or (sha1 and found[asset['path']] and found[asset['path']] != sha1):
+                mismatched.append(asset['path'])
+        if mismatched:
+            self._fail(key, 'verify', f"目标仓库缺少或校验和不一致: {', '.join(mismatched)}")
+            return []
+
+        self.journal.record(key, 'verified', verified=True)
+        return [item]
+
+    def _delete(self, item):
+        key, component = item['key'], item['component']
+        entry = self.journal.get(key) or {}
+        if not (self.copy or entry.get('moved') or item.get('source_gone')):
+            if not self.nexus.delete_component(component['id']):
+                self._fail(key, 'delete', f"delete {component['id']} from {self.source_repo} failed")
+                return []
+
+        self.journal.record(key, 'done')
+        self._count('promoted')
+        return []
+
+    def _default_journal_path(self, job_input):
+        digest = hashlib.sha1(json.dumps(job_input, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.journal_dir, f'promote-{self.source_repo}-{self.target_repo}-{digest}.jsonl')
+
+    def run(self, coordinates=None, query=None):
+        """执行晋级
+
+        Args:
+            coordinates: 坐标列表 [{group, name, version}]
+            query: 搜索条件 {group, name, version, format_type}，与coordinates二选一
+
+        Returns:
+            dict: 汇总 {total, promoted, skipped, not_found, failed, failures, bytes, elapsed}
+        """
+        job_input = {'coordinates': coordinates} if coordinates is not None else {'query': query or {}}
+        params = {'source': self.source_repo, 'target': self.target_repo, 'copy': self.copy,
+                  'input': hashlib.sha1(json.dumps(job_input, sort_keys=True).encode('utf-8')).hexdigest()}
+        self.journal = JobJournal(self.journal_path or self._default_journal_path(job_input), 'promote', params)
+        resumed = self.journal.open()
+        if resumed:
+            logger.info(f'从进度日志恢复 {resumed} 个条目: {self.journal.path}')
+
+        self._summary = {'total': 0, 'promoted': 0, 'skipped': 0, 'not_found': 0, 'failed': 0,
+                         'failures': [], 'bytes': 0, 'elapsed': 0.0, 'journal': self.journal.path}
+        started = time.monotonic()
+
+        queues = {stage: queue.Queue(maxsize=self.queue_size) for stage in STAGES}
+        handlers = {'resolve': self._resolve, 'transfer': self._transfer,
+                    'verify': self._verify, 'delete': self._delete}
+        remaining = dict(self.workers)
+        threads = []
+        for index, stage in enumerate(STAGES):
+            out_q = queues[STAGES[index + 1]] if index + 1 < len(STAGES) else None
+            for _ in range(self.workers[stage]):
+                thread = threading.Thread(target=self._stage_worker,
+                                          args=(stage, handlers[stage], queues[stage], out_q, remaining),
+                                          daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            if coordinates is not None:
+                for coordinate in coordinates:
+                    self._count('total')
+                    queues['resolve'].put(coordinate)
+            else:
+                query = dict(query or {})
+                fed = set()
+                # 先取完全部搜索结果再开始转移，避免组件移出源仓库后分页偏移导致漏项
+                matched = list(self.nexus.iter_search(repository=self.source_repo, **query))
+                for component in matched:
+                    self._count('total')
+                    fed.add(coordinate_key(component))
+                    queues['resolve'].put({'group': component.get('group'), 'name': component.get('name'),
+                                           'version': component.get('version'), 'component': component})
+                # 上次已转移但未完成的组件不会再出现在源仓库的搜索结果中，直接从转移后的阶段继续
+                for key, entry in list(self.journal.entries.items()):
+                    if key not in fed and 'moved' in entry and entry.get('stage') != 'done' and entry.get('component'):
+                        self._count('total')
+                        queues['transfer'].put({'key': key, 'component': entry['component'], 'source_gone': True})
+        finally:
+            queues['resolve'].put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.journal.close()
+
+        self._summary['elapsed'] = round(time.monotonic() - started, 2)
+        return self._summary
@@ -15,11 +15,48 @@ import concurrent.futures
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import hashlib
-import zipfile
+import time
+import threading
 
 PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
 sys.path.append(PUBLIC_LIBS_PATH)
 from refs.env_config import EnvConfig
+from refs.nexus_session import get_session_pool, get_perf_config
+from refs.nexus_index import NexusIndex
+from refs.nexus_downloader import RangeDownloader
+from refs.nexus_artifact_cache import ArtifactCache, DEFAULT_CACHE_CONFIG
+from refs.nexus_multipart import StreamingMultipartEncoder
+from refs.nexus_digest import FileDigestCache
+from refs.nexus_retry import RetryExecutor, CircuitOpenError
+from refs.nexus_governor import get_governor
+from refs.nexus_mover import ComponentMover
+from refs.nexus_promote import Promoter
+from refs.nexus_retention import RetentionPolicy, RetentionEngine
+from refs.nexus_deletion_plan import DeletionPlan
+from refs.nexus_response_cache import ResponseCache, DEFAULT_RESPONSE_CACHE_CONFIG, endpoint_class
+from refs.nexus_resolver import ArtifactResolver, maven_params, LATEST
+from refs.nexus_mirror import RepositoryMirror
+from refs.nexus_tree_upload import TreeUploader
+from refs.nexus_zipstream import ZipStream
+from refs.nexus_paths import PathDownloader, ContentClient
+from refs.nexus_batch import BatchRunner, DEFAULT_BATCH_CONFIG
+from refs.nexus_journal import JobJournal
+
+
+class IncompleteListingError(Exception):
+    """分页列举中途某一页获取失败，已产出的条目不是完整结果
+
+    Attributes:
+        continuation_token: 获取失败的页对应的continuationToken，首页失败时为None
+        yielded: 失败前已产出的条目数
+    """
+
+    def __init__(self, continuation_token=None, yielded=0):
+        self.continuation_token = continuation_token
+        self.yielded = yielded
+        page = f'continuationToken={continuation_token}' if continuation_token else '首页'
+        super().__init__(f'分页列举不完整: 获取{page}失败，此前已产出 {yielded} 个条目')
+
 
 # 延迟导入邮件通知器，避免循环导入
 def get_email_notifier():
@@ -33,9 +70,13 @@ def get_email_notifier():
 
 
 class NexusReq(object):
-    def __init__(self, default_account='admin', default_nexus='nexus', enable_email_notification=False, notification_recipients=None):
+    def __init__(self, default_account='admin', default_nexus='nexus', enable_email_notification=False, notification_recipients=None,
+                 index_db=None, cache_dir=None, response_cache=None):
         self._check_succ_code = [200, 201, 204, 302]
         self._def_account = default_account
+        self.index_db = index_db
+        self._index = None
+        self._digest_cache = None
         self.enable_email_notification = enable_email_notification
         self.notification_recipients = notification_recipients or []
         
@@ -44,6 +85,38 @@ class NexusReq(object):
             self.root_url = EnvConfig.NEXUS_INFO['root_url']
             self.accounts = EnvConfig.NEXUS_INFO['accounts']
         
+        # 按账户复用的长连接Session池（进程内共享）
+        self.session_pool = get_session_pool(self.root_url, self.accounts)
+        
+        # 按调用类别（search/download/delete/upload）重试，并按主机熔断
+        self.retry = RetryExecutor()
+        
+        # 按主机共享的限速与并发预算（元数据调用/大文件传输分开）
+        self.governor = get_governor(self.root_url)
+        
+        # 并行分块下载器（chunk_size/max_parallel可直接调整）
+        self.downloader = RangeDownloader(self.session_pool, self._def_account, retry=self.retry,
+                                          governor=self.governor)
+        
+        # 坐标/资产ID → 下载地址的解析与缓存
+        self.resolver = ArtifactResolver(self)
+        
+        # 仓库间复制/移动组件（staging/move或流式转传）
+        self.mover = ComponentMover(self)
+        
+        # 按校验和寻址的本地构件缓存（指定cache_dir或配置启用时生效）
+        self.artifact_cache = None
+        if cache_dir or get_perf_config('cache', DEFAULT_CACHE_CONFIG)['enabled']:
+            self.artifact_cache = ArtifactCache(cache_dir)
+        
+        # REST响应缓存（response_cache=True或配置启用时生效，也可直接传入ResponseCache实例）
+        self.response_cache = None
+        if isinstance(response_cache, ResponseCache):
+            self.response_cache = response_cache
+        elif response_cache or (response_cache is None and
+                                get_perf_config('response_cache', DEFAULT_RESPONSE_CACHE_CONFIG)['enabled']):
+            self.response_cache = ResponseCache()
+        
         # 初始化SAST配置
         self.sast_config = EnvConfig.SAST_INFO
         
@@ -55,7 +128,19 @@ class NexusReq(object):
                 logger.warning("邮件通知功能初始化失败，将禁用邮件通知")
                 self.enable_email_notification = False
 
-    def _exec(self, api_name, data=None, method='GET', account=None, timeout=120, return_json=True, headers=None, files=None):
+    @staticmethod
+    def _call_class(api_name, method, data, files):
+        """按接口和方法判断调用类别，用于选择重试策略"""
+        if method == 'DELETE':
+            return 'delete'
+        if api_name.startswith('/search'):
+            return 'download' if api_name.startswith('/search/assets/download') else 'search'
+        if method in ['POST', 'PUT'] and (files or isinstance(data, StreamingMultipartEncoder)):
+            return 'upload'
+        return 'default'
+
+    def _exec(self, api_name, data=None, method='GET', account=None, timeout=120, return_json=True, headers=None, files=None,
+              call_class=None):
         """执行HTTP请求的核心方法"""
         if not account:
             account = self._def_account
@@ -66,35 +151,86 @@ class NexusReq(object):
         else:
             api_url = f'{self.root_url}/service/rest/v1{api_name}'
         
-        # 设置认证信息
-        auth = HTTPBasicAuth(
-            self.accounts[account]['username'], 
-            self.accounts[account]['password']
-        )
-        
         # 设置默认请求头
         if not headers:
             headers = {}
             if method in ['POST', 'PUT'] and not files:
                 headers['Content-Type'] = 'application/json'
         
+        call_class = call_class or self._call_class(api_name, method, data, files)
+        budget = 'bulk' if call_class in ['upload', 'download'] else 'metadata'
+        
+        def send():
+            with self.governor.slot(budget) as slot:
+                res = self.session_pool.request(
+                    method, 
+                    api_url, 
+                    account, 
+                    data=data, 
+                    headers=headers, 
+                    timeout=timeout,
+                    files=files
+                )
+                slot.mark(res.status_code)
+                return res
+        
+        # 可缓存的GET请求：新鲜条目直接返回，过期条目带校验器发送条件请求
+        cache = self.response_cache
+        path, _, query = api_name.partition('?')
+        endpoint, resource = endpoint_class(path) if cache else (None, None)
+        cache_key = cached = None
+        if cache and method == 'GET' and return_json and cache.ttl_for(endpoint):
+            cache_key = cache.make_key(account, api_url)
+            cached = cache.get(cache_key)
+            if cached and cache.is_fresh(cached):
+                cache.hit()
+                return json.loads(cached['body'])
+            if cached and (cached['etag'] or cached['last_modified']):
+                headers = dict(headers)
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+        
         try:
             logger.debug(f'nexus api: {method} | {api_url}')
-            res = requests.request(
-                method=method, 
-                url=api_url, 
-                data=data, 
-                auth=auth, 
-                headers=headers, 
-                timeout=timeout,
-                files=files
-            )
+            res = self.retry.call(call_class, method, api_url, send)
             logger.debug(f'response code: {res.status_code}')
             
+            if res.status_code == 304 and cached:
+                cache.refresh(cache_key, cached)
+                cache.hit(revalidated=True)
+                return json.loads(cached['body'])
+            
             if res.status_code not in self._check_succ_code:
                 logger.error(f'{res.status_code} | {res.text}')
                 return False
             
+            if cache and method in ['POST', 'PUT', 'DELETE']:
+                # 写操作成功后使受影响的缓存条目失效；被删除资源的缓存体用于定位其所在仓库
+                previous = None
+                if method == 'DELETE' and resource:
+                    previous = cache.get(cache.make_key(account, f'{self.root_url}/service/rest/v1{path}'))
+                cache.invalidate_for_write(path, query, previous['body'] if previous else None)
+            
+            if method in ['POST', 'PUT', 'DELETE'] and call_class != 'download':
+                # 上传/删除后"latest"等解析结果可能已变化
+                self.resolver.invalidate()
+            
+            if cache_key and res.status_code == 200 and res.text:
+                try:
+                    body = res.json()
+                except json.JSONDecodeError:
+                    body = None
+                if body is not None:
+                    cache.miss()
+                    repository = urllib.parse.parse_qs(query).get('repository', [None])[0]
+                    if isinstance(body, dict) and endpoint in ['component', 'asset']:
+                        repository = body.get('repository')
+                    cache.store(cache_key, endpoint, res.text, repository=repository, resource=resource,
+                                etag=res.headers.get('ETag'), last_modified=res.headers.get('Last-Modified'))
+                    return body
+            
             if return_json and res.text:
                 try:
                     return res.json()
@@ -106,6 +242,9 @@ class NexusReq(object):
             
             return True
             
+        except CircuitOpenError as e:
+            logger.error(f'Request rejected: {e}')
+            return False
         except Exception as e:
             logger.error(f'Request failed: {traceback.format_exc()}')
             return False
@@ -137,6 +276,63 @@ class NexusReq(object):
         except Exception as e:
             logger.warning(f"邮件通知发送失败: {e}")
 
+    def get_connection_stats(self):
+        """获取连接池复用统计"""
+        return self.session_pool.get_stats()
+
+    def get_retry_stats(self):
+        """返回各调用类别的重试计数及各主机熔断器状态"""
+        return self.retry.get_stats()
+
+    def get_governor_stats(self):
+        """返回当前主机元数据/传输预算的并发上限、速率和限流计数"""
+        return self.governor.get_stats()
+
+    def get_cache_stats(self):
+        """获取本地构件缓存的命中统计"""
+        if not self.artifact_cache:
+            return None
+        return self.artifact_cache.get_stats()
+
+    def get_response_cache_stats(self):
+        """获取REST响应缓存的命中、再验证、淘汰和失效统计"""
+        if not self.response_cache:
+            return None
+        return self.response_cache.get_stats()
+
+    def get_resolver_stats(self):
+        """获取坐标解析层的命中和实际查询次数"""
+        return self.resolver.get_stats()
+
+    def _download_with_cache(self, download_url, save_path, asset_info):
+        """按资产校验和先查本地缓存，未命中再下载并写入缓存"""
+        checksum = asset_info.get('checksum') or {}
+        if self.artifact_cache and self.artifact_cache.fetch(checksum, save_path):
+            return save_path
+        
+        # 中断后重新下载会从.part断点续传，完成后按资产校验和验证
+        result = self.downloader.download(download_url, save_path, expected_size=asset_info.get('fileSize'),
+                                          checksum=checksum)
+        if result and self.artifact_cache:
+            self.artifact_cache.store(save_path, checksum)
+        return result
+
+    def get_index(self):
+        """获取本地仓库索引（首次调用时打开）"""
+        if self._index is None:
+            self._index = NexusIndex(self.index_db)
+        return self._index
+
+    def _indexed(self, repository):
+        """返回已完成同步的索引，未同步时返回None"""
+        if not repository:
+            return None
+        index = self.get_index()
+        if index.is_synced(repository):
+            return index
+        logger.warning(f'仓库 {repository} 尚未同步索引，改为在线查询')
+        return None
+
     def _validate_sast_file(self, file_path):
         """验证SAST文件"""
         if not os.path.exists(file_path):
@@ -173,6 +369,56 @@ class NexusReq(object):
             i += 1
         return f"{size_bytes:.1f} {size_names[i]}"
 
+    def get_digest_cache(self):
+        """获取本地文件摘要缓存（首次调用时打开）"""
+        if self._digest_cache is None:
+            self._digest_cache = FileDigestCache()
+        return self._digest_cache
+
+    def _find_unchanged_files(self, repository, remote_paths):
+        """返回仓库中已存在相同内容的本地文件集合
+        
+        Args:
+            remote_paths: {本地文件: 仓库内路径}
+        """
+        digest_cache = self.get_digest_cache()
+        
+        def check_file(local_file):
+            digests = digest_cache.get(local_file)
+            result = self.search_assets(repository=repository, sha1=digests['sha1'])
+            remote_path = remote_paths[local_file].strip('/')
+            for asset in (result or {}).get('items', []):
+                checksum = asset.get('checksum') or {}
+                if asset.get('path', '').strip('/') != remote_path:
+                    continue
+                if checksum.get('sha256') and checksum['sha256'] != digests['sha256']:
+                    continue
+                return True
+            return False
+        
+        unchanged = set()
+        if not remote_paths:
+            return unchanged
+        workers = max(1, min(digest_cache.max_workers, len(remote_paths)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_file = {executor.submit(check_file, f): f for f in remote_paths}
+            for future in concurrent.futures.as_completed(future_to_file):
+                local_file = future_to_file[future]
+                try:
+                    if future.result():
+                        unchanged.add(local_file)
+                except Exception:
+                    logger.warning(f'检查文件是否变化失败，将正常上传 {local_file}: {traceback.format_exc()}')
+        return unchanged
+
+    def _upload_multipart(self, repository, data, files, progress_callback=None, account=None):
+        """以流式multipart请求体调用组件上传接口，文件内容边读边发"""
+        api_name = f'/components?repository={repository}'
+        encoder = StreamingMultipartEncoder(fields=data, files=files, progress_callback=progress_callback)
+        headers = {'Content-Type': encoder.content_type}
+        return self._exec(api_name, data=encoder, method='POST', account=account, headers=headers,
+                          return_json=False)
+
     '''
     ############################## Component APIs ##############################
     '''
@@ -196,33 +442,39 @@ class NexusReq(object):
             logger.error(traceback.format_exc())
             return False
 
-    def get_component(self, component_id):
+    def get_component(self, component_id, account=None):
         """获取单个组件的详细信息"""
         api_name = f'/components/{component_id}'
         try:
-            return self._exec(api_name)
+            return self._exec(api_name, account=account)
         except Exception:
             logger.error(traceback.format_exc())
             return False
 
-    def delete_component(self, component_id):
+    def delete_component(self, component_id, account=None):
         """删除组件"""
         api_name = f'/components/{component_id}'
         try:
-            return self._exec(api_name, method='DELETE', return_json=False)
+            result = self._exec(api_name, method='DELETE', account=account, return_json=False)
+            if result and self._index is not None:
+                self._index.remove_component(component_id)
+            return result
         except Exception:
             logger.error(traceback.format_exc())
             return False
 
     def upload_maven_component(self, repository, group_id, artifact_id, version, 
                              jar_file=None, pom_file=None, sources_file=None, 
-                             javadoc_file=None, generate_pom=False, packaging='jar'):
-        """上传Maven组件"""
+                             javadoc_file=None, generate_pom=False, packaging='jar',
+                             progress_callback=None, skip_unchanged=False):
+        """上传Maven组件
+        
+        progress_callback: 上传进度回调 callback(bytes_sent, total_bytes)
+        skip_unchanged: 所有文件在仓库中已存在且内容相同时跳过上传并返回'unchanged'
+        """
         operation = "Maven组件上传"
         component_name = f"{group_id}:{artifact_id}:{version}"
         
-        api_name = f'/components?repository={repository}'
-        
         files = {}
         data = {
             'maven2.groupId': group_id,
@@ -237,21 +489,21 @@ class NexusReq(object):
         
         # 添加主jar文件
         if jar_file:
-            files[f'maven2.asset{asset_count}'] = open(jar_file, 'rb')
+            files[f'maven2.asset{asset_count}'] = jar_file
             data[f'maven2.asset{asset_count}.extension'] = 'jar'
             uploaded_files.append(jar_file)
             asset_count += 1
         
         # 添加POM文件
         if pom_file:
-            files[f'maven2.asset{asset_count}'] = open(pom_file, 'rb')
+            files[f'maven2.asset{asset_count}'] = pom_file
             data[f'maven2.asset{asset_count}.extension'] = 'pom'
             uploaded_files.append(pom_file)
             asset_count += 1
         
         # 添加源码文件
         if sources_file:
-            files[f'maven2.asset{asset_count}'] = open(sources_file, 'rb')
+            files[f'maven2.asset{asset_count}'] = sources_file
             data[f'maven2.asset{asset_count}.extension'] = 'jar'
             data[f'maven2.asset{asset_count}.classifier'] = 'sources'
             uploaded_files.append(sources_file)
@@ -259,14 +511,28 @@ class NexusReq(object):
         
         # 添加javadoc文件
         if javadoc_file:
-            files[f'maven2.asset{asset_count}'] = open(javadoc_file, 'rb')
+            files[f'maven2.asset{asset_count}'] = javadoc_file
             data[f'maven2.asset{asset_count}.extension'] = 'jar'
             data[f'maven2.asset{asset_count}.classifier'] = 'javadoc'
             uploaded_files.append(javadoc_file)
             asset_count += 1
         
         try:
-            result = self._exec(api_name, data=data, method='POST', files=files, return_json=False)
+            if skip_unchanged and uploaded_files:
+                # 按Maven布局计算每个文件在仓库中的路径
+                base_path = f"{group_id.replace('.', '/')}/{artifact_id}/{version}/{artifact_id}-{version}"
+                remote_paths = {}
+                for index in range(1, asset_count):
+                    classifier = data.get(f'maven2.asset{index}.classifier')
+                    extension = data[f'maven2.asset{index}.extension']
+                    suffix = f'-{classifier}' if classifier else ''
+                    remote_paths[files[f'maven2.asset{index}']] = f'{base_path}{suffix}.{extension}'
+                
+                if len(self._find_unchanged_files(repository, remote_paths)) == len(remote_paths):
+                    logger.info(f"Maven组件内容未变化，跳过上传: {component_name}")
+                    return 'unchanged'
+            
+            result = self._upload_multipart(repository, data, files, progress_callback)
             
             # 发送邮件通知
             details = {
@@ -300,17 +566,15 @@ class NexusReq(object):
             }
             self._send_notification(operation, False, details=details, error_message=error_msg)
             return False
-            
-        finally:
-            # 关闭所有文件句柄
-            for file_handle in files.values():
-                file_handle.close()
 
-    def upload_raw_component(self, repository, directory, local_files):
-        """上传Raw格式的组件"""
-        operation = "Raw组件上传"
+    def upload_raw_component(self, repository, directory, local_files, progress_callback=None,
+                             skip_unchanged=False):
+        """上传Raw格式的组件
         
-        api_name = f'/components?repository={repository}'
+        progress_callback: 上传进度回调 callback(bytes_sent, total_bytes)
+        skip_unchanged: 跳过仓库中已存在且内容相同的文件，全部相同时返回'unchanged'
+        """
+        operation = "Raw组件上传"
         
         files = {}
         data = {
@@ -320,15 +584,51 @@ class NexusReq(object):
         if isinstance(local_files, str):
             local_files = [local_files]
         
+        if skip_unchanged:
+            try:
+                remote_paths = {f: f"{directory.strip('/')}/{os.path.basename(f)}" for f in local_files}
+                unchanged = self._find_unchanged_files(repository, remote_paths)
+            except Exception:
+                logger.warning(f'检查文件是否变化失败，将正常上传: {traceback.format_exc()}')
+                unchanged = set()
+            if unchanged:
+                logger.info(f"跳过内容未变化的文件: {', '.join(os.path.basename(f) for f in unchanged)}")
+                local_files = [f for f in local_files if f not in unchanged]
+            if not local_files:
+                logger.info(f"Raw组件内容未变化，跳过上传: {directory}")
+                return 'unchanged'
+        
+        if len(local_files) == 1 and not progress_callback:
+            # 单个文件直接PUT到内容地址；无PUT权限（403/405）时退回multipart上传
+            file_path = local_files[0]
+            remote_path = f"{directory.strip('/')}/{os.path.basename(file_path)}".strip('/')
+            try:
+                status = ContentClient(self).put(repository, remote_path, file_path)
+            except Exception:
+                logger.warning(f'PUT上传失败，改用multipart上传: {traceback.format_exc()}')
+                status = None
+            if status in [200, 201, 204]:
+                self._invalidate_after_put(repository)
+                details = {'仓库': repository, '目录': directory, '文件数量': 1,
+                           '文件列表': os.path.basename(file_path)}
+                self._send_notification(operation, True, details=details)
+                logger.info(f"Raw组件上传成功: {directory}")
+                return True
+            if status not in [None, 403, 405]:
+                details = {'仓库': repository, '目录': directory, '文件数量': 1,
+                           '文件列表': os.path.basename(file_path)}
+                self._send_notification(operation, False, details=details, error_message=f"上传请求失败: {status}")
+                return False
+        
         uploaded_files = []
         for index, file_path in enumerate(local_files, 1):
             file_name = os.path.basename(file_path)
-            files[f'raw.asset{index}'] = open(file_path, 'rb')
+            files[f'raw.asset{index}'] = file_path
             data[f'raw.asset{index}.filename'] = file_name
             uploaded_files.append(file_name)
         
         try:
-            result = self._exec(api_name, data=data, method='POST', files=files, return_json=False)
+            result = self._upload_multipart(repository, data, files, progress_callback)
             
             # 发送邮件通知
             details = {
@@ -358,28 +658,63 @@ class NexusReq(object):
             }
             self._send_notification(operation, False, details=details, error_message=error_msg)
             return False
-            
-        finally:
-            # 关闭所有文件句柄
-            for file_handle in files.values():
-                file_handle.close()
 
-    def upload_npm_component(self, repository, npm_package_file):
-        """上传NPM包"""
-        api_name = f'/components?repository={repository}'
+    def upload_tree(self, repository, local_dir, remote_dir='', max_workers=None, skip_unchanged=True,
+                    dry_run=False, batch_bytes=None, large_file_size=None, progress_callback=None, verify=False):
+        """把本地目录树上传到Raw仓库，保留相对路径
+        
+        Args:
+            repository: Raw仓库名称
+            local_dir: 本地目录
+            remote_dir: 仓库内的目标目录，默认为仓库根目录
+            max_workers: 并行上传的批次数，默认使用传输预算的并发上限
+            skip_unchanged: 按本地上传清单跳过sha1未变化的文件
+            dry_run: 只统计需要上传的文件
+            batch_bytes: 单个multipart批次的字节数上限
+            large_file_size: 不小于该大小的文件单独上传
+            progress_callback: 每个批次完成时回调 callback(done_files, total_files)
+            verify: 对清单中未变化的文件先HEAD确认仓库中仍存在且一致，缺失或不一致的重新上传
+        
+        Returns:
+            dict: {files, uploaded, skipped, failed, batches, bytes, elapsed, failures}
+        """
+        operation = "Raw目录上传"
+        try:
+            uploader = TreeUploader(self, repository, local_dir, remote_dir, max_workers=max_workers,
+                                    batch_bytes=batch_bytes, large_file_size=large_file_size,
+                                    skip_unchanged=skip_unchanged, verify=verify)
+            stats = uploader.run(dry_run=dry_run, progress_callback=progress_callback)
+        except Exception as e:
+            logger.error(traceback.format_exc())
+            self._send_notification(operation, False, details={'仓库': repository, '本地目录': local_dir},
+                                    error_message=f"上传过程中发生异常: {str(e)}")
+            return False
         
+        if not dry_run and (stats['uploaded'] or stats['failed']):
+            details = {
+                '仓库': repository,
+                '目录': remote_dir or '/',
+                '文件数量': stats['uploaded'],
+                '跳过': stats['skipped']
+            }
+            if stats['failed']:
+                self._send_notification(operation, False, details=details,
+                                        error_message=f"{stats['failed']} 个文件上传失败")
+            else:
+                self._send_notification(operation, True, details=details)
+        return stats
+
+    def upload_npm_component(self, repository, npm_package_file, progress_callback=None):
+        """上传NPM包"""
         files = {
-            'npm.asset': open(npm_package_file, 'rb')
+            'npm.asset': npm_package_file
         }
         
         try:
-            result = self._exec(api_name, method='POST', files=files, return_json=False)
-            return result
+            return self._upload_multipart(repository, {}, files, progress_callback)
         except Exception:
             logger.error(traceback.format_exc())
             return False
-        finally:
-            files['npm.asset'].close()
 
     '''
     ############################## Asset APIs ##############################
@@ -423,8 +758,8 @@ class NexusReq(object):
 
     def download_asset(self, asset_id, save_path=None):
         """下载资产"""
-        # 首先获取资产信息
-        asset_info = self.get_asset(asset_id)
+        # 首先获取资产信息（已解析过的资产直接使用缓存的元数据）
+        asset_info = self.resolver.resolve_asset(asset_id)
         if not asset_info:
             return False
         
@@ -434,28 +769,16 @@ class NexusReq(object):
             return False
         
         try:
-            # 直接下载文件
-            auth = HTTPBasicAuth(
-                self.accounts[self._def_account]['username'], 
-                self.accounts[self._def_account]['password']
-            )
+            # 如果没有指定保存路径，从资产信息中获取文件名
+            if not save_path:
+                filename = os.path.basename(asset_info.get('path', f'asset_{asset_id}'))
+                save_path = filename
             
-            response = requests.get(download_url, auth=auth, stream=True)
-            if response.status_code == 200:
-                # 如果没有指定保存路径，从资产信息中获取文件名
-                if not save_path:
-                    filename = os.path.basename(asset_info.get('path', f'asset_{asset_id}'))
-                    save_path = filename
-                
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
+            # 优先使用本地缓存，否则通过连接池下载（大文件自动并行分块）
+            result = self._download_with_cache(download_url, save_path, asset_info)
+            if result:
                 logger.info(f'Asset downloaded successfully: {save_path}')
-                return save_path
-            else:
-                logger.error(f'Download failed: {response.status_code}')
-                return False
+            return result
         except Exception:
             logger.error(traceback.format_exc())
             return False
@@ -465,8 +788,17 @@ class NexusReq(object):
     '''
 
     def search_components(self, repository=None, group=None, name=None, version=None, 
-                         format_type=None, continuation_token=None, **kwargs):
-        """搜索组件"""
+                         format_type=None, continuation_token=None, use_index=False, **kwargs):
+        """搜索组件
+        
+        use_index=True 且仓库已同步索引时，直接从本地索引返回全部匹配结果
+        """
+        if use_index and not kwargs and not format_type:
+            index = self._indexed(repository)
+            if index:
+                items = index.query_components(repository, group=group, name=name, version=version)
+                return {'items': items, 'continuationToken': None}
+        
         api_name = '/search'
         params = {}
         
@@ -528,89 +860,198 @@ class NexusReq(object):
 
     def search_and_download_asset(self, save_path=None, repository=None, group=None, 
                                  name=None, version=None, **kwargs):
-        """搜索并下载资产"""
-        api_name = '/search/assets/download'
-        params = {}
+        """搜索并下载资产
         
-        if repository:
-            params['repository'] = repository
-        if group:
-            params['group'] = group
-        if name:
-            params['name'] = name
-        if version:
-            params['version'] = version
+        通过解析层得到资产元数据后直接经连接池下载；未指定version时下载最新版本。
+        """
+        # 排序由解析层处理
+        kwargs.pop('sort', None)
+        kwargs.pop('direction', None)
         
-        # 添加其他搜索参数
-        params.update(kwargs)
+        try:
+            asset_info = self.resolver.resolve(repository, group, name, version, **kwargs)
+            if not asset_info:
+                logger.error(f'Asset not found: {group}:{name}:{version or LATEST}')
+                return False
+            
+            # 如果没有指定保存路径，从资产路径中推断文件名
+            if not save_path:
+                save_path = os.path.basename(asset_info.get('path', f'{name}-{version or LATEST}'))
+            
+            # 优先使用本地缓存，否则通过连接池下载（大文件自动并行分块）
+            result = self._download_with_cache(asset_info['downloadUrl'], save_path, asset_info)
+            if result:
+                logger.info(f'Asset downloaded successfully: {save_path}')
+            return result
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def download_latest_version(self, repository, group, name, extension='jar', 
+                               classifier=None, save_path=None):
+        """下载最新版本的资产（最新版本的解析结果按latest_ttl短期缓存）"""
+        return self.search_and_download_asset(save_path, repository=repository, group=group, name=name,
+                                              version=LATEST, **maven_params(extension, classifier))
+
+    def download_coordinates(self, coordinates, download_dir='./downloads', max_workers=None):
+        """批量下载坐标对应的资产
         
-        query_string = urllib.parse.urlencode(params)
-        api_name_with_params = f'{api_name}?{query_string}'
+        Args:
+            coordinates: [{repository, group, name, version, extension, classifier}]，
+                         version为空或'latest'时下载最新版本
+            download_dir: 下载目录
+            max_workers: 最大并发数，默认使用传输预算的并发上限
         
+        Returns:
+            dict: {"group:name:version": 保存路径或False}
+        """
+        if not os.path.exists(download_dir):
+            os.makedirs(download_dir)
+        
+        # 同一group:name的多个版本合并为一次搜索解析
+        assets = self.resolver.resolve_many(coordinates)
+        
+        asset_list = []
+        results = {}
+        for coordinate, asset in zip(coordinates, assets):
+            key = f"{coordinate.get('group') or ''}:{coordinate.get('name')}:{coordinate.get('version') or LATEST}"
+            if asset:
+                asset_list.append(dict(asset, key=key))
+            else:
+                results[key] = False
+        
+        downloaded = self.batch_download_assets(asset_list, download_dir, max_workers)
+        if downloaded is False:
+            return False
+        for asset in asset_list:
+            results[asset['key']] = downloaded.get(asset['id'], False)
+        return results
+
+    def download_asset_by_path(self, repository, path, download_dir=None, save_path=None):
+        """按仓库内路径直接下载文件（/repository/<repo>/<path>），不查询资产元数据
+        
+        Args:
+            repository: 仓库名称
+            path: 仓库内文件路径
+            download_dir: 下载目录，默认为当前目录，文件名取路径的最后一段
+            save_path: 保存路径，指定时忽略download_dir
+        """
         try:
-            # 这个API会返回302重定向到下载URL
-            download_url = self._exec(api_name_with_params, return_json=False)
-            if download_url and download_url != True:
-                # 执行实际下载
-                auth = HTTPBasicAuth(
-                    self.accounts[self._def_account]['username'], 
-                    self.accounts[self._def_account]['password']
-                )
-                
-                response = requests.get(download_url, auth=auth, stream=True)
-                if response.status_code == 200:
-                    # 如果没有指定保存路径，从URL中推断文件名
-                    if not save_path:
-                        filename = os.path.basename(urllib.parse.urlparse(download_url).path)
-                        save_path = filename
-                    
-                    with open(save_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    logger.info(f'Asset downloaded successfully: {save_path}')
-                    return save_path
-                else:
-                    logger.error(f'Download failed: {response.status_code}')
-                    return False
+            if not save_path:
+                save_path = os.path.join(download_dir or os.getcwd(), os.path.basename(path.strip('/')))
+            result = PathDownloader(self).download(repository, path, save_path)
+            if result:
+                logger.info(f'File downloaded successfully: {save_path}')
+            return result
+        except Exception:
+            logger.error(traceback.format_exc())
             return False
+
+    def path_exists(self, repository, path):
+        """HEAD检查仓库内路径是否存在，存在时返回{size, etag, last_modified}，不存在返回None，出错返回False"""
+        try:
+            return ContentClient(self).head(repository, path)
         except Exception:
             logger.error(traceback.format_exc())
             return False
 
-    def download_latest_version(self, repository, group, name, extension='jar', 
-                               classifier=None, save_path=None):
-        """下载最新版本的资产"""
-        params = {
-            'sort': 'version',
-            'repository': repository,
-            'group': group,
-            'name': name,
-            'maven.extension': extension
-        }
+    def fetch_path(self, repository, path, save_path=None, if_none_match=None):
+        """按仓库内路径GET文件，支持If-None-Match条件请求
         
-        if classifier:
-            params['maven.classifier'] = classifier
-        else:
-            params['maven.classifier'] = ''  # 空分类器
+        Args:
+            save_path: 保存路径，为None时结果中返回content；文件已存在时自动以其sha1做条件请求
+            if_none_match: 显式指定的ETag
+        
+        Returns:
+            dict: {status: downloaded/not_modified/not_found, content, path, etag, size}，出错返回False
+        """
+        try:
+            return ContentClient(self).fetch(repository, path, save_path, if_none_match)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def put_path(self, repository, path, source, size=None, content_type=None):
+        """以流式PUT把单个文件写入仓库内路径（Raw/Maven2 hosted仓库），不经过multipart表单
         
-        return self.search_and_download_asset(save_path, **params)
+        Args:
+            source: 本地文件路径、bytes、每次调用返回新数据的无参函数（可重试），或产出bytes的可迭代对象（只发送一次）
+            size: 数据长度，提供时以Content-Length发送，否则chunked传输
+        """
+        try:
+            status = ContentClient(self).put(repository, path, source, size, content_type)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+        if status not in [200, 201, 204]:
+            return False
+        self._invalidate_after_put(repository)
+        return True
+
+    def _invalidate_after_put(self, repository):
+        """内容地址的写入不经过_exec，需在这里使响应缓存和解析结果失效"""
+        if self.response_cache:
+            self.response_cache.invalidate([repository])
+        self.resolver.invalidate()
+
+    def download_directory(self, repository, prefix, download_dir=None, max_workers=None, use_index=False):
+        """并行下载仓库中某个目录（路径前缀）下的所有文件，本地保留相对目录结构
+        
+        Returns:
+            dict: {仓库路径: 本地路径或False}
+        """
+        download_dir = download_dir or os.path.join(os.getcwd(), os.path.basename(prefix.strip('/')))
+        try:
+            return PathDownloader(self, max_workers).download_prefix(repository, prefix, download_dir, use_index)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
 
     '''
     ############################## Batch Operations ##############################
     '''
 
-    def batch_download_assets(self, asset_list, download_dir='./downloads', max_workers=5):
+    def _open_job_journal(self, job_id, job_type, params=None):
+        """按任务ID打开批量操作的进度日志，未指定job_id时返回None"""
+        if not job_id:
+            return None
+        journal = JobJournal.for_job(job_id, job_type, params)
+        resumed = journal.open()
+        if resumed:
+            logger.info(f'从进度日志恢复 {resumed} 个条目: {journal.path}')
+        return journal
+
+    def batch_download_assets(self, asset_list, download_dir='./downloads', max_workers=None, job_id=None):
         """批量下载资产
         
         Args:
-            asset_list: 资产列表，每个元素应包含asset_id和filename（可选）
+            asset_list: 资产列表，每个元素为资产ID或包含asset_id/id和filename（可选）的字典；
+                        字典带有downloadUrl（如搜索结果）时不再查询资产元数据
             download_dir: 下载目录
-            max_workers: 最大并发数
+            max_workers: 最大并发数，默认使用传输预算的并发上限（实际并发由主机预算动态控制）
+            job_id: 任务ID，指定时每个下载完成的资产写入进度日志，以相同job_id重新执行时跳过
+                    已下载且本地文件仍存在的资产
         """
+        max_workers = max_workers or self.governor.max_workers('bulk')
         if not os.path.exists(download_dir):
             os.makedirs(download_dir)
         
+        results = {}
+        journal = self._open_job_journal(job_id, 'batch-download', {'download_dir': os.path.abspath(download_dir)})
+        if journal:
+            done = journal.completed()
+            pending = []
+            for asset in asset_list:
+                asset_id = asset if isinstance(asset, str) else asset.get('asset_id') or asset.get('id')
+                entry = done.get(asset_id)
+                if entry and (not entry.get('path') or os.path.exists(entry['path'])):
+                    results[asset_id] = entry.get('path') or True
+                else:
+                    pending.append(asset)
+            if results:
+                logger.info(f'跳过进度日志中已下载的 {len(results)} 个资产')
+            asset_list = pending
+        
         def download_single_asset(asset_info):
             if isinstance(asset_info, str):
                 asset_id = asset_info
@@ -618,16 +1059,19 @@ class NexusReq(object):
             else:
                 asset_id = asset_info.get('asset_id') or asset_info.get('id')
                 filename = asset_info.get('filename')
+                self.resolver.remember(asset_info)
             
-            if filename:
-                save_path = os.path.join(download_dir, filename)
-            else:
-                save_path = None
+            if not filename:
+                resolved = self.resolver.resolve_asset(asset_id)
+                if not resolved:
+                    logger.error(f'Asset not found: {asset_id}')
+                    return asset_id, False
+                filename = os.path.basename(resolved.get('path') or f'asset_{asset_id}')
+            save_path = os.path.join(download_dir, filename)
             
             result = self.download_asset(asset_id, save_path)
             return asset_id, result
         
-        results = {}
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 future_to_asset = {executor.submit(download_single_asset, asset): asset 
@@ -640,6 +1084,9 @@ class NexusReq(object):
                         results[asset_id] = result
                         if result:
                             logger.info(f'Successfully downloaded asset: {asset_id}')
+                            if journal:
+                                journal.record(asset_id, 'done',
+                                               path=os.path.abspath(result) if isinstance(result, str) else None)
                         else:
                             logger.error(f'Failed to download asset: {asset_id}')
                     except Exception as exc:
@@ -649,15 +1096,36 @@ class NexusReq(object):
         except Exception:
             logger.error(traceback.format_exc())
             return False
+        finally:
+            if journal:
+                journal.close()
         
         return results
 
-    def batch_delete_components(self, component_ids, max_workers=3):
-        """批量删除组件"""
+    def batch_delete_components(self, component_ids, max_workers=None, plan_path=None, repository=None,
+                                job_id=None):
+        """批量删除组件
+        
+        指定plan_path时不删除，而是从repository的分页列表中取出这些组件的坐标和大小，
+        写成删除计划并返回计划摘要，之后通过execute_deletion_plan执行。
+        指定job_id时删除成功的组件写入进度日志，以相同job_id重新执行时跳过。
+        """
+        if plan_path:
+            return self._plan_batch_delete(component_ids, plan_path, repository)
+        
+        max_workers = max_workers or self.governor.max_workers('metadata')
         def delete_single_component(component_id):
             return component_id, self.delete_component(component_id)
         
         results = {}
+        journal = self._open_job_journal(job_id, 'batch-delete')
+        if journal:
+            done = journal.completed()
+            results = {comp_id: True for comp_id in component_ids if comp_id in done}
+            if results:
+                logger.info(f'跳过进度日志中已删除的 {len(results)} 个组件')
+            component_ids = [comp_id for comp_id in component_ids if comp_id not in done]
+        
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 future_to_component = {executor.submit(delete_single_component, comp_id): comp_id 
@@ -670,6 +1138,8 @@ class NexusReq(object):
                         results[comp_id] = result
                         if result:
                             logger.info(f'Successfully deleted component: {comp_id}')
+                            if journal:
+                                journal.record(comp_id, 'done')
                         else:
                             logger.error(f'Failed to delete component: {comp_id}')
                     except Exception as exc:
@@ -678,97 +1148,99 @@ class NexusReq(object):
         except Exception:
             logger.error(traceback.format_exc())
             return False
+        finally:
+            if journal:
+                journal.close()
         
         return results
 
+    def _plan_batch_delete(self, component_ids, plan_path, repository):
+        """为指定组件生成删除计划"""
+        if not repository:
+            logger.error('生成删除计划需要指定组件所在的仓库')
+            return False
+        try:
+            plan, missing = DeletionPlan.from_components(self.iter_components(repository), component_ids, repository)
+            if missing:
+                logger.warning(f'仓库 {repository} 中未找到 {len(missing)} 个组件，已从计划中排除')
+            plan.save(plan_path)
+            summary = plan.summary()
+            summary['missing'] = missing
+            return summary
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def execute_deletion_plan(self, plan_path, max_workers=None):
+        """执行删除计划
+        
+        进度写入<plan_path>.progress.jsonl，中断后再次执行时跳过已删除的组件，不需要重新搜索。
+        
+        Returns:
+            dict: {components, deleted, skipped, failed, bytes_freed, failures}
+        """
+        try:
+            plan = DeletionPlan.load(plan_path)
+            engine = RetentionEngine(self, RetentionPolicy(), max_workers=max_workers)
+            return plan.execute(engine)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
     '''
     ############################## Repository Management ##############################
     '''
 
-    def move_component_between_repositories(self, source_repo, target_repo, component_id):
-        """在仓库间移动组件（通过下载再上传实现）"""
+    def move_component_between_repositories(self, source_repo, target_repo, component_id, account=None):
+        """在仓库间移动组件
+        
+        优先使用staging/move接口在服务端移动；不可用时把下载流直接作为上传请求体
+        写入目标仓库（不落盘），成功后删除源组件。source_repo仅用于兼容旧调用，以组件实际所在仓库为准。
+        account为空时使用默认账户。
+        """
+        return self.mover.transfer(component_id, target_repo, account=account)
+
+    def copy_component_between_repositories(self, source_repo, target_repo, component_id, account=None):
+        """在仓库间复制组件（流式下载+上传，不删除源组件）"""
+        return self.mover.transfer(component_id, target_repo, copy=True, account=account)
+
+    def move_components(self, component_ids, target_repo, copy=False, max_workers=None, account=None):
+        """并行移动（或复制）多个组件
+        
+        Args:
+            component_ids: 组件ID列表
+            target_repo: 目标仓库
+            copy: True时只复制不删除源组件
+            max_workers: 并行组件数，默认使用传输预算的并发上限
+            account: 执行移动的账户，默认使用默认账户
+        
+        Returns:
+            dict: {component_id: 是否成功}
+        """
+        return self.mover.transfer_many(component_ids, target_repo, copy=copy, max_workers=max_workers,
+                                        account=account)
+
+    def promote_many(self, source_repo, target_repo, coordinates=None, query=None, copy=False,
+                     verify=True, journal_path=None, workers=None):
+        """批量晋级组件（resolve → transfer → verify → delete）
+        
+        Args:
+            source_repo: 源仓库
+            target_repo: 目标仓库
+            coordinates: 坐标列表 [{group, name, version}]，可由nexus_promote.load_manifest读取清单得到
+            query: 搜索条件 {group, name, version, format_type}，与coordinates二选一
+            copy: True时只复制不删除源组件
+            verify: 转移后是否校验目标仓库中的资产路径和sha1
+            journal_path: 进度日志路径，默认按参数生成，相同参数再次运行时自动续跑
+            workers: 各阶段线程数 {'resolve': 8, 'transfer': 8, 'verify': 4, 'delete': 4}
+        
+        Returns:
+            dict: 汇总 {total, promoted, skipped, not_found, failed, failures, bytes, elapsed, journal}
+        """
         try:
-            # 获取组件信息
-            component = self.get_component(component_id)
-            if not component:
-                logger.error(f'Failed to get component info: {component_id}')
-                return False
-            
-            # 下载所有资产
-            assets = component.get('assets', [])
-            temp_files = []
-            
-            for asset in assets:
-                asset_id = asset['id']
-                temp_file = f"temp_{asset_id}_{os.path.basename(asset['path'])}"
-                result = self.download_asset(asset_id, temp_file)
-                if result:
-                    temp_files.append((temp_file, asset))
-                else:
-                    logger.error(f'Failed to download asset: {asset_id}')
-            
-            if not temp_files:
-                return False
-            
-            # 根据格式重新上传到目标仓库
-            format_type = component.get('format')
-            success = False
-            
-            if format_type == 'maven2':
-                # Maven格式处理
-                jar_file = None
-                pom_file = None
-                sources_file = None
-                javadoc_file = None
-                
-                for temp_file, asset in temp_files:
-                    path = asset['path']
-                    if path.endswith('.jar'):
-                        if 'sources' in path:
-                            sources_file = temp_file
-                        elif 'javadoc' in path:
-                            javadoc_file = temp_file
-                        else:
-                            jar_file = temp_file
-                    elif path.endswith('.pom'):
-                        pom_file = temp_file
-                
-                success = self.upload_maven_component(
-                    target_repo, 
-                    component['group'], 
-                    component['name'], 
-                    component['version'],
-                    jar_file=jar_file,
-                    pom_file=pom_file,
-                    sources_file=sources_file,
-                    javadoc_file=javadoc_file
-                )
-            
-            elif format_type == 'raw':
-                # Raw格式处理
-                file_list = [temp_file for temp_file, _ in temp_files]
-                directory = os.path.dirname(assets[0]['path'])
-                success = self.upload_raw_component(target_repo, directory, file_list)
-            
-            # 清理临时文件
-            for temp_file, _ in temp_files:
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-            
-            if success:
-                # 删除源组件
-                delete_result = self.delete_component(component_id)
-                if delete_result:
-                    logger.info(f'Successfully moved component {component_id} from {source_repo} to {target_repo}')
-                    return True
-                else:
-                    logger.warning(f'Component uploaded to {target_repo} but failed to delete from {source_repo}')
-                    return True
-            
-            return False
-            
+            promoter = Promoter(self, source_repo, target_repo, copy=copy, verify=verify,
+                                journal_path=journal_path, workers=workers)
+            return promoter.run(coordinates=coordinates, query=query)
         except Exception:
             logger.error(traceback.format_exc())
             return False
@@ -777,53 +1249,157 @@ class NexusReq(object):
     ############################## Utility Methods ##############################
     '''
 
-    def get_all_components_in_repository(self, repository):
-        """获取仓库中的所有组件"""
-        all_components = []
-        continuation_token = None
+    def _iter_pages(self, fetch_page, prefetch=True):
+        """按continuationToken逐页产出条目
         
+        Args:
+            fetch_page: 接收continuation_token并返回分页结果的函数
+            prefetch: 是否在调用方处理当前页时后台预取下一页
+
+        Raises:
+            IncompleteListingError: 某一页（含首页）获取失败，调用方自行决定中止还是按部分结果继续
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1) if prefetch else None
+        yielded = 0
         try:
+            continuation_token = None
+            result = fetch_page(None)
             while True:
-                result = self.list_components(repository, continuation_token)
                 if not result:
-                    break
+                    logger.error(f'Failed to fetch page: {continuation_token}')
+                    raise IncompleteListingError(continuation_token, yielded)
+                continuation_token = result.get('continuationToken')
+                next_page = None
+                if continuation_token and executor:
+                    next_page = executor.submit(fetch_page, continuation_token)
                 
-                components = result.get('items', [])
-                all_components.extend(components)
+                for item in result.get('items', []):
+                    yielded += 1
+                    yield item
                 
-                continuation_token = result.get('continuationToken')
                 if not continuation_token:
                     break
-            
-            return all_components
+                result = next_page.result() if next_page else fetch_page(continuation_token)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_components(self, repository, prefetch=True):
+        """逐页流式遍历仓库中的组件"""
+        return self._iter_pages(
+            lambda token: self.list_components(repository, token), prefetch=prefetch)
+
+    def iter_assets(self, repository, prefetch=True):
+        """逐页流式遍历仓库中的资产"""
+        return self._iter_pages(
+            lambda token: self.list_assets(repository, token), prefetch=prefetch)
+
+    def iter_search(self, repository=None, group=None, name=None, version=None,
+                    format_type=None, prefetch=True, **kwargs):
+        """逐页流式遍历组件搜索结果"""
+        return self._iter_pages(
+            lambda token: self.search_components(repository, group, name, version, format_type,
+                                                 continuation_token=token, **kwargs),
+            prefetch=prefetch)
+
+    def iter_search_assets(self, repository=None, group=None, name=None, version=None,
+                           format_type=None, prefetch=True, **kwargs):
+        """逐页流式遍历资产搜索结果"""
+        return self._iter_pages(
+            lambda token: self.search_assets(repository, group, name, version, format_type,
+                                             continuation_token=token, **kwargs),
+            prefetch=prefetch)
+
+    def sync_repository_index(self, repository, full=False):
+        """增量同步仓库内容到本地索引，中断后再次调用会从断点继续"""
+        try:
+            return self.get_index().sync(self, repository, full=full)
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def sync_repository_to_dir(self, repository, dest, prune=False, max_workers=None, use_index=False,
+                               dry_run=False, manifest_path=None):
+        """把仓库镜像到本地目录，只下载新增或变化的资产
+        
+        Args:
+            repository: 仓库名称
+            dest: 本地目录，资产按仓库内路径存放，清单默认保存在dest/.nexus_mirror.db
+            prune: 完整遍历成功后删除上游已不存在的本地文件
+            max_workers: 并发下载数，默认使用传输预算的并发上限
+            use_index: 仓库已同步本地索引时从索引读取资产列表，不再分页请求
+            dry_run: 只统计需要下载/清理的文件
+        
+        Returns:
+            dict: {assets, downloaded, unchanged, failed, pruned, bytes, elapsed, complete, failures}
+        """
+        try:
+            mirror = RepositoryMirror(self, repository, dest, prune=prune, max_workers=max_workers,
+                                      use_index=use_index, manifest_path=manifest_path)
+            return mirror.run(dry_run=dry_run)
         except Exception:
             logger.error(traceback.format_exc())
-            return []
+            return False
 
-    def cleanup_old_versions(self, repository, group, name, keep_latest_count=5):
-        """清理旧版本，只保留最新的几个版本"""
+    def get_all_components_in_repository(self, repository):
+        """获取仓库中的所有组件，列举不完整（某一页获取失败）时返回False而不是部分结果"""
         try:
-            # 搜索所有版本
-            components = self.search_components(
-                repository=repository,
-                group=group,
-                name=name
-            )
-            
-            if not components or not components.get('items'):
+            return list(self.iter_components(repository))
+        except Exception:
+            logger.error(traceback.format_exc())
+            return False
+
+    def cleanup_old_versions(self, repository, group, name, keep_latest_count=5, use_index=False,
+                             keep_days=None, keep_pattern=None, dry_run=False):
+        """清理旧版本，只保留最新的几个版本
+        
+        版本按Maven/semver规则比较（1.10 > 1.9，1.0 > 1.0-rc1），遍历全部分页。
+        dry_run为True时不删除，返回待删除的组件摘要列表。
+        """
+        summary = self.apply_retention(repository, group=group, name=name, keep_latest=keep_latest_count,
+                                       keep_days=keep_days, keep_pattern=keep_pattern,
+                                       dry_run=dry_run, use_index=use_index)
+        if not summary:
+            return False
+        if dry_run:
+            return summary['deletions']
+        if not summary['components']:
+            return False
+        return summary['failed'] == 0
+
+    def apply_retention(self, repository, group=None, name=None, keep_latest=None, keep_days=None,
+                        keep_pattern=None, dry_run=False, use_index=False, max_workers=None, plan_path=None):
+        """对整个仓库（或指定group/name）应用版本保留策略
+        
+        Args:
+            repository: 仓库名称
+            group/name: 只处理指定坐标，均为None时流式遍历整个仓库并按group:name归组
+            keep_latest: 每个坐标保留最新的N个版本
+            keep_days: 保留最近N天内修改过的版本
+            keep_pattern: 保留版本号匹配该正则的版本（如 '^\\d+\\.\\d+\\.\\d+$' 保留所有正式版）
+            dry_run: 只计算不删除
+            use_index: 从本地索引读取组件
+            max_workers: 并发删除数，默认使用元数据预算的并发上限
+            plan_path: 指定时只把待删除组件写成删除计划文件，不执行删除（见execute_deletion_plan）
+        
+        Returns:
+            dict: {coordinates, components, to_delete, deleted, failed, bytes, dry_run, deletions[, plan]}
+        """
+        try:
+            policy = RetentionPolicy(keep_latest=keep_latest, keep_days=keep_days, keep_pattern=keep_pattern)
+            if policy.is_empty():
+                logger.error('未指定任何保留条件，拒绝清理')
                 return False
-            
-            # 按版本排序（这里简单按字符串排序，实际可能需要版本号比较逻辑）
-            items = components['items']
-            items.sort(key=lambda x: x.get('version', ''), reverse=True)
-            
-            # 删除超出保留数量的版本
-            to_delete = items[keep_latest_count:]
-            if to_delete:
-                component_ids = [item['id'] for item in to_delete]
-                return self.batch_delete_components(component_ids)
-            
-            return True
+            engine = RetentionEngine(self, policy, max_workers=max_workers)
+            summary = engine.run(repository, group=group, name=name, dry_run=dry_run or bool(plan_path),
+                                 use_index=use_index)
+            if plan_path:
+                description = {'source': 'retention', 'group': group, 'name': name, 'keep_latest': keep_latest,
+                               'keep_days': keep_days, 'keep_pattern': keep_pattern}
+                plan = DeletionPlan(summary['deletions'], repository, description)
+                plan.save(plan_path)
+                summary['plan'] = plan.summary()
+            return summary
         except Exception:
             logger.error(traceback.format_exc())
             return False
@@ -832,9 +1408,43 @@ class NexusReq(object):
     ############################## SAST工具文件上传 ##############################
     '''
 
+    def _upload_sast_zip(self, repository, directory_path, zip_filename, files, compression=None,
+                         compress_level=None, zip_executor=None, abandon=None):
+        """把多个文件压缩为zip流直接上传，压缩在后台线程中与上传重叠，不生成临时文件
+        
+        先等压缩线程产出第一块数据再发起上传请求，共享压缩线程池繁忙时不会先占着空闲连接等待；
+        abandon（threading.Event）置位时放弃压缩和上传。
+        
+        Returns:
+            tuple: (上传结果, 用于通知的文件信息, 上传字节数)
+        """
+        zip_stream = ZipStream(files, compression=compression, compress_level=compress_level,
+                               executor=zip_executor, abandoned=abandon)
+        data = {
+            'raw.directory': f"{directory_path}/{zip_filename}",
+            'raw.asset1.filename': zip_filename
+        }
+        result = False
+        if zip_stream.wait_ready():
+            result = self._upload_multipart(repository, data,
+                                            {'raw.asset1': (zip_filename, zip_stream, 'application/zip')})
+        
+        if result:
+            logger.info(f"SAST压缩包上传成功: {zip_filename} ({zip_stream.bytes_in} -> {zip_stream.bytes_out} bytes)")
+        else:
+            logger.error(f"SAST压缩包上传失败: {zip_filename}")
+        
+        file_info = {
+            'name': zip_filename,
+            'size': self._format_file_size(zip_stream.bytes_out),
+            'type': 'application/zip',
+            'modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        return result, file_info, zip_stream.bytes_out
+
     def upload_sast_report(self, project_name, sast_category='generic', files=None, 
                           repository=None, scan_date=None, additional_info=None,
-                          create_zip=True):
+                          create_zip=True, compression=None, compress_level=None):
         """上传SAST工具扫描报告
         
         Args:
@@ -844,13 +1454,26 @@ class NexusReq(object):
             repository: 目标仓库 (默认使用配置的SAST仓库)
             scan_date: 扫描日期 (YYYY-MM-DD格式)
             additional_info: 附加信息字典
-            create_zip: 是否将多个文件打包成zip
+            create_zip: 是否将多个文件打包成zip（边压缩边上传，不生成临时文件）
+            compression: zip压缩方式 deflate/store/auto（auto时PDF等已压缩格式直接存储）
+            compress_level: deflate压缩级别 0-9
+        """
+        return self._upload_sast_report(project_name, sast_category, files, repository, scan_date,
+                                        additional_info, create_zip, compression, compress_level)[0]
+
+    def _upload_sast_report(self, project_name, sast_category='generic', files=None, repository=None,
+                            scan_date=None, additional_info=None, create_zip=True, compression=None,
+                            compress_level=None, zip_executor=None, abandon=None):
+        """upload_sast_report的实现，zip_executor为批量上传共享的压缩线程池，abandon置位时放弃压缩上传
+        
+        Returns:
+            tuple: (上传结果, 上传字节数)
         """
         operation = "SAST工具资料上传"
         
         if not files:
             logger.error("未指定要上传的文件")
-            return False
+            return False, 0
         
         if isinstance(files, str):
             files = [files]
@@ -865,7 +1488,7 @@ class NexusReq(object):
                 self._send_notification(operation, False, 
                                       details={'项目': project_name, 'SAST工具': sast_category}, 
                                       error_message=error_msg)
-                return False
+                return False, 0
             validated_files.append(file_path)
         
         # 设置默认仓库
@@ -883,45 +1506,40 @@ class NexusReq(object):
             
             upload_files = validated_files
             
-            # 如果有多个文件且需要打包
-            if len(validated_files) > 1 and create_zip:
-                zip_filename = f"{project_name}_{sast_category}_{scan_date}.zip"
-                zip_path = os.path.join(os.path.dirname(validated_files[0]), zip_filename)
-                
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path in validated_files:
-                        zipf.write(file_path, os.path.basename(file_path))
-                
-                upload_files = [zip_path]
-                logger.info(f"已创建压缩包: {zip_path}")
-            
             # 上传文件
             results = []
             file_infos = []
+            uploaded_bytes = 0
             
-            for file_path in upload_files:
-                # 构建文件在仓库中的路径
-                filename = os.path.basename(file_path)
-                file_directory = f"{directory_path}/{filename}"
-                
-                # 上传单个文件
-                result = self.upload_raw_component(repository, file_directory, file_path)
-                results.append(result)
-                
-                # 收集文件信息用于通知
-                file_infos.append(self._get_file_info(file_path))
-                
+            # 如果有多个文件且需要打包，zip边压缩边写入上传请求体
+            if len(validated_files) > 1 and create_zip:
+                zip_filename = f"{project_name}_{sast_category}_{scan_date}.zip"
+                result, file_info, zip_bytes = self._upload_sast_zip(repository, directory_path, zip_filename,
+                                                                     validated_files, compression, compress_level,
+                                                                     zip_executor, abandon)
                 if result:
-                    logger.info(f"SAST文件上传成功: {filename}")
-                else:
-                    logger.error(f"SAST文件上传失败: {filename}")
-            
-            # 清理临时zip文件
-            if len(validated_files) > 1 and create_zip and upload_files != validated_files:
-                try:
-                    os.remove(upload_files[0])  # 删除临时zip文件
-                except:
-                    pass
+                    uploaded_bytes += zip_bytes
+                results.append(result)
+                file_infos.append(file_info)
+                upload_files = [zip_filename]
+            else:
+                for file_path in upload_files:
+                    # 构建文件在仓库中的路径
+                    filename = os.path.basename(file_path)
+                    file_directory = f"{directory_path}/{filename}"
+                    
+                    # 上传单个文件
+                    result = self.upload_raw_component(repository, file_directory, file_path)
+                    results.append(result)
+                    
+                    # 收集文件信息用于通知
+                    file_infos.append(self._get_file_info(file_path))
+                    
+                    if result:
+                        uploaded_bytes += os.path.getsize(file_path)
+                        logger.info(f"SAST文件上传成功: {filename}")
+                    else:
+                        logger.error(f"SAST文件上传失败: {filename}")
             
             # 判断整体上传结果
             success = all(results)
@@ -968,7 +1586,7 @@ class NexusReq(object):
                 error_msg = f"部分或全部文件上传失败，成功: {sum(1 for r in results if r)}/{len(results)}"
                 self._send_notification(operation, False, details=details, error_message=error_msg)
             
-            return success
+            return success, uploaded_bytes
             
         except Exception as e:
             error_msg = f"SAST文件上传过程中发生异常: {str(e)}"
@@ -980,48 +1598,114 @@ class NexusReq(object):
                 '错误类型': type(e).__name__
             }
             self._send_notification(operation, False, details=details, error_message=error_msg)
-            return False
+            return False, 0
+
+    def iter_upload_sast_reports(self, sast_configs, max_workers=None, item_timeout=None, zip_workers=None,
+                                 job_id=None):
+        """并行上传多个SAST报告，按完成顺序逐项产出结果
+        
+        多文件打包共用一个压缩线程池，压缩线程数不随并发上传数增长。
+        
+        Args:
+            sast_configs: SAST配置列表，每个元素包含upload_sast_report的参数
+            max_workers: 并发上传数 (默认使用bulk预算的并发数)
+            item_timeout: 单个项目的超时秒数，为0时不限制
+            zip_workers: 共享压缩线程数
+            job_id: 任务ID，指定时上传成功的项目写入进度日志，以相同job_id重新执行时跳过（产出skipped=True的结果）
+        
+        Yields:
+            dict: {index, key, success, result, elapsed, bytes, error}
+        """
+        def key(sast_config):
+            return f"{sast_config.get('project_name', 'Unknown')}/{sast_config.get('sast_category', 'generic')}"
+        
+        def journal_key(sast_config):
+            digest = hashlib.sha1(json.dumps(sast_config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+            return f"{key(sast_config)}:{digest[:12]}"
+        
+        pending = list(range(len(sast_configs)))
+        journal = self._open_job_journal(job_id, 'batch-upload-sast')
+        if journal:
+            done = journal.completed()
+            pending = []
+            for index, sast_config in enumerate(sast_configs):
+                if journal_key(sast_config) in done:
+                    yield {'index': index, 'key': key(sast_config), 'success': True, 'result': True,
+                           'elapsed': 0.0, 'bytes': 0, 'error': None, 'skipped': True}
+                else:
+                    pending.append(index)
+        
+        config = get_perf_config('batch', DEFAULT_BATCH_CONFIG)
+        runner = BatchRunner(max_workers or self.governor.max_workers('bulk'), item_timeout=item_timeout)
+        zip_executor = concurrent.futures.ThreadPoolExecutor(max_workers=zip_workers or config['zip_workers'])
+        # 超时的项目仍在工作线程中执行，置位后其压缩线程退出、上传随之失败，不再占用共享压缩线程
+        abandon = {index: threading.Event() for index in pending}
+        
+        def upload(index):
+            return self._upload_sast_report(zip_executor=zip_executor, abandon=abandon[index], **sast_configs[index])
+        
+        try:
+            for item in runner.run(pending, upload, key=lambda index: key(sast_configs[index]),
+                                   on_timeout=lambda index: abandon[index].set()):
+                item['index'] = pending[item['index']]
+                if journal and item['success']:
+                    journal.record(journal_key(sast_configs[item['index']]), 'done', bytes=item['bytes'])
+                yield item
+        finally:
+            for event in abandon.values():
+                event.set()
+            zip_executor.shutdown(wait=False)
+            if journal:
+                journal.close()
 
-    def batch_upload_sast_reports(self, sast_configs):
+    def batch_upload_sast_reports(self, sast_configs, max_workers=None, item_timeout=None, zip_workers=None,
+                                  progress_callback=None, job_id=None):
         """批量上传SAST报告
         
         Args:
             sast_configs: SAST配置列表，每个元素包含upload_sast_report的参数
+            max_workers: 并发上传数 (默认使用bulk预算的并发数)
+            item_timeout: 单个项目的超时秒数 (默认300)
+            zip_workers: 共享压缩线程数
+            progress_callback: 每个项目完成时回调 callback(item, done, total)，item见iter_upload_sast_reports
+            job_id: 任务ID，以相同job_id重新执行时跳过已上传成功的项目
+        
+        Returns:
+            list: 与sast_configs顺序一致的上传结果
         """
-        results = []
+        results = [False] * len(sast_configs)
+        total_bytes = 0
+        done = 0
+        started = time.monotonic()
         
         logger.info(f"开始批量上传{len(sast_configs)}个SAST报告")
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            
-            for config in sast_configs:
-                future = executor.submit(self.upload_sast_report, **config)
-                futures.append((future, config.get('project_name', 'Unknown')))
-            
-            for future, project_name in futures:
-                try:
-                    result = future.result(timeout=300)  # 5分钟超时
-                    results.append(result)
-                    
-                    if result:
-                        logger.info(f"项目 {project_name} SAST报告上传成功")
-                    else:
-                        logger.error(f"项目 {project_name} SAST报告上传失败")
-                        
-                except Exception as e:
-                    logger.error(f"项目 {project_name} SAST报告上传异常: {e}")
-                    results.append(False)
+        for item in self.iter_upload_sast_reports(sast_configs, max_workers, item_timeout, zip_workers, job_id):
+            done += 1
+            results[item['index']] = item['success']
+            total_bytes += item['bytes']
+            if item.get('skipped'):
+                logger.info(f"项目 {item['key']} 已在进度日志中记录为上传成功，跳过")
+            elif item['success']:
+                logger.info(f"项目 {item['key']} SAST报告上传成功 ({item['bytes']} bytes, {item['elapsed']}s)")
+            elif item['error']:
+                logger.error(f"项目 {item['key']} SAST报告上传异常: {item['error']}")
+            else:
+                logger.error(f"项目 {item['key']} SAST报告上传失败")
+            if progress_callback:
+                progress_callback(item, done, len(sast_configs))
         
         success_count = sum(1 for r in results if r)
         
         # 发送批量操作汇总通知
-        if self.enable_email_notification:
+        if self.enable_email_notification and results:
             details = {
                 '总项目数': len(sast_configs),
                 '成功数量': success_count,
                 '失败数量': len(results) - success_count,
-                '成功率': f"{success_count/len(results)*100:.1f}%"
+                '成功率': f"{success_count/len(results)*100:.1f}%",
+                '上传大小': self._format_file_size(total_bytes),
+                '耗时': f"{time.monotonic() - started:.1f}s"
             }
             
             self._send_notification(
@@ -1034,13 +1718,14 @@ class NexusReq(object):
         logger.info(f"批量SAST报告上传完成: {success_count}/{len(results)} 成功")
         return results
 
-    def list_sast_reports(self, project_name=None, sast_category=None, repository=None):
+    def list_sast_reports(self, project_name=None, sast_category=None, repository=None, use_index=False):
         """列出SAST报告
         
         Args:
             project_name: 项目名称 (可选)
             sast_category: SAST工具类型 (可选)
             repository: 仓库名称 (可选)
+            use_index: 使用本地索引按名称前缀查询 (可选)
         """
         if not repository:
             repository = self.sast_config['default_repository']
@@ -1053,8 +1738,12 @@ class NexusReq(object):
                 if sast_category:
                     search_path += f"/{sast_category}"
             
-            # 获取所有组件
-            components = self.get_all_components_in_repository(repository)
+            # 优先从本地索引做前缀查询，否则流式遍历所有组件
+            index = self._indexed(repository) if use_index else None
+            if index:
+                components = index.query_components(repository, name_prefix=search_path or None)
+            else:
+                components = self.iter_components(repository)
             
             # 过滤SAST相关组件
             sast_components = []
@@ -1076,19 +1765,20 @@ class NexusReq(object):
             
         except Exception as e:
             logger.error(f"列出SAST报告失败: {traceback.format_exc()}")
-            return []
+            return False
 
     def download_sast_report(self, project_name, sast_category, scan_date, 
-                           filename=None, repository=None, download_dir=None):
+                           filename=None, repository=None, download_dir=None, max_workers=None):
         """下载SAST报告
         
         Args:
             project_name: 项目名称
             sast_category: SAST工具类型
             scan_date: 扫描日期
-            filename: 文件名 (可选，如果不指定则下载目录下所有文件)
+            filename: 文件名 (可选，如果不指定则并行下载目录下所有文件)
             repository: 仓库名称 (可选)
             download_dir: 下载目录 (可选)
+            max_workers: 并行下载数 (可选)
         """
         if not repository:
             repository = self.sast_config['default_repository']
@@ -1101,31 +1791,64 @@ class NexusReq(object):
             search_path = f"{project_name}/{sast_category}/{scan_date}"
             
             if filename:
-                # 下载特定文件
-                file_path = f"{search_path}/{filename}"
-                return self.download_asset_by_path(repository, file_path, download_dir)
-            else:
-                # 下载目录下所有文件
-                components = self.list_sast_reports(project_name, sast_category, repository)
-                
-                downloaded_files = []
-                for component in components:
-                    component_name = component.get('name', '')
-                    if component_name.startswith(search_path):
-                        assets = component.get('assets', [])
-                        for asset in assets:
-                            asset_path = asset.get('path', '')
-                            if asset_path.startswith(search_path):
-                                result = self.download_asset_by_path(repository, asset_path, download_dir)
-                                if result:
-                                    downloaded_files.append(asset_path)
-                
-                return downloaded_files
+                # 下载特定文件；upload_sast_report以文件名作为目录上传，文件位于<文件名>/<文件名>
+                for file_path in (f"{search_path}/{filename}", f"{search_path}/{filename}/{filename}"):
+                    result = self.download_asset_by_path(repository, file_path, download_dir)
+                    if result:
+                        return result
+                return False
+            
+            # 下载目录下所有文件
+            results = self.download_directory(repository, search_path, download_dir, max_workers)
+            if results is False:
+                return False
+            return [path for path, result in results.items() if result]
                 
         except Exception as e:
             logger.error(f"下载SAST报告失败: {traceback.format_exc()}")
             return False
 
+    def download_sast_reports(self, scan_date, project_names=None, sast_category=None, repository=None,
+                              download_dir=None, max_workers=None):
+        """并行下载某一天所有（或指定）项目的SAST报告
+        
+        Args:
+            scan_date: 扫描日期
+            project_names: 项目名称列表 (可选，不指定时遍历整个仓库)
+            sast_category: SAST工具类型 (可选)
+            repository: 仓库名称 (可选)
+            download_dir: 下载目录，文件按 <项目>/<工具类型>/<日期>/ 存放 (默认: ./sast_downloads)
+            max_workers: 并行下载数 (可选)
+        
+        Returns:
+            dict: {仓库路径: 本地路径或False}
+        """
+        if not repository:
+            repository = self.sast_config['default_repository']
+        if not download_dir:
+            download_dir = os.path.join(os.getcwd(), 'sast_downloads')
+        
+        def matches(asset):
+            parts = asset.get('path', '').strip('/').split('/')
+            return len(parts) > 3 and parts[2] == scan_date and (not sast_category or parts[1] == sast_category)
+        
+        try:
+            downloader = PathDownloader(self, max_workers)
+            if project_names:
+                # 各项目的目录列表并行获取
+                prefixes = [f"{p}/{sast_category}/{scan_date}" if sast_category else p for p in project_names]
+                workers = max(1, min(self.governor.max_workers('metadata'), len(prefixes)))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    listed = executor.map(lambda prefix: downloader.list_prefix(repository, prefix), prefixes)
+                    assets = [asset for group in listed for asset in group if matches(asset)]
+            else:
+                assets = [asset for asset in self.iter_assets(repository) if matches(asset)]
+            
+            logger.info(f"并行下载 {scan_date} 的 {len(assets)} 个SAST报告文件")
+            return downloader.download_many(repository, assets, download_dir, base_prefix=None)
+        except Exception:
+            logger.error(f"下载SAST报告失败: {traceback.format_exc()}")
+            return False
 
 if __name__ == '__main__':
     # 示例用法
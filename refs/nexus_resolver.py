@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_RESOLVER_CONFIG = {
+    'ttl': 600,
+    'latest_ttl': 30,
+    'max_entries': 100000
+}
+
+LATEST = 'latest'
+
+
+def maven_params(extension='jar', classifier=None):
+    """Maven资产的搜索参数，classifier为空时只匹配主构件"""
+    return {'maven.extension': extension, 'maven.classifier': classifier or ''}
+
+
+class ArtifactResolver(object):
+    """坐标/资产ID → 下载地址的解析层
+
+    解析结果（含downloadUrl、checksum、fileSize）按TTL缓存在内存中，"latest"版本使用较短的TTL；
+    批量解析时按(repository, group, name)合并为一次流式资产搜索，再在本地按版本挑选。
+    下载由调用方直接通过连接池完成，不再经过/search/assets/download的302跳转。
+    """
+
+    def __init__(self, nexus, ttl=None, latest_ttl=None, max_entries=None):
+        config = get_perf_config('resolver', DEFAULT_RESOLVER_CONFIG)
+        self.nexus = nexus
+        self.ttl = ttl if ttl is not None else config['ttl']
+        self.latest_ttl = latest_ttl if latest_ttl is not None else config['latest_ttl']
+        self.max_entries = max_entries or config['max_entries']
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'lookups': 0}
+
+    @staticmethod
+    def coordinate_key(repository, group, name, version, params):
+        return (repository, group, name, version or LATEST, tuple(sorted((params or {}).items())))
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+            return None
+
+    def _put(self, key, asset, ttl):
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, asset)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def remember(self, asset):
+        """记录已知的资产元数据（如搜索结果），之后按ID下载时不再查询"""
+        if asset and asset.get('id') and asset.get('downloadUrl'):
+            self._put(('asset', asset['id']), asset, self.ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resolve_asset(self, asset_id):
+        """按资产ID解析，返回资产元数据或None"""
+        key = ('asset', asset_id)
+        asset = self._get(key)
+        if asset:
+            return asset
+        with self._lock:
+            self._stats['lookups'] += 1
+        asset = self.nexus.get_asset(asset_id)
+        if not asset or not isinstance(asset, dict):
+            return None
+        self._put(key, asset, self.ttl)
+        return asset
+
+    def resolve(self, repository, group, name, version=None, **params):
+        """按坐标解析单个资产，version为None或'latest'时取最新版本
+
+        params为额外的搜索条件（如maven.extension/maven.classifier），返回资产元数据或None。
+        """
+        key = self.coordinate_key(repository, group, name, version, params)
+        asset = self._get(key)
+        if asset:
+            return asset
+
+        with self._lock:
+            self._stats['lookups'] += 1
+        query = dict(params)
+        if version and version != LATEST:
+            query['version'] = version
+        else:
+            query.update({'sort': 'version', 'direction': 'desc'})
+        result = self.nexus.search_assets(repository=repository, group=group, name=name, **query)
+        if not result or not result.get('items'):
+            return None
+
+        asset = result['items'][0]
+        self._put(key, asset, self.latest_ttl if key[3] == LATEST else self.ttl)
+        self.remember(asset)
+        return asset
+
+    def _resolve_group(self, repository, group, name, params, wanted):
+        """一次流式搜索解析同一group:name下的多个版本，返回{version: 资产}"""
+        with self._lock:
+            self._stats['lookups'] += 1
+        found = {}
+        for asset in self.nexus.iter_search_assets(repository=repository, group=group, name=name, **params):
+            version = (asset.get('maven2') or {}).get('version') or asset.get('version')
+            if not version and asset.get('path', '').count('/') >= 3:
+                # Maven路径为 group/name/version/file
+                version = asset['path'].rsplit('/', 2)[-2]
+            if version in wanted and version not in found:
+                found[version] = asset
+            self.remember(asset)
+            if len(found) == len(wanted):
+                break
+        return found
+
+    def resolve_many(self, coordinates, max_workers=None):
+        """批量解析坐标
+
+        Args:
+            coordinates: [{repository, group, name, version, extension, classifier}]，
+                         version为空或'latest'时单独解析最新版本；未指定extension时不按扩展名过滤
+
+        Returns:
+            list: 与coordinates一一对应的资产元数据，未找到为None
+        """
+        results = [None] * len(coordinates)
+        batches = {}
+        latest = []
+        for position, coordinate in enumerate(coordinates):
+            params = {}
+            if coordinate.get('extension'):
+                params = maven_params(coordinate['extension'], coordinate.get('classifier'))
+            version = coordinate.get('version') or LATEST
+            key = self.coordinate_key(coordinate.get('repository'), coordinate.get('group'),
+                                      coordinate.get('name'), version, params)
+            cached = self._get(key)
+            if cached:
+                results[position] = cached
+            elif version == LATEST:
+                latest.append((position, coordinate, params))
+            else:
+                batch_key = key[:3] + (key[4],)
+                batches.setdefault(batch_key, {}).setdefault(version, []).append(position)
+
+        max_workers = max_workers or self.nexus.governor.max_workers('metadata')
+
+        def run_batch(batch_key, versions):
+            repository, group, name, params = batch_key
+            found = self._resolve_group(repository, group, name, dict(params), set(versions))
+            for version, positions in versions.items():
+                asset = found.get(version)
+                if asset:
+                    self._put((repository, group, name, version, params), asset, self.ttl)
+                for position in positions:
+                    results[position] = asset
+
+        def run_latest(position, coordinate, params):
+            results[position] = self.resolve(coordinate.get('repository'), coordinate.get('group'),
+                                             coordinate.get('name'), LATEST, **params)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_batch, k, v) for k, v in batches.items()]
+            futures += [executor.submit(run_latest, *item) for item in latest]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f'坐标解析失败: {e}')
+
+        missing = sum(1 for asset in results if asset is None)
+        if missing:
+            logger.warning(f'{missing}/{len(coordinates)} 个坐标未解析到资产')
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import urllib.parse
+from collections import OrderedDict
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_RESPONSE_CACHE_CONFIG = {
+    'enabled': False,
+    'memory_max_bytes': 32 * 1024 * 1024,
+    'disk_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'responses.db'),
+    'disk_max_bytes': 256 * 1024 * 1024,
+    'ttl': {
+        'search': 60,
+        'list': 30,
+        'component': 300,
+        'asset': 300
+    }
+}
+
+# 列表类响应，写操作后按仓库失效
+_COLLECTION_ENDPOINTS = ('search', 'list')
+
+# 磁盘条目的访问时间只用于LRU淘汰，距上次记录不足该秒数的命中不再更新
+_TOUCH_INTERVAL = 60
+# 待写入的访问时间攒够条数或超过秒数后批量提交
+_TOUCH_BATCH = 64
+_TOUCH_FLUSH_SECONDS = 10
+
+
+def endpoint_class(path):
+    """按REST路径判断缓存的接口类别，返回(类别, 资源ID)；不缓存的接口类别为None"""
+    path = path.rstrip('/')
+    if path.startswith('/search/assets/download'):
+        return None, None
+    if path.startswith('/search'):
+        return 'search', None
+    for collection, single in (('/components', 'component'), ('/assets', 'asset')):
+        if path == collection:
+            return 'list', None
+        if path.startswith(collection + '/'):
+            return single, path[len(collection) + 1:]
+    return None, None
+
+
+def normalize_url(url):
+    """规范化URL：scheme/host小写，查询参数排序"""
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
+
+class ResponseCache(object):
+    """REST响应缓存：内存LRU + SQLite磁盘层
+
+    以(账户, 规范化URL)为键，按接口类别设置TTL；过期条目带ETag/Last-Modified时
+    发送条件请求，304时直接续期。通过同一客户端上传/删除后，相关仓库的搜索/列表
+    结果及被删除的组件/资产条目立即失效。
+    """
+
+    def __init__(self, disk_path=None, memory_max_bytes=None, disk_max_bytes=None, ttl=None):
+        config = get_perf_config('response_cache', DEFAULT_RESPONSE_CACHE_CONFIG)
+        self.memory_max_bytes = memory_max_bytes if memory_max_bytes is not None else config['memory_max_bytes']
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else config['disk_max_bytes']
+        self.ttl = dict(DEFAULT_RESPONSE_CACHE_CONFIG['ttl'])
+        self.ttl.update(config.get('ttl') or {})
+        self.ttl.update(ttl or {})
+        self.disk_path = os.path.expanduser(disk_path or config['disk_path']) if self.disk_max_bytes else None
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0,
+                       'evictions': 0, 'invalidations': 0}
+
+        self._conn = None
+        if self.disk_path:
+            db_dir = os.path.dirname(self.disk_path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       endpoint TEXT,
+                       repository TEXT,
+                       resource TEXT,
+                       body TEXT,
+                       etag TEXT,
+                       last_modified TEXT,
+                       expires REAL,
+                       size INTEGER,
+                       accessed REAL
+                   )''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_repo ON responses (endpoint, repository)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_resource ON responses (resource)')
+            self._conn.commit()
+        # 磁盘层占用字节数，打开时统计一次，之后随写入/删除增减
+        self._disk_bytes = self._disk_total() if self._conn else 0
+        self._touched = {}
+        self._touched_flushed = time.monotonic()
+
+    def _disk_total(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _flush_touched(self, force=False):
+        """批量写入磁盘命中的访问时间（调用方持有锁）"""
+        if not self._touched:
+            return
+        if not force and len(self._touched) < _TOUCH_BATCH and \
+                time.monotonic() - self._touched_flushed < _TOUCH_FLUSH_SECONDS:
+            return
+        self._conn.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                               [(accessed, key) for key, accessed in self._touched.items()])
+        self._conn.commit()
+        self._touched.clear()
+        self._touched_flushed = time.monotonic()
+
+    def _delete(self, where, params):
+        """删除满足条件的磁盘条目并扣减占用，返回删除条数（调用方持有锁）"""
+        size = self._conn.execute(f'SELECT COALESCE(SUM(size), 0) FROM responses WHERE {where}', params).fetchone()[0]
+        cursor = self._conn.execute(f'DELETE FROM responses WHERE {where}', params)
+        self._disk_bytes = max(self._disk_bytes - size, 0)
+        return cursor.rowcount
+
+    @staticmethod
+    def make_key(account, url):
+        return hashlib.sha1(f'{account}\n{normalize_url(url)}'.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint):
+        return self.ttl.get(endpoint) or 0
+
+    def _count(self, key, value=1):
+        self._stats[key] += value
+
+    def _remember(self, key, entry):
+        """放入内存层并按字节数淘汰（调用方持有锁）"""
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_bytes -= old['size']
+        self._memory[key] = entry
+        self._memory_bytes += entry['size']
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted['size']
+            self._count('evictions')
+
+    def get(self, key):
+        """返回缓存条目（可能已过期），不存在时返回None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+                return entry
+            if not self._conn:
+                return None
+            row = self._conn.execute(
+                'SELECT endpoint, repository, resource, body, etag, last_modified, expires, size, accessed '
+                'FROM responses WHERE key = ?', (key,)).fetchone()
+            if not row:
+                return None
+            entry = dict(zip(('endpoint', 'repository', 'resource', 'body', 'etag', 'last_modified',
+                              'expires', 'size'), row))
+            now = time.time()
+            if now - (row[8] or 0) >= _TOUCH_INTERVAL:
+                self._touched[key] = now
+            self._flush_touched()
+            self._remember(key, entry)
+            return entry
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry['expires'] > time.time()
+
+    def hit(self, revalidated=False):
+        with self._lock:
+            self._count('revalidated' if revalidated else 'hits')
+
+    def miss(self):
+        with self._lock:
+            self._count('misses')
+
+    def store(self, key, endpoint, body, repository=None, resource=None, etag=None, last_modified=None):
+        ttl = self.ttl_for(endpoint)
+        if not ttl:
+            return
+        entry = {
+            'endpoint': endpoint, 'repository': repository, 'resource': resource, 'body': body,
+            'etag': etag, 'last_modified': last_modified, 'expires': time.time() + ttl,
+            'size': len(body.encode('utf-8'))
+        }
+        with self._lock:
+            self._remember(key, entry)
+            self._count('stores')
+            if self._conn:
+                old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, endpoint, repository, resource, body, etag, '
+                    'last_modified, expires, size, accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, endpoint, repository, resource, body, etag, last_modified,
+                     entry['expires'], entry['size'], time.time()))
+                self._disk_bytes += entry['size'] - (old[0] if old else 0)
+                self._touched.pop(key, None)
+                self._evict_disk()
+                self._conn.commit()
+
+    def refresh(self, key, entry):
+        """304后续期"""
+        entry['expires'] = time.time() + self.ttl_for(entry['endpoint'])
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn:
+                self._conn.execute('UPDATE responses SET expires = ?, accessed = ? WHERE key = ?',
+                                   (entry['expires'], time.time(), key))
+                self._touched.pop(key, None)
+                self._conn.commit()
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        # 超出上限时才重新统计：其他进程可能也在写同一个数据库
+        self._flush_touched(force=True)
+        total = self._disk_total()
+        if total > self.disk_max_bytes:
+            rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall()
+            for key, size in rows:
+                if total <= self.disk_max_bytes:
+                    break
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                self._count('evictions')
+        self._disk_bytes = total
+
+    def invalidate(self, repositories=None, resources=None):
+        """使相关条目失效
+
+        Args:
+            repositories: 发生变化的仓库，这些仓库及未指定仓库的搜索/列表结果失效；
+                          包含None时所有搜索/列表结果失效
+            resources: 被删除的组件/资产ID
+        """
+        repositories = set(repositories or [])
+        resources = set(resources or [])
+        everything = None in repositories
+
+        def affected(entry):
+            if entry['resource'] and entry['resource'] in resources:
+                return True
+            if entry['endpoint'] in _COLLECTION_ENDPOINTS and repositories:
+                return everything or entry['repository'] is None or entry['repository'] in repositories
+            return False
+
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if affected(e)]:
+                self._memory_bytes -= self._memory.pop(key)['size']
+                self._count('invalidations')
+
+            if self._conn:
+                endpoints = ','.join('?' * len(_COLLECTION_ENDPOINTS))
+                if everything:
+                    self._count('invalidations', self._delete(f'endpoint IN ({endpoints})', _COLLECTION_ENDPOINTS))
+                elif repositories:
+                    marks = ','.join('?' * len(repositories))
+                    self._count('invalidations', self._delete(
+                        f'endpoint IN ({endpoints}) AND (repository IS NULL OR repository IN ({marks}))',
+                        _COLLECTION_ENDPOINTS + tuple(repositories)))
+                if resources:
+                    marks = ','.join('?' * len(resources))
+                    self._count('invalidations', self._delete(f'resource IN ({marks})', tuple(resources)))
+                self._conn.commit()
+
+    def invalidate_for_write(self, path, query, cached_resource=None):
+        """根据写请求的路径和参数推断受影响的条目并失效
+
+        cached_resource为被删除资源此前缓存的响应体（如有），用于找出其所在仓库和下属资产。
+        """
+        repositories = set(urllib.parse.parse_qs(query).get('repository', []))
+        resources = set()
+        endpoint, resource = endpoint_class(path)
+        if resource:
+            resources.add(resource)
+            detail = None
+            if cached_resource:
+                try:
+                    detail = json.loads(cached_resource)
+                except (ValueError, TypeError):
+                    detail = None
+            if isinstance(detail, dict) and detail.get('repository'):
+                repositories.add(detail['repository'])
+                resources.update(a['id'] for a in detail.get('assets', []) if a.get('id'))
+                if detail.get('componentId'):
+                    resources.add(detail['componentId'])
+            else:
+                repositories.add(None)
+        if path.startswith('/staging/move/'):
+            repositories.add(path[len('/staging/move/'):].strip('/'))
+        if not repositories and not resources:
+            repositories.add(None)
+        self.invalidate(repositories, resources)
+        logger.debug(f'response cache invalidated: repositories={repositories} resources={resources}')
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn:
+                self._conn.execute('DELETE FROM responses')
+                self._conn.commit()
+                self._disk_bytes = 0
+                self._touched.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+            if self._conn:
+                stats['disk_entries'] = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+                stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import functools
+import threading
+import traceback
+import concurrent.futures
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+
+
+# 版本限定符排序：低于正式版的预发布限定符
+_PRE_RELEASE_QUALIFIERS = {
+    'alpha': 0, 'a': 0,
+    'beta': 1, 'b': 1,
+    'milestone': 2, 'm': 2,
+    'rc': 3, 'cr': 3,
+    'snapshot': 4, 'dev': 4
+}
+# 等同于正式版的限定符
+_RELEASE_QUALIFIERS = ('ga', 'final', 'release')
+
+_TOKEN_RE = re.compile(r'\d+|[a-zA-Z]+')
+
+
+@functools.lru_cache(maxsize=100000)
+def version_key(version):
+    """把版本号转换为可排序的键，兼容Maven、semver及日期格式的版本
+
+    开头的数字段按数值比较（1.10 > 1.9），末尾的0段被忽略（1.0 == 1.0.0）；
+    alpha < beta < milestone < rc < snapshot < 正式版 < sp < 其他限定符；
+    semver的构建元数据（+之后的部分）不参与比较。
+    """
+    version = (version or '').split('+', 1)[0].strip().lower()
+    release = []
+    qualifiers = []
+    for token in _TOKEN_RE.findall(version):
+        if token.isdigit() and not qualifiers:
+            release.append(int(token))
+        elif token.isdigit():
+            qualifiers.append((4, int(token), ''))
+        elif token in _PRE_RELEASE_QUALIFIERS:
+            qualifiers.append((0, _PRE_RELEASE_QUALIFIERS[token], ''))
+        elif token in _RELEASE_QUALIFIERS:
+            qualifiers.append((1, 0, ''))
+        elif token == 'sp':
+            qualifiers.append((2, 0, ''))
+        else:
+            qualifiers.append((3, 0, token))
+
+    while release and release[-1] == 0:
+        release.pop()
+    while qualifiers and qualifiers[-1] == (1, 0, ''):
+        qualifiers.pop()
+    # 结束标记等同于正式版，使1.0 > 1.0-rc1
+    qualifiers.append((1, 0, ''))
+    return tuple(release), tuple(qualifiers)
+
+
+def parse_timestamp(value):
+    """解析Nexus返回的ISO时间，失败返回None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def component_summary(component):
+    """提取保留策略所需的组件信息，不保留资产详情"""
+    last_modified = None
+    size = 0
+    for asset in component.get('assets', []):
+        size += asset.get('fileSize') or 0
+        modified = parse_timestamp(asset.get('lastModified') or asset.get('blobCreated'))
+        if modified and (last_modified is None or modified > last_modified):
+            last_modified = modified
+    return {
+        'id': component['id'],
+        'repository': component.get('repository'),
+        'group': component.get('group'),
+        'name': component.get('name'),
+        'version': component.get('version'),
+        'last_modified': last_modified.isoformat() if last_modified else None,
+        'size': size
+    }
+
+
+class RetentionPolicy(object):
+    """版本保留策略，满足任一条件的版本被保留
+
+    Args:
+        keep_latest: 每个坐标保留最新的N个版本
+        keep_days: 保留最近N天内修改过的版本
+        keep_pattern: 保留版本号匹配该正则的版本
+    未设置任何条件时保留全部版本。
+    """
+
+    def __init__(self, keep_latest=None, keep_days=None, keep_pattern=None):
+        self.keep_latest = keep_latest
+        self.keep_days = keep_days
+        self.keep_pattern = re.compile(keep_pattern) if keep_pattern else None
+
+    def is_empty(self):
+        return self.keep_latest is None and self.keep_days is None and self.keep_pattern is None
+
+    def select_deletions(self, versions, now=None):
+        """从同一坐标的版本列表中选出要删除的版本"""
+        if self.is_empty():
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=self.keep_days) if self.keep_days is not None else None
+        ordered = sorted(versions, key=lambda v: version_key(v['version'] or ''), reverse=True)
+
+        deletions = []
+        for rank, summary in enumerate(ordered):
+            if self.keep_latest is not None and rank < self.keep_latest:
+                continue
+            if cutoff is not None:
+                modified = parse_timestamp(summary['last_modified'])
+                if modified is None or modified >= cutoff:
+                    continue
+            if self.keep_pattern and self.keep_pattern.search(summary['version'] or ''):
+                continue
+            deletions.append(summary)
+        return deletions
+
+
+class RetentionEngine(object):
+    """按保留策略清理仓库中的旧版本
+
+    一次流式遍历仓库（或搜索结果）的所有分页，按group:name归组后应用策略，
+    再通过有界并发的删除器执行删除。
+    """
+
+    def __init__(self, nexus, policy, max_workers=None):
+        self.nexus = nexus
+        self.policy = policy
+        self.max_workers = max_workers or nexus.governor.max_workers('metadata')
+
+    def _iter_source(self, repository, group=None, name=None, use_index=False):
+        index = self.nexus._indexed(repository) if use_index else None
+        if index:
+            return iter(index.query_components(repository, group=group, name=name))
+        if group is None and name is None:
+            return self.nexus.iter_components(repository)
+        return self.nexus.iter_search(repository=repository, group=group, name=name)
+
+    def plan(self, repository, group=None, name=None, use_index=False):
+        """计算待删除的版本
+
+        Returns:
+            tuple: (待删除组件摘要列表, 坐标数, 组件总数)
+        """
+        coordinates = {}
+        total = 0
+        for component in self._iter_source(repository, group, name, use_index):
+            # 搜索是模糊匹配，按精确坐标过滤
+            if group is not None and component.get('group') != group:
+                continue
+            if name is not None and component.get('name') != name:
+                continue
+            total += 1
+            key = (component.get('group'), component.get('name'))
+            coordinates.setdefault(key, []).append(component_summary(component))
+
+        now = datetime.now(timezone.utc)
+        deletions = []
+        for key in sorted(coordinates, key=lambda k: (k[0] or '', k[1] or '')):
+            deletions.extend(self.policy.select_deletions(coordinates[key], now))
+        return deletions, len(coordinates), total
+
+    def delete(self, deletions, on_result=None):
+        """有界并发删除，同时在途的任务数不超过max_workers的两倍
+
+        Returns:
+            dict: {component_id: 是否成功}
+        """
+        results = {}
+        lock = threading.Lock()
+
+        def delete_single(summary):
+            result = self.nexus.delete_component(summary['id'])
+            with lock:
+                results[summary['id']] = bool(result)
+            if on_result:
+                on_result(summary, bool(result))
+
+        window = threading.BoundedSemaphore(self.max_workers * 2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for summary in deletions:
+                window.acquire()
+                future = executor.submit(delete_single, summary)
+                future.add_done_callback(lambda _: window.release())
+        return results
+
+    def run(self, repository, group=None, name=None, dry_run=False, use_index=False):
+        """执行保留策略
+
+        Returns:
+            dict: {coordinates, components, to_delete, deleted, failed, bytes, dry_run, deletions}
+        """
+        deletions, coordinates, total = self.plan(repository, group, name, use_index)
+        summary = {
+            'coordinates': coordinates,
+            'components': total,
+            'to_delete': len(deletions),
+            'deleted': 0,
+            'failed': 0,
+            'bytes': sum(d['size'] for d in deletions),
+            'dry_run': dry_run,
+            'deletions': deletions
+        }
+        if dry_run or not deletions:
+            return summary
+
+        logger.info(f'按保留策略删除 {len(deletions)} 个版本（共 {total} 个）: {repository}')
+        try:
+            results = self.delete(deletions)
+        except Exception:
+            logger.error(traceback.format_exc())
+            results = {}
+        summary['deleted'] = sum(1 for ok in results.values() if ok)
+        summary['failed'] = len(deletions) - summary['deleted']
+        return summary
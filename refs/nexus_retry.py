@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import random
+import threading
+import email.utils
+import urllib.parse
+from datetime import datetime, timezone
+import requests
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_RETRY_CONFIG = {
+    'policies': {
+        'default': {
+            'max_retries': 3,
+            'backoff_base': 0.5,
+            'backoff_max': 30,
+            'max_retry_after': 120,
+            'retry_statuses': [429, 502, 503, 504],
+            'retry_non_idempotent': False
+        },
+        'search': {'max_retries': 5},
+        'download': {'max_retries': 5, 'backoff_max': 60},
+        'delete': {'max_retries': 3},
+        'upload': {'max_retries': 2, 'backoff_max': 60}
+    },
+    'breaker_failure_threshold': 5,
+    'breaker_reset_timeout': 30
+}
+
+CALL_CLASSES = ('default', 'search', 'download', 'delete', 'upload')
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+
+def parse_retry_after(value):
+    """解析Retry-After头（秒数或HTTP日期），返回等待秒数或None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy(object):
+    """单个调用类别的重试策略：指数退避 + full jitter
+
+    transient_errors为可重试的异常类型，connect_errors为连接尚未建立的异常类型，
+    其他HTTP客户端（如aiohttp）通过子类替换这两个属性复用同一策略。
+    """
+
+    transient_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    connect_errors = (requests.exceptions.ConnectTimeout,)
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30, max_retry_after=120,
+                 retry_statuses=None, retry_non_idempotent=False):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = set(retry_statuses or [])
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def should_retry_status(self, method, status_code, attempt):
+        if attempt >= self.max_retries or status_code not in self.retry_statuses:
+            return False
+        if method in IDEMPOTENT_METHODS or self.retry_non_idempotent:
+            return True
+        # 非幂等请求只在服务端明确表示未处理（限流）时重试
+        return status_code == 429
+
+    def should_retry_exception(self, method, exc, attempt):
+        if attempt >= self.max_retries:
+            return False
+        if not isinstance(exc, self.transient_errors):
+            return False
+        if method in IDEMPOTENT_METHODS or self.retry_non_idempotent:
+            return True
+        # 连接未建立时请求体肯定没有发出，非幂等请求也可以安全重试
+        return isinstance(exc, self.connect_errors)
+
+    def backoff(self, attempt, retry_after=None):
+        """计算第attempt次重试前的等待秒数，服务端给出Retry-After时以其为下限"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker(object):
+    """按主机的熔断器
+
+    连续失败（连接错误或5xx）达到阈值后打开，reset_timeout内的请求直接失败；
+    超时后进入半开状态放行一个探测请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, host, failure_threshold=5, reset_timeout=30):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f'熔断器关闭: {self.host}')
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f'熔断器打开: {self.host}，{self.reset_timeout}秒内请求将直接失败')
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url, failure_threshold=5, reset_timeout=30):
+    """获取url所属主机的进程级共享熔断器"""
+    host = urllib.parse.urlsplit(url).netloc or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, failure_threshold, reset_timeout)
+            _breakers[host] = breaker
+        return breaker
+
+
+def load_retry_policies(overrides=None, policy_class=RetryPolicy):
+    """按调用类别生成重试策略，类别配置覆盖default配置"""
+    config = get_perf_config('retry', DEFAULT_RETRY_CONFIG)
+    user_policies = dict(config.get('policies') or {})
+    user_policies.update(overrides or {})
+
+    base = dict(DEFAULT_RETRY_CONFIG['policies']['default'])
+    base.update(user_policies.get('default') or {})
+
+    policies = {}
+    for call_class in CALL_CLASSES:
+        params = dict(base)
+        if call_class != 'default':
+            params.update(DEFAULT_RETRY_CONFIG['policies'].get(call_class) or {})
+            params.update(user_policies.get(call_class) or {})
+        policies[call_class] = policy_class(**params)
+    return policies
+
+
+class RetryExecutor(object):
+    """按调用类别执行重试、熔断并统计重试次数"""
+
+    policy_class = RetryPolicy
+
+    def __init__(self, policies=None):
+        config = get_perf_config('retry', DEFAULT_RETRY_CONFIG)
+        self.policies = load_retry_policies(policies, self.policy_class)
+        self.breaker_failure_threshold = config['breaker_failure_threshold']
+        self.breaker_reset_timeout = config['breaker_reset_timeout']
+        self._lock = threading.Lock()
+        self._stats = {c: {'calls': 0, 'retries': 0, 'giveups': 0, 'short_circuited': 0} for c in CALL_CLASSES}
+
+    def _count(self, call_class, key):
+        with self._lock:
+            self._stats[call_class][key] += 1
+
+    def _begin(self, call_class, url):
+        """返回(调用类别, 策略, 熔断器)"""
+        call_class = call_class if call_class in self.policies else 'default'
+        breaker = get_circuit_breaker(url, self.breaker_failure_threshold, self.breaker_reset_timeout)
+        self._count(call_class, 'calls')
+        return call_class, self.policies[call_class], breaker
+
+    def _admit(self, call_class, breaker):
+        if not breaker.allow():
+            self._count(call_class, 'short_circuited')
+            raise CircuitOpenError(f'circuit open for {breaker.host}')
+
+    def _delay_after_exception(self, call_class, policy, breaker, method, exc, attempt):
+        """记录一次异常，返回重试前的等待秒数；不可重试时返回None"""
+        breaker.record_failure()
+        if not policy.should_retry_exception(method, exc, attempt):
+            self._count(call_class, 'giveups')
+            return None
+        return policy.backoff(attempt)
+
+    def _delay_after_status(self, call_class, policy, breaker, method, status_code, headers, attempt):
+        """记录一次响应，返回重试前的等待秒数；应直接返回该响应时返回None"""
+        if status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if not policy.should_retry_status(method, status_code, attempt):
+            if status_code in policy.retry_statuses:
+                self._count(call_class, 'giveups')
+            return None
+
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        if retry_after is not None and retry_after > policy.max_retry_after:
+            self._count(call_class, 'giveups')
+            return None
+        return policy.backoff(attempt, retry_after)
+
+    def _note_retry(self, call_class, method, url, reason, delay, attempt):
+        self._count(call_class, 'retries')
+        logger.warning(f'{method} {url} 失败({reason})，{delay:.2f}秒后第{attempt}次重试')
+
+    def call(self, call_class, method, url, send):
+        """调用send()发送请求，按策略重试可恢复的失败
+
+        返回最后一次的Response；熔断时抛出CircuitOpenError，
+        不可重试或重试耗尽的异常原样抛出。
+        """
+        call_class, policy, breaker = self._begin(call_class, url)
+
+        attempt = 0
+        while True:
+            self._admit(call_class, breaker)
+
+            try:
+                res = send()
+            except Exception as e:
+                delay = self._delay_after_exception(call_class, policy, breaker, method, e, attempt)
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            else:
+                delay = self._delay_after_status(call_class, policy, breaker, method, res.status_code,
+                                                 res.headers, attempt)
+                if delay is None:
+                    return res
+                reason = res.status_code
+                res.close()
+
+            attempt += 1
+            self._note_retry(call_class, method, url, reason, delay, attempt)
+            time.sleep(delay)
+
+    def get_stats(self):
+        """返回各调用类别的重试计数及熔断器状态"""
+        with self._lock:
+            stats = {c: dict(v) for c, v in self._stats.items()}
+        with _breakers_lock:
+            breakers = {host: b.state for host, b in _breakers.items()}
+        return {'classes': stats, 'breakers': breakers}
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+import time
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.env_config import EnvConfig
+
+
+DEFAULT_SESSION_CONFIG = {
+    'pool_connections': 10,
+    'pool_maxsize': 20,
+    'host_pool_maxsize': {},
+    'connection_ttl': 300
+}
+
+
+def get_perf_config(section, defaults=None):
+    """读取NEXUS_PERF_INFO中的某个配置段，缺失的键使用默认值"""
+    config = dict(defaults or {})
+    perf_info = getattr(EnvConfig, 'NEXUS_PERF_INFO', {}) or {}
+    config.update(perf_info.get(section, {}) or {})
+    return config
+
+
+class NexusSessionPool(object):
+    """按账户维护长连接的requests.Session池
+
+    同一个root_url下的每个账户共享一个Session，底层urllib3连接池负责
+    多线程并发复用连接；Session存活超过connection_ttl后会被重建。
+    """
+
+    def __init__(self, root_url, accounts, pool_connections=None, pool_maxsize=None,
+                 host_pool_maxsize=None, connection_ttl=None):
+        config = get_perf_config('session', DEFAULT_SESSION_CONFIG)
+        self.root_url = root_url
+        self.accounts = accounts
+        self.pool_connections = pool_connections or config['pool_connections']
+        self.pool_maxsize = pool_maxsize or config['pool_maxsize']
+        self.host_pool_maxsize = dict(config['host_pool_maxsize'])
+        self.host_pool_maxsize.update(host_pool_maxsize or {})
+        self.connection_ttl = connection_ttl if connection_ttl is not None else config['connection_ttl']
+
+        self._lock = threading.Lock()
+        self._sessions = {}  # account -> (session, created_at)
+        self._stats = {
+            'requests': 0,
+            'sessions_created': 0,
+            'sessions_recycled': 0,
+            'retired_connections': 0,
+            'retired_requests': 0
+        }
+
+    def _build_session(self, account):
+        """创建带认证和连接池的Session"""
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(
+            self.accounts[account]['username'],
+            self.accounts[account]['password']
+        )
+
+        default_adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize
+        )
+        session.mount('http://', default_adapter)
+        session.mount('https://', default_adapter)
+
+        # 按主机单独配置连接池大小
+        for host, maxsize in self.host_pool_maxsize.items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxsize)
+            session.mount(f'http://{host}/', adapter)
+            session.mount(f'https://{host}/', adapter)
+
+        return session
+
+    def _collect_counters(self, session):
+        """统计Session内所有urllib3连接池的新建连接数和请求数"""
+        connections = 0
+        requests_sent = 0
+        adapters = {id(a): a for a in session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += getattr(pool, 'num_connections', 0)
+                requests_sent += getattr(pool, 'num_requests', 0)
+        return connections, requests_sent
+
+    def _retire(self, session):
+        """回收Session前先累计其连接统计"""
+        connections, requests_sent = self._collect_counters(session)
+        self._stats['retired_connections'] += connections
+        self._stats['retired_requests'] += requests_sent
+        self._stats['sessions_recycled'] += 1
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def get_session(self, account):
+        """获取账户对应的Session，超过TTL时自动重建"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(account)
+            if entry:
+                session, created_at = entry
+                if not self.connection_ttl or now - created_at < self.connection_ttl:
+                    self._stats['requests'] += 1
+                    return session
+                logger.debug(f'nexus session expired, recycling: {account}')
+                self._retire(session)
+
+            session = self._build_session(account)
+            self._sessions[account] = (session, now)
+            self._stats['sessions_created'] += 1
+            self._stats['requests'] += 1
+            return session
+
+    def request(self, method, url, account, **kwargs):
+        """通过账户Session发送请求"""
+        return self.get_session(account).request(method=method, url=url, **kwargs)
+
+    def get_stats(self):
+        """返回连接复用统计"""
+        with self._lock:
+            connections = self._stats['retired_connections']
+            requests_sent = self._stats['retired_requests']
+            for session, _ in self._sessions.values():
+                c, r = self._collect_counters(session)
+                connections += c
+                requests_sent += r
+
+            stats = {
+                'requests': self._stats['requests'],
+                'sessions_created': self._stats['sessions_created'],
+                'sessions_recycled': self._stats['sessions_recycled'],
+                'active_sessions': len(self._sessions),
+                'connections_opened': connections,
+                'http_requests': requests_sent,
+                'connections_reused': max(requests_sent - connections, 0)
+            }
+        stats['reuse_ratio'] = round(stats['connections_reused'] / requests_sent, 3) if requests_sent else 0.0
+        return stats
+
+    def close(self):
+        """关闭所有Session"""
+        with self._lock:
+            for session, _ in self._sessions.values():
+                self._retire(session)
+            self._sessions = {}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_session_pool(root_url, accounts):
+    """获取root_url对应的进程级共享Session池"""
+    key = urllib.parse.urlsplit(root_url).netloc or root_url
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = NexusSessionPool(root_url, accounts)
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+import traceback
+import concurrent.futures
+from datetime import datetime
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+from refs.nexus_paths import ContentClient
+
+
+DEFAULT_TREE_UPLOAD_CONFIG = {
+    'manifest_path': os.path.join(os.path.expanduser('~'), '.nexus_tool', 'uploads.db'),
+    'batch_bytes': 32 * 1024 * 1024,
+    'batch_files': 100,
+    'large_file_size': 64 * 1024 * 1024
+}
+
+
+# 清单数据库结构版本（PRAGMA user_version），2起按Nexus地址区分记录
+MANIFEST_SCHEMA_VERSION = 2
+
+
+def join_remote(*parts):
+    return '/'.join(p.strip('/') for p in parts if p and p.strip('/'))
+
+
+class UploadManifest(object):
+    """已上传文件清单：(Nexus地址, 仓库, 仓库内路径) → sha1，用于跳过内容未变化的文件"""
+
+    def __init__(self, db_path=None):
+        config = get_perf_config('tree_upload', DEFAULT_TREE_UPLOAD_CONFIG)
+        self.db_path = os.path.expanduser(db_path or config['manifest_path'])
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] < MANIFEST_SCHEMA_VERSION:
+            # 旧版清单不含Nexus地址，无法区分同名仓库属于哪个服务器，直接丢弃（最多多上传一次）
+            self._conn.execute('DROP TABLE IF EXISTS uploads')
+            self._conn.execute(f'PRAGMA user_version = {MANIFEST_SCHEMA_VERSION}')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS uploaded_files (
+                   server TEXT,
+                   repository TEXT,
+                   path TEXT,
+                   sha1 TEXT,
+                   size INTEGER,
+                   uploaded_at TEXT,
+                   PRIMARY KEY (server, repository, path)
+               )''')
+        self._conn.commit()
+
+    def load(self, server, repository, prefix=''):
+        """返回server上仓库中prefix下已上传文件的{路径: (sha1, size)}"""
+        sql = 'SELECT path, sha1, size FROM uploaded_files WHERE server = ? AND repository = ?'
+        params = [server, repository]
+        if prefix:
+            sql += ' AND path >= ? AND path < ?'
+            params.extend([prefix, prefix + '\U0010ffff'])
+        with self._lock:
+            return {path: (sha1, size) for path, sha1, size in self._conn.execute(sql, params).fetchall()}
+
+    def record(self, server, repository, entries):
+        """记录一批上传成功的文件 [(路径, sha1, size)]"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO uploaded_files (server, repository, path, sha1, size, uploaded_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(server, repository, path, sha1, size, now) for path, sha1, size in entries])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TreeUploader(object):
+    """把本地目录树上传到Raw仓库，保留相对路径
+
+    同一目录下的小文件按字节数和文件数上限打包为一个multipart请求，大文件单独流式上传，
+    各批次并行执行；清单中记录的sha1与本地文件一致时跳过。verify=True时先HEAD确认这些文件
+    仍在仓库中且大小、ETag一致，被其他方式删除或覆盖的文件重新上传。
+    """
+
+    def __init__(self, nexus, repository, local_dir, remote_dir='', max_workers=None, batch_bytes=None,
+                 batch_files=None, large_file_size=None, skip_unchanged=True, manifest_path=None, verify=False):
+        config = get_perf_config('tree_upload', DEFAULT_TREE_UPLOAD_CONFIG)
+        self.nexus = nexus
+        self.repository = repository
+        self.local_dir = os.path.abspath(os.path.expanduser(local_dir))
+        self.remote_dir = (remote_dir or '').strip('/')
+        self.max_workers = max_workers or nexus.governor.max_workers('bulk')
+        self.batch_bytes = batch_bytes or config['batch_bytes']
+        self.batch_files = batch_files or config['batch_files']
+        self.large_file_size = large_file_size or config['large_file_size']
+        self.skip_unchanged = skip_unchanged
+        self.manifest_path = manifest_path
+        self.verify = verify
+        self.server = nexus.root_url.rstrip('/')
+
+    def scan(self):
+        """遍历本地目录，返回[(本地路径, 仓库内目录, 文件名, 大小)]"""
+        entries = []
+        for root, dirs, files in os.walk(self.local_dir):
+            dirs.sort()
+            relative = os.path.relpath(root, self.local_dir)
+            relative = '' if relative == '.' else relative.replace(os.sep, '/')
+            for file_name in sorted(files):
+                local_path = os.path.join(root, file_name)
+                if not os.path.isfile(local_path):
+                    continue
+                entries.append((local_path, join_remote(self.remote_dir, relative), file_name,
+                                os.path.getsize(local_path)))
+        return entries
+
+    def plan_batches(self, entries):
+        """按目录分组，小文件按上限打包，大文件单独成批"""
+        batches = []
+        by_directory = {}
+        for entry in entries:
+            if entry[3] >= self.large_file_size:
+                batches.append([entry])
+            else:
+                by_directory.setdefault(entry[1], []).append(entry)
+
+        for directory in sorted(by_directory):
+            batch, batch_size = [], 0
+            for entry in by_directory[directory]:
+                if batch and (len(batch) >= self.batch_files or batch_size + entry[3] > self.batch_bytes):
+                    batches.append(batch)
+                    batch, batch_size = [], 0
+                batch.append(entry)
+                batch_size += entry[3]
+            if batch:
+                batches.append(batch)
+        return batches
+
+    def _upload_batch(self, batch):
+        directory = batch[0][1]
+        if len(batch) == 1 and batch[0][3] >= self.large_file_size:
+            # 大文件直接流式PUT；无PUT权限（403/405）时退回multipart上传
+            status = ContentClient(self.nexus).put(self.repository, join_remote(directory, batch[0][2]), batch[0][0])
+            if status in (200, 201, 204):
+                self.nexus._invalidate_after_put(self.repository)
+                return True
+            if status not in (403, 405):
+                return False
+        data = {'raw.directory': directory or '/'}
+        files = {}
+        for index, (local_path, _, file_name, _) in enumerate(batch, 1):
+            files[f'raw.asset{index}'] = local_path
+            data[f'raw.asset{index}.filename'] = file_name
+        return self.nexus._upload_multipart(self.repository, data, files)
+
+    def _matches_remote(self, client, remote_path, sha1, size):
+        """HEAD确认仓库中的文件与清单记录一致"""
+        try:
+            info = client.head(self.repository, remote_path)
+        except Exception as e:
+            logger.warning(f'校验 {remote_path} 失败，将重新上传: {e}')
+            return False
+        if not info:
+            return False
+        if info['size'] is not None and info['size'] != size:
+            return False
+        etag = (info['etag'] or '').replace('W/', '').strip('"')
+        # Raw仓库的ETag为内容sha1，其他形式的ETag只比较大小
+        return len(etag) != 40 or etag.lower() == sha1
+
+    def _verify_skipped(self, skipped, known):
+        """返回清单认为未变化、但仓库中已缺失或内容不一致的条目"""
+        client = ContentClient(self.nexus)
+        workers = max(1, min(self.nexus.governor.max_workers('metadata'), len(skipped)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda e: self._matches_remote(client, join_remote(e[1], e[2]), *known[join_remote(e[1], e[2])]),
+                skipped)
+            return [entry for entry, matched in zip(skipped, results) if not matched]
+
+    def run(self, dry_run=False, progress_callback=None):
+        """执行上传
+
+        Args:
+            dry_run: 只统计需要上传的文件
+            progress_callback: 每个批次完成时回调 callback(done_files, total_files)
+
+        Returns:
+            dict: {files, uploaded, skipped, failed, batches, bytes, elapsed, failures}，
+                  verify=True时另有missing（清单中有但仓库中缺失或不一致的文件数）
+        """
+        started = time.monotonic()
+        entries = self.scan()
+        stats = {'files': len(entries), 'uploaded': 0, 'skipped': 0, 'failed': 0, 'batches': 0,
+                 'bytes': 0, 'elapsed': 0.0, 'dry_run': dry_run, 'failures': []}
+        if self.verify:
+            stats['missing'] = 0
+
+        manifest = UploadManifest(self.manifest_path)
+        digests = {}
+        try:
+            if self.skip_unchanged:
+                known = manifest.load(self.server, self.repository, self.remote_dir)
+                digest_cache = self.nexus.get_digest_cache()
+                workers = max(1, min(digest_cache.max_workers, len(entries)))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    for entry, digest in zip(entries, executor.map(lambda e: digest_cache.get(e[0]), entries)):
+                        digests[entry[0]] = digest['sha1']
+                pending, skipped = [], []
+                for entry in entries:
+                    record = known.get(join_remote(entry[1], entry[2]))
+                    if record and record[0] == digests[entry[0]]:
+                        skipped.append(entry)
+                    else:
+                        pending.append(entry)
+                if self.verify and skipped:
+                    missing = self._verify_skipped(skipped, known)
+                    if missing:
+                        logger.info(f'{len(missing)} 个清单中已上传的文件在仓库中缺失或不一致，将重新上传')
+                        pending.extend(missing)
+                    stats['missing'] = len(missing)
+                stats['skipped'] = len(entries) - len(pending)
+            else:
+                pending = entries
+
+            batches = self.plan_batches(pending)
+            stats['batches'] = len(batches)
+            if dry_run or not batches:
+                stats['uploaded'] = len(pending) if dry_run else 0
+                stats['bytes'] = sum(e[3] for e in pending) if dry_run else 0
+                return stats
+
+            logger.info(f'上传 {len(pending)} 个文件（{len(batches)} 个批次），跳过 {stats["skipped"]} 个未变化的文件')
+            lock = threading.Lock()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_batch = {executor.submit(self._upload_batch, batch): batch for batch in batches}
+                for future in concurrent.futures.as_completed(future_to_batch):
+                    batch = future_to_batch[future]
+                    try:
+                        result = future.result()
+                    except Exception:
+                        logger.error(traceback.format_exc())
+                        result = False
+                    with lock:
+                        if result:
+                            stats['uploaded'] += len(batch)
+                            stats['bytes'] += sum(e[3] for e in batch)
+                        else:
+                            stats['failed'] += len(batch)
+                            stats['failures'].extend(join_remote(e[1], e[2]) for e in batch)
+                    if result:
+                        # 逐批记录，中断后再次执行只上传尚未成功的批次
+                        manifest.record(self.server, self.repository,
+                                        [(join_remote(e[1], e[2]), digests.get(e[0]), e[3])
+                                         for e in batch if digests.get(e[0])])
+                    if progress_callback:
+                        progress_callback(stats['uploaded'] + stats['failed'], len(pending))
+            return stats
+        finally:
+            manifest.close()
+            stats['elapsed'] = round(time.monotonic() - started, 2)
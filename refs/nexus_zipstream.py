@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import queue
+import zipfile
+import threading
+from loguru import logger
+
+PUBLIC_LIBS_PATH = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append(PUBLIC_LIBS_PATH)
+from refs.nexus_session import get_perf_config
+
+
+DEFAULT_ZIP_CONFIG = {
+    'compression': 'auto',
+    'compress_level': 6,
+    'block_size': 1024 * 1024,
+    'queue_size': 8
+}
+
+# 本身已压缩的格式，auto模式下直接存储
+STORED_EXTENSIONS = {
+    '.pdf', '.docx', '.xlsx', '.pptx', '.zip', '.jar', '.war', '.gz', '.tgz', '.bz2', '.xz', '.7z',
+    '.rar', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp4', '.whl'
+}
+
+_END = object()
+
+
+class ZipStreamCancelled(Exception):
+    pass
+
+
+def _put(out_q, item, stopped):
+    """放入队列，队列满时每0.5秒检查一次stopped()（上传方已放弃），放弃时抛出ZipStreamCancelled"""
+    while True:
+        if stopped():
+            raise ZipStreamCancelled()
+        try:
+            out_q.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+class _QueueWriter(object):
+    """ZipFile的输出端：攒满block_size后放入队列，不支持seek（zipfile改用数据描述符）"""
+
+    def __init__(self, out_q, block_size, stopped, ready):
+        self._q = out_q
+        self._block_size = block_size
+        self._stopped = stopped
+        self._ready = ready
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def write(self, data):
+        self._buffer += data
+        self._offset += len(data)
+        if len(self._buffer) >= self._block_size:
+            self._emit()
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def _emit(self):
+        block = bytes(self._buffer)
+        self._buffer.clear()
+        _put(self._q, block, self._stopped)
+        self._ready.set()
+
+    def flush(self):
+        if self._buffer:
+            self._emit()
+
+    def close(self):
+        self.flush()
+
+
+class ZipStream(object):
+    """边压缩边产出的zip流，可直接作为multipart上传的文件来源
+
+    压缩在后台线程中进行，通过有界队列交给上传线程，压缩与网络传输重叠且不落临时文件；
+    每次迭代都会重新生成，可用于请求重试。
+
+    使用共享压缩线程池时，先调用start()并用wait_ready()等到压缩线程产出第一块数据再发起上传请求，
+    避免请求建立后连接空闲地等待压缩线程。cancel()放弃整个流：正在进行和之后的迭代都抛出ZipStreamCancelled。
+
+    Args:
+        files: 本地文件列表，或[(本地路径, 压缩包内名称)]
+        compression: 'deflate' / 'store' / 'auto'（已压缩的格式如PDF直接存储，其余deflate）
+        compress_level: deflate压缩级别 0-9
+        executor: 执行压缩的共享线程池，为None时每次迭代启动一个后台线程
+        abandoned: 外部传入的放弃标志（threading.Event），置位效果同cancel()
+    """
+
+    def __init__(self, files, compression=None, compress_level=None, block_size=None, queue_size=None,
+                 executor=None, abandoned=None):
+        config = get_perf_config('zip', DEFAULT_ZIP_CONFIG)
+        self.files = [f if isinstance(f, tuple) else (f, os.path.basename(f)) for f in files]
+        self.compression = compression or config['compression']
+        self.compress_level = compress_level if compress_level is not None else config['compress_level']
+        self.block_size = block_size or config['block_size']
+        self.queue_size = queue_size or config['queue_size']
+        self.executor = executor
+        if self.compression not in ('deflate', 'store', 'auto'):
+            raise ValueError(f'不支持的压缩方式: {self.compression}')
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.abandoned = abandoned or threading.Event()
+        self._started = None
+
+    def compress_type(self, path):
+        if self.compression == 'store':
+            return zipfile.ZIP_STORED
+        if self.compression == 'auto' and os.path.splitext(path)[1].lower() in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def _produce(self, out_q, cancelled, ready):
+        def stopped():
+            return cancelled.is_set() or self.abandoned.is_set()
+
+        try:
+            if stopped():
+                # 共享线程池中排队期间上传已中断
+                return
+            writer = _QueueWriter(out_q, self.block_size, stopped, ready)
+            with zipfile.ZipFile(writer, 'w', allowZip64=True) as zipf:
+                for path, arcname in self.files:
+                    compress_type = self.compress_type(path)
+                    level = self.compress_level if compress_type == zipfile.ZIP_DEFLATED else None
+                    zipf.write(path, arcname, compress_type=compress_type, compresslevel=level)
+            writer.flush()
+            _put(out_q, _END, stopped)
+        except ZipStreamCancelled:
+            pass
+        except Exception as e:
+            try:
+                _put(out_q, e, stopped)
+            except ZipStreamCancelled:
+                pass
+        finally:
+            ready.set()
+
+    def _start(self):
+        out_q = queue.Queue(maxsize=self.queue_size)
+        cancelled = threading.Event()
+        ready = threading.Event()
+        if self.executor:
+            self.executor.submit(self._produce, out_q, cancelled, ready)
+        else:
+            threading.Thread(target=self._produce, args=(out_q, cancelled, ready), daemon=True).start()
+        return out_q, cancelled, ready
+
+    def start(self):
+        """提前启动压缩，下一次迭代直接使用已产出的数据"""
+        if self._started is None:
+            self._started = self._start()
+
+    def wait_ready(self, timeout=None):
+        """等待start()启动的压缩产出第一块数据（或结束），已放弃时返回False"""
+        self.start()
+        ready = self._started[2]
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not ready.wait(0.5):
+            if self.abandoned.is_set():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return not self.abandoned.is_set()
+
+    def cancel(self):
+        """放弃该流，压缩线程在下一次写队列时退出"""
+        self.abandoned.set()
+
+    def __iter__(self):
+        if self.abandoned.is_set():
+            raise ZipStreamCancelled()
+        out_q, cancelled, _ = self._started or self._start()
+        self._started = None
+        self.bytes_in = sum(os.path.getsize(path) for path, _ in self.files)
+        self.bytes_out = 0
+        try:
+            while True:
+                try:
+                    item = out_q.get(timeout=0.5)
+                except queue.Empty:
+                    if self.abandoned.is_set():
+                        raise ZipStreamCancelled()
+                    continue
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    logger.error(f'生成zip流失败: {item}')
+                    raise item
+                self.bytes_out += len(item)
+                yield item
+        finally:
+            # 上传中断时通知压缩线程退出
+            cancelled.set()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import uuid
+import asyncio
+
+import aiohttp
+import pytest
+
+from refs import async_nexus_req
+from refs.async_nexus_req import AsyncRetryExecutor, AsyncRetryPolicy
+
+
+class FakeResponse(object):
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+
+    async def sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(async_nexus_req.asyncio, 'sleep', sleep)
+    return slept
+
+
+def make_executor():
+    return AsyncRetryExecutor({'default': {'max_retries': 3, 'backoff_base': 0.01, 'backoff_max': 0.05,
+                                           'retry_statuses': [429, 503]}})
+
+
+def test_async_policy_retries_aiohttp_errors():
+    policy = AsyncRetryPolicy(max_retries=1)
+    assert policy.should_retry_exception('GET', aiohttp.ServerDisconnectedError(), 0)
+    assert policy.should_retry_exception('GET', asyncio.TimeoutError(), 0)
+    assert not policy.should_retry_exception('POST', aiohttp.ServerDisconnectedError(), 0)
+    assert not policy.should_retry_exception('GET', ValueError(), 0)
+
+
+def test_async_executor_backs_off_without_blocking(sleeps):
+    executor = make_executor()
+    responses = [FakeResponse(503, {'Retry-After': '0'}), aiohttp.ServerDisconnectedError(), FakeResponse(200)]
+    first = responses[0]
+
+    async def send():
+        outcome = responses.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    url = f'http://{uuid.uuid4().hex}.example/service/rest/v1/components'
+    res = asyncio.run(executor.call('default', 'GET', url, send))
+    assert res.status == 200
+    assert first.released
+    assert len(sleeps) == 2
+    assert executor.get_stats()['classes']['default']['retries'] == 2
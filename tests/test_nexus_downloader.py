@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+
+import pytest
+
+from refs.nexus_downloader import RangeDownloader, PartJournal
+
+
+DATA = bytes(range(256)) * 4
+URL = 'http://nexus.example/repository/raw/file.bin'
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        for offset in range(0, len(self.body), chunk_size):
+            yield self.body[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakePool(object):
+    """按Range返回DATA的连接池，fail_at中的起始偏移第一次请求时抛出异常"""
+
+    def __init__(self, data=DATA, accept_ranges=True, fail_at=()):
+        self.data = data
+        self.accept_ranges = accept_ranges
+        self.fail_at = set(fail_at)
+        self.ranges = []
+        self.full_gets = 0
+
+    def request(self, method, url, account, headers=None, **kwargs):
+        if method == 'HEAD':
+            headers = {'Content-Length': str(len(self.data))}
+            if self.accept_ranges:
+                headers['Accept-Ranges'] = 'bytes'
+            return FakeResponse(200, headers=headers)
+        rng = (headers or {}).get('Range')
+        if rng and self.accept_ranges:
+            start, end = (int(v) for v in rng.split('=')[1].split('-'))
+            self.ranges.append((start, end))
+            if start in self.fail_at:
+                self.fail_at.discard(start)
+                raise IOError(f'connection reset at {start}')
+            return FakeResponse(206, self.data[start:end + 1])
+        self.full_gets += 1
+        return FakeResponse(200, self.data)
+
+
+def make_downloader(pool, chunk_size=100):
+    return RangeDownloader(pool, 'admin', chunk_size=chunk_size, max_parallel=1, min_parallel_size=0, block_size=16)
+
+
+def test_split_ranges_covers_size_exactly():
+    downloader = make_downloader(FakePool(), chunk_size=10)
+    assert downloader.split_ranges(25) == [(0, 9), (10, 19), (20, 24)]
+    assert downloader.split_ranges(20, start=5) == [(5, 14), (15, 19)]
+    assert downloader.split_ranges(0) == []
+
+
+def test_split_gaps_splits_each_gap_by_chunk_size():
+    downloader = make_downloader(FakePool(), chunk_size=10)
+    assert downloader._split_gaps([(5, 17), (30, 32)]) == [(5, 14), (15, 17), (30, 32)]
+
+
+def test_journal_missing_merges_overlapping_ranges(tmp_path):
+    journal = PartJournal(str(tmp_path / 'file.part.json'))
+    journal.reset(URL, 100, {})
+    journal.add(50, 59)
+    journal.add(0, 9)
+    journal.add(5, 19)
+    assert journal.missing() == [(20, 49), (60, 99)]
+
+
+def test_journal_roundtrip_and_matching(tmp_path):
+    path = str(tmp_path / 'file.part.json')
+    journal = PartJournal(path)
+    journal.reset(URL, 100, {'sha1': 'abc'})
+    journal.add(0, 49)
+
+    loaded = PartJournal(path)
+    assert loaded.load()
+    assert loaded.completed == [(0, 49)]
+    assert loaded.matches('http://mirror.example/file.bin', 100, {'sha1': 'abc'})
+    assert not loaded.matches(URL, 100, {'sha1': 'def'})
+    assert not loaded.matches(URL, 101, {'sha1': 'abc'})
+
+
+def test_corrupt_journal_is_ignored(tmp_path):
+    path = tmp_path / 'file.part.json'
+    path.write_text('{not json', encoding='utf-8')
+    assert PartJournal(str(path)).load() is False
+
+
+def test_interrupted_download_resumes_missing_ranges_only(tmp_path):
+    save_path = str(tmp_path / 'file.bin')
+    checksum = {'sha256': hashlib.sha256(DATA).hexdigest()}
+
+    pool = FakePool(fail_at={500})
+    assert make_downloader(pool).download(URL, save_path, checksum=checksum) is False
+    assert os.path.exists(save_path + '.part')
+    journal = PartJournal(save_path + '.part.json')
+    assert journal.load()
+    # 失败前已提交给线程池的下一个分块可能仍会完成，日志中只需要包含失败分块之前的区间
+    assert set(journal.completed) >= {(0, 99), (100, 199), (200, 299), (300, 399), (400, 499)}
+    assert (500, 599) not in journal.completed
+    expected = make_downloader(pool)._split_gaps(journal.missing())
+
+    pool = FakePool()
+    assert make_downloader(pool).download(URL, save_path, checksum=checksum) == save_path
+    assert sorted(pool.ranges) == expected
+    with open(save_path, 'rb') as f:
+        assert f.read() == DATA
+    assert not os.path.exists(save_path + '.part')
+    assert not os.path.exists(save_path + '.part.json')
+
+
+def test_journal_for_other_file_restarts_download(tmp_path):
+    save_path = str(tmp_path / 'file.bin')
+    assert make_downloader(FakePool(fail_at={300})).download(URL, save_path, checksum={'sha1': 'old'}) is False
+
+    pool = FakePool()
+    checksum = {'sha1': hashlib.sha1(DATA).hexdigest()}
+    assert make_downloader(pool).download(URL, save_path, checksum=checksum) == save_path
+    assert pool.ranges[0] == (0, 99)
+    with open(save_path, 'rb') as f:
+        assert f.read() == DATA
+
+
+def test_checksum_mismatch_discards_part_and_journal(tmp_path):
+    save_path = str(tmp_path / 'file.bin')
+    assert make_downloader(FakePool()).download(URL, save_path, checksum={'sha1': '0' * 40}) is False
+    assert not os.path.exists(save_path)
+    assert not os.path.exists(save_path + '.part')
+    assert not os.path.exists(save_path + '.part.json')
+
+
+def test_range_fallback_drops_stale_journal(tmp_path):
+    save_path = str(tmp_path / 'file.bin')
+    journal = PartJournal(save_path + '.part.json')
+    journal.reset(URL, len(DATA), {})
+    journal.add(0, 99)
+    with open(save_path + '.part', 'wb') as f:
+        f.write(b'\0' * len(DATA))
+
+    # HEAD声明支持Range，但分块请求返回200，退化为单流下载
+    pool = FakePool()
+    pool.request = _ranges_ignored(pool.request)
+    assert make_downloader(pool).download(URL, save_path) == save_path
+    with open(save_path, 'rb') as f:
+        assert f.read() == DATA
+    assert not os.path.exists(save_path + '.part.json')
+
+
+def _ranges_ignored(request):
+    def wrapper(method, url, account, headers=None, **kwargs):
+        if method == 'GET':
+            return FakeResponse(200, DATA)
+        return request(method, url, account, headers=headers, **kwargs)
+    return wrapper
+
+
+@pytest.mark.parametrize('accept_ranges', [True, False])
+def test_small_file_with_known_size_skips_probe(tmp_path, accept_ranges):
+    save_path = str(tmp_path / 'file.bin')
+    pool = FakePool(accept_ranges=accept_ranges)
+    downloader = RangeDownloader(pool, 'admin', chunk_size=100, max_parallel=1, min_parallel_size=10 * len(DATA))
+    assert downloader.download(URL, save_path, expected_size=len(DATA)) == save_path
+    assert pool.full_gets == 1 and pool.ranges == []
+
+
+def test_failed_range_fallback_removes_journal_and_part(tmp_path):
+    save_path = str(tmp_path / 'file.bin')
+    journal = PartJournal(save_path + '.part.json')
+    journal.reset(URL, len(DATA), {})
+    journal.add(0, 99)
+    with open(save_path + '.part', 'wb') as f:
+        f.write(b'\0' * len(DATA))
+
+    pool = FakePool()
+
+    def request(method, url, account, headers=None, **kwargs):
+        if method == 'GET':
+            # 分块请求被忽略（200），随后的单流下载失败
+            return FakeResponse(200, DATA) if headers and 'Range' in headers else FakeResponse(500)
+        return FakePool.request(pool, method, url, account, headers=headers, **kwargs)
+
+    pool.request = request
+    assert make_downloader(pool).download(URL, save_path) is False
+    assert not os.path.exists(save_path + '.part')
+    assert not os.path.exists(save_path + '.part.json')
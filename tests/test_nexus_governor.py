@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import threading
+
+from refs.nexus_governor import AdaptiveBudget, GovernorSlot, AsyncGovernorSlot
+
+
+def make_budget(**kwargs):
+    params = {'rate': 1000, 'burst': 1000, 'max_concurrency': 4, 'min_concurrency': 1,
+              'target_latency': 1.0, 'decrease_factor': 0.5}
+    params.update(kwargs)
+    return AdaptiveBudget('test', **params)
+
+
+def test_throttled_response_halves_concurrency_and_rate():
+    budget = make_budget()
+    with GovernorSlot(budget) as slot:
+        slot.mark(429)
+    stats = budget.get_stats()
+    assert stats['concurrency_limit'] == 2
+    assert stats['rate'] == 500
+    assert stats['throttled'] == 1 and stats['decreases'] == 1 and stats['in_flight'] == 0
+
+
+def test_decrease_happens_at_most_once_per_latency_window():
+    budget = make_budget(target_latency=60)
+    for _ in range(3):
+        budget.acquire()
+        budget.release(0.1, 429)
+    assert budget.get_stats()['decreases'] == 1
+
+
+def test_successes_grow_limit_back_to_max():
+    budget = make_budget(max_concurrency=4)
+    budget.limit = 1.0
+    for _ in range(50):
+        budget.acquire()
+        budget.release(0.01, 200)
+    assert budget.get_stats()['concurrency_limit'] == 4
+
+
+def test_concurrency_limit_blocks_other_threads():
+    budget = make_budget(max_concurrency=1)
+    budget.acquire()
+    acquired = threading.Event()
+
+    def other():
+        budget.acquire()
+        acquired.set()
+        budget.release(0.01)
+
+    thread = threading.Thread(target=other, daemon=True)
+    thread.start()
+    assert not acquired.wait(0.2)
+    budget.release(0.01)
+    assert acquired.wait(5)
+    thread.join(5)
+
+
+def test_nested_acquire_on_same_thread_does_not_deadlock():
+    budget = make_budget(max_concurrency=1)
+    done = threading.Event()
+
+    def nested():
+        with GovernorSlot(budget):
+            with GovernorSlot(budget):
+                done.set()
+
+    thread = threading.Thread(target=nested, daemon=True)
+    thread.start()
+    assert done.wait(5)
+    thread.join(5)
+    assert budget.get_stats()['in_flight'] == 0
+
+
+def test_token_bucket_limits_rate():
+    budget = make_budget(rate=20, burst=1, max_concurrency=10)
+    started = time.monotonic()
+    for _ in range(3):
+        budget.acquire()
+        budget.release(0.0)
+    assert time.monotonic() - started >= 0.09
+
+
+def test_try_acquire_reports_wait_when_full():
+    budget = make_budget(max_concurrency=1)
+    assert budget.try_acquire() == 0
+    assert budget.try_acquire() > 0
+    budget.release(0.01, threaded=False)
+    assert budget.try_acquire() == 0
+    budget.release(0.01, threaded=False)
+    assert budget.get_stats()['in_flight'] == 0
+
+
+def test_async_slots_respect_concurrency_limit():
+    budget = make_budget(max_concurrency=2)
+    peak = []
+
+    async def request():
+        async with AsyncGovernorSlot(budget) as slot:
+            peak.append(budget.in_flight)
+            await asyncio.sleep(0.01)
+            slot.mark(200)
+
+    async def main():
+        await asyncio.gather(*[request() for _ in range(10)])
+
+    asyncio.run(main())
+    assert max(peak) <= 2
+    assert budget.get_stats()['requests'] == 10
+    assert budget.in_flight == 0
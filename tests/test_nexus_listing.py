@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from refs.nexus_req import NexusReq, IncompleteListingError
+from refs.async_nexus_req import AsyncNexusReq
+
+
+PAGES = {
+    None: {'items': [{'id': 'c1'}, {'id': 'c2'}], 'continuationToken': 't1'},
+    't1': {'items': [{'id': 'c3'}], 'continuationToken': 't2'},
+    't2': {'items': [{'id': 'c4'}], 'continuationToken': None},
+}
+
+
+def make_nexus(pages):
+    """不执行__init__的NexusReq，列表接口按pages返回，缺失的页返回False"""
+    nexus = NexusReq.__new__(NexusReq)
+    nexus.list_components = lambda repository, token=None: pages.get(token, False)
+    return nexus
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_components_yields_all_pages(prefetch):
+    nexus = make_nexus(PAGES)
+    assert [c['id'] for c in nexus.iter_components('maven-releases', prefetch=prefetch)] == ['c1', 'c2', 'c3', 'c4']
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_failed_page_raises_incomplete_listing(prefetch):
+    pages = dict(PAGES)
+    del pages['t2']
+    nexus = make_nexus(pages)
+
+    seen = []
+    with pytest.raises(IncompleteListingError) as excinfo:
+        for component in nexus.iter_components('maven-releases', prefetch=prefetch):
+            seen.append(component['id'])
+
+    assert seen == ['c1', 'c2', 'c3']
+    assert excinfo.value.continuation_token == 't2'
+    assert excinfo.value.yielded == 3
+
+
+def test_failed_first_page_raises():
+    nexus = make_nexus({})
+    with pytest.raises(IncompleteListingError) as excinfo:
+        list(nexus.iter_components('maven-releases'))
+    assert excinfo.value.continuation_token is None
+    assert excinfo.value.yielded == 0
+
+
+def test_get_all_components_returns_false_on_incomplete_listing():
+    pages = dict(PAGES)
+    del pages['t1']
+    assert make_nexus(pages).get_all_components_in_repository('maven-releases') is False
+    assert len(make_nexus(PAGES).get_all_components_in_repository('maven-releases')) == 4
+
+
+def test_async_failed_page_raises_incomplete_listing():
+    pages = dict(PAGES)
+    del pages['t1']
+    nexus = AsyncNexusReq.__new__(AsyncNexusReq)
+
+    async def list_components(repository, token=None):
+        return pages.get(token, False)
+
+    nexus.list_components = list_components
+
+    async def collect():
+        seen = []
+        with pytest.raises(IncompleteListingError) as excinfo:
+            async for component in nexus.iter_components('maven-releases'):
+                seen.append(component['id'])
+        return seen, excinfo.value
+
+    seen, error = asyncio.run(collect())
+    assert seen == ['c1', 'c2']
+    assert error.continuation_token == 't1'
+    assert error.yielded == 2
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import io
+import mmap
+
+from refs.nexus_multipart import StreamingMultipartEncoder
+
+
+def body_of(encoder):
+    return b''.join(encoder)
+
+
+def test_len_matches_body_for_all_sized_sources(tmp_path):
+    path = tmp_path / 'lib-1.0.jar'
+    path.write_bytes(b'j' * 3000)
+    handle_path = tmp_path / 'lib-1.0.pom'
+    handle_path.write_bytes(b'<project/>')
+    buffer_path = tmp_path / 'buffer.bin'
+    buffer_path.write_bytes(b'm' * 4096)
+
+    with open(handle_path, 'rb') as handle, open(buffer_path, 'r+b') as f:
+        mapped = mmap.mmap(f.fileno(), 0)
+        try:
+            encoder = StreamingMultipartEncoder(
+                fields={'maven2.groupId': 'com.example', 'raw.directory': '/目录'},
+                files={'maven2.asset1': str(path),
+                       'maven2.asset2': handle,
+                       'raw.asset1': ('data.bin', b'\x00' * 777),
+                       'raw.asset2': ('mapped.bin', mapped, 'application/octet-stream')},
+                block_size=512)
+            assert encoder.len == len(body_of(encoder))
+        finally:
+            mapped.close()
+
+
+def test_body_is_regenerated_on_each_iteration(tmp_path):
+    path = tmp_path / 'file.txt'
+    path.write_bytes(b'hello world')
+    with open(path, 'rb') as handle:
+        encoder = StreamingMultipartEncoder(fields={'a': 1}, files={'f': handle, 'g': str(path)}, block_size=4)
+        first = body_of(encoder)
+        assert body_of(encoder) == first
+        assert encoder.len == len(first)
+
+
+def test_unknown_size_stream_has_no_length():
+    encoder = StreamingMultipartEncoder(files={'f': ('stream.bin', iter([b'abc', b'', b'def']))})
+    assert encoder.len is None
+    assert b'abcdef' in body_of(encoder)
+
+
+def test_stream_with_declared_size_has_length():
+    encoder = StreamingMultipartEncoder(files={'f': ('stream.bin', iter([b'abc', b'def']), None, 6)})
+    assert encoder.len == len(body_of(encoder))
+
+
+def test_body_structure_and_content_type():
+    encoder = StreamingMultipartEncoder(fields={'name': 'value'},
+                                        files={'file': ('a.txt', io.BytesIO(b'content'))},
+                                        boundary='BOUNDARY')
+    body = body_of(encoder)
+    assert encoder.content_type == 'multipart/form-data; boundary=BOUNDARY'
+    assert body.startswith(b'--BOUNDARY\r\nContent-Disposition: form-data; name="name"\r\n\r\nvalue\r\n')
+    assert b'name="file"; filename="a.txt"\r\nContent-Type: text/plain\r\n\r\ncontent\r\n' in body
+    assert body.endswith(b'--BOUNDARY--\r\n')
+
+
+def test_progress_callback_reports_total():
+    calls = []
+    encoder = StreamingMultipartEncoder(files={'f': ('a.bin', b'x' * 10)}, block_size=3,
+                                        progress_callback=lambda sent, total: calls.append((sent, total)))
+    body = body_of(encoder)
+    assert calls[-1] == (len(body), len(body))
+    assert [sent for sent, _ in calls] == sorted(sent for sent, _ in calls)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import os
+import queue
+import threading
+
+from refs.nexus_journal import JobJournal
+from refs.nexus_promote import Promoter, _DONE
+
+
+COMPONENT = {'id': 'c1', 'group': 'com.example', 'name': 'lib', 'version': '1.0',
+             'assets': [{'path': 'com/example/lib/1.0/lib-1.0.jar', 'fileSize': 10}]}
+
+
+class FakeMover(object):
+    def __init__(self):
+        self.moved = []
+
+    def _staging_move(self, component, target_repo):
+        self.moved.append((component['id'], target_repo))
+        return True
+
+    def copy(self, component, target_repo):
+        return True
+
+    def _copyable_assets(self, component):
+        return component['assets']
+
+
+class FakeNexus(object):
+    def __init__(self, search=None):
+        self.mover = FakeMover()
+        self.search = search
+        self.deleted = []
+
+    def search_components(self, **query):
+        if self.search:
+            return self.search(**query)
+        return {'items': [dict(COMPONENT, group=query['group'], name=query['name'], version=query['version'],
+                               id=f"{query['name']}-{query['version']}")]}
+
+    def delete_component(self, component_id):
+        self.deleted.append(component_id)
+        return True
+
+
+def coordinates(count):
+    return [{'group': 'com.example', 'name': f'lib{i}', 'version': '1.0'} for i in range(count)]
+
+
+def make_promoter(nexus, tmp_path, **kwargs):
+    workers = {'resolve': 2, 'transfer': 2, 'verify': 1, 'delete': 1}
+    return Promoter(nexus, 'staging', 'releases', verify=False, journal_path=str(tmp_path / 'promote.jsonl'),
+                    workers=workers, **kwargs)
+
+
+def run_with_timeout(promoter, items, timeout=10):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(promoter.run(coordinates=items)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'Promoter.run did not return'
+    return result
+
+
+def test_promotes_all_components(tmp_path):
+    nexus = FakeNexus()
+    summary = run_with_timeout(make_promoter(nexus, tmp_path), coordinates(20))
+    assert summary['total'] == 20 and summary['promoted'] == 20 and summary['failed'] == 0
+    assert len(nexus.mover.moved) == 20
+    # 已通过staging移动的组件不再从源仓库删除
+    assert nexus.deleted == []
+
+
+def test_copy_deletes_nothing_and_resume_skips_done(tmp_path):
+    nexus = FakeNexus()
+    items = coordinates(5)
+    assert run_with_timeout(make_promoter(nexus, tmp_path, copy=True), items)['promoted'] == 5
+    summary = run_with_timeout(make_promoter(nexus, tmp_path, copy=True), items)
+    assert summary['skipped'] == 5 and summary['promoted'] == 0
+
+
+def test_run_returns_when_every_stage_fails(tmp_path):
+    def search(**query):
+        raise RuntimeError('search exploded')
+
+    summary = run_with_timeout(make_promoter(FakeNexus(search=search), tmp_path), coordinates(50))
+    assert summary['failed'] == 50
+    assert {failure['stage'] for failure in summary['failures']} == {'resolve'}
+
+
+def test_run_returns_when_journal_writes_fail(tmp_path, monkeypatch):
+    def record(self, key, stage, **fields):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(JobJournal, 'record', record)
+    summary = run_with_timeout(make_promoter(FakeNexus(), tmp_path), coordinates(30))
+    assert summary['total'] == 30
+    assert summary['failed'] == 30
+
+
+def test_stage_workers_hand_over_done_exactly_once(tmp_path):
+    promoter = make_promoter(FakeNexus(), tmp_path)
+    promoter._summary = {'failed': 0, 'failures': []}
+    promoter.journal = JobJournal(str(tmp_path / 'stage.jsonl'), 'promote')
+
+    class BrokenQueue(queue.Queue):
+        """只接受_DONE的下游队列，模拟向下游交接条目时出错"""
+
+        def put(self, item, *args, **kwargs):
+            if item is not _DONE:
+                raise RuntimeError('queue broken')
+            super().put(item, *args, **kwargs)
+
+    def handler(item):
+        if item['n'] % 2:
+            raise ValueError('bad item')
+        return [item]
+
+    in_q, out_q = queue.Queue(), BrokenQueue()
+    remaining = {'transfer': 3}
+    threads = [threading.Thread(target=promoter._stage_worker,
+                                args=('transfer', handler, in_q, out_q, remaining), daemon=True)
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for n in range(10):
+        in_q.put({'key': f'k{n}', 'n': n})
+    in_q.put(_DONE)
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+    assert remaining['transfer'] == 0
+    assert out_q.qsize() == 1 and out_q.get() is _DONE
+    assert promoter._summary['failed'] == 5
+    promoter.journal.close()
+
+
+def test_default_journal_path_depends_on_input(tmp_path, monkeypatch):
+    promoter = make_promoter(FakeNexus(), tmp_path)
+    monkeypatch.setattr(promoter, 'journal_dir', str(tmp_path))
+    first = promoter._default_journal_path({'coordinates': coordinates(1)})
+    assert first == promoter._default_journal_path({'coordinates': coordinates(1)})
+    assert first != promoter._default_journal_path({'coordinates': coordinates(2)})
+    assert os.path.dirname(first) == str(tmp_path)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from refs.nexus_retention import version_key, RetentionPolicy, component_summary
+
+
+@pytest.mark.parametrize('older, newer', [
+    ('1.9', '1.10'),
+    ('1.0-rc1', '1.0'),
+    ('1.0-alpha', '1.0-beta'),
+    ('1.0-beta2', '1.0-rc1'),
+    ('1.0-M1', '1.0-RC1'),
+    ('1.0-rc1', '1.0-rc2'),
+    ('1.0-SNAPSHOT', '1.0'),
+    ('1.0', '1.0-sp1'),
+    ('1.0', '1.0.1'),
+    ('1.2.3', '2.0.0-alpha'),
+    ('2023.9.30', '2023.10.1'),
+    ('1.0.0-alpha.1', '1.0.0-alpha.2'),
+    ('1.0.0-rc.1', '1.0.0'),
+])
+def test_version_ordering(older, newer):
+    assert version_key(older) < version_key(newer)
+
+
+@pytest.mark.parametrize('left, right', [
+    ('1.0', '1.0.0'),
+    ('1.0', '1.0-GA'),
+    ('1.0.Final', '1.0'),
+    ('1.0-RELEASE', '1.0.0'),
+    ('1.0.0+build.1', '1.0.0+build.2'),
+    ('1.0-RC1', '1.0-rc1'),
+])
+def test_equivalent_versions(left, right):
+    assert version_key(left) == version_key(right)
+
+
+def test_sorting_mixed_versions():
+    versions = ['1.10', '1.0-rc1', '1.9', '1.0', '1.0-SNAPSHOT', '2.0-beta', '1.0.1']
+    assert sorted(versions, key=version_key) == ['1.0-rc1', '1.0-SNAPSHOT', '1.0', '1.0.1', '1.9', '1.10',
+                                                 '2.0-beta']
+
+
+def test_missing_version_sorts_first():
+    assert version_key(None) < version_key('0.1')
+    assert version_key('') == version_key(None)
+
+
+def summaries(*specs):
+    now = datetime.now(timezone.utc)
+    return [{'id': version, 'version': version, 'last_modified': (now - timedelta(days=days)).isoformat()}
+            for version, days in specs]
+
+
+def test_keep_latest_uses_version_order():
+    versions = summaries(('1.9', 1), ('1.10', 2), ('1.0-rc1', 3), ('1.0', 4))
+    deletions = RetentionPolicy(keep_latest=2).select_deletions(versions)
+    assert [v['version'] for v in deletions] == ['1.0', '1.0-rc1']
+
+
+def test_conditions_are_combined_as_keep_any():
+    versions = summaries(('1.0', 100), ('1.1', 100), ('1.2', 1), ('1.3-keep', 100), ('2.0', 100))
+    policy = RetentionPolicy(keep_latest=1, keep_days=30, keep_pattern=r'-keep$')
+    assert [v['version'] for v in policy.select_deletions(versions)] == ['1.1', '1.0']
+
+
+def test_empty_policy_deletes_nothing():
+    assert RetentionPolicy().select_deletions(summaries(('1.0', 100))) == []
+
+
+def test_unknown_timestamp_is_kept_by_age_rule():
+    versions = [{'id': 'c1', 'version': '1.0', 'last_modified': None}]
+    assert RetentionPolicy(keep_days=1).select_deletions(versions) == []
+
+
+def test_component_summary_uses_newest_asset():
+    summary = component_summary({
+        'id': 'c1', 'repository': 'maven-releases', 'group': 'g', 'name': 'n', 'version': '1.0',
+        'assets': [{'fileSize': 10, 'lastModified': '2024-01-01T00:00:00.000+00:00'},
+                   {'fileSize': 5, 'lastModified': '2024-03-01T00:00:00Z'}]})
+    assert summary['size'] == 15
+    assert summary['last_modified'].startswith('2024-03-01')
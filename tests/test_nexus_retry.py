@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+import uuid
+import email.utils
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from refs import nexus_retry
+from refs.nexus_retry import (RetryPolicy, RetryExecutor, CircuitBreaker, CircuitOpenError,
+                              parse_retry_after, load_retry_policies)
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(nexus_retry.time, 'sleep', slept.append)
+    return slept
+
+
+def unique_url():
+    """每个用例使用独立主机，避免进程级共享的熔断器互相影响"""
+    return f'http://{uuid.uuid4().hex}.example/service/rest/v1/components'
+
+
+def make_executor(threshold=5, reset_timeout=30, **policy):
+    params = {'max_retries': 3, 'backoff_base': 0.01, 'backoff_max': 0.05, 'max_retry_after': 120,
+              'retry_statuses': [429, 502, 503, 504], 'retry_non_idempotent': False}
+    params.update(policy)
+    executor = RetryExecutor({'default': params})
+    executor.breaker_failure_threshold = threshold
+    executor.breaker_reset_timeout = reset_timeout
+    return executor
+
+
+def sender(*outcomes):
+    """依次返回状态码或抛出异常的send函数"""
+    outcomes = list(outcomes)
+    calls = []
+
+    def send():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome if isinstance(outcome, FakeResponse) else FakeResponse(outcome)
+
+    send.calls = calls
+    return send
+
+
+def test_status_retry_depends_on_method_and_attempt():
+    policy = RetryPolicy(max_retries=2, retry_statuses=[429, 503])
+    assert policy.should_retry_status('GET', 503, 0)
+    assert policy.should_retry_status('DELETE', 503, 1)
+    assert not policy.should_retry_status('GET', 503, 2)
+    assert not policy.should_retry_status('GET', 500, 0)
+    assert not policy.should_retry_status('POST', 503, 0)
+    assert policy.should_retry_status('POST', 429, 0)
+    assert RetryPolicy(retry_statuses=[503], retry_non_idempotent=True).should_retry_status('POST', 503, 0)
+
+
+def test_exception_retry_only_for_transient_errors():
+    policy = RetryPolicy(max_retries=1)
+    assert policy.should_retry_exception('GET', requests.exceptions.ConnectionError(), 0)
+    assert policy.should_retry_exception('GET', requests.exceptions.ReadTimeout(), 0)
+    assert not policy.should_retry_exception('GET', requests.exceptions.ConnectionError(), 1)
+    assert not policy.should_retry_exception('GET', ValueError(), 0)
+    # 非幂等请求只有在连接尚未建立时才能安全重试
+    assert not policy.should_retry_exception('POST', requests.exceptions.ReadTimeout(), 0)
+    assert policy.should_retry_exception('POST', requests.exceptions.ConnectTimeout(), 0)
+
+
+def test_backoff_is_bounded_and_honours_retry_after():
+    policy = RetryPolicy(backoff_base=1, backoff_max=4)
+    for attempt in range(6):
+        assert 0 <= policy.backoff(attempt) <= min(4, 2 ** attempt)
+    assert policy.backoff(0, retry_after=7) == 7
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('5') == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = email.utils.format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(later) <= 60
+    earlier = email.utils.format_datetime(datetime.now(timezone.utc) - timedelta(seconds=60), usegmt=True)
+    assert parse_retry_after(earlier) == 0.0
+
+
+def test_call_class_policies_inherit_default():
+    policies = load_retry_policies({'default': {'max_retries': 7, 'retry_statuses': [503]},
+                                    'upload': {'max_retries': 1}})
+    assert policies['default'].max_retries == 7
+    assert policies['upload'].max_retries == 1
+    assert policies['search'].retry_statuses == {503}
+
+
+def test_executor_retries_until_success(sleeps):
+    executor = make_executor()
+    first = FakeResponse(503, {'Retry-After': '0'})
+    send = sender(first, requests.exceptions.ConnectionError(), 200)
+    res = executor.call('default', 'GET', unique_url(), send)
+
+    assert res.status_code == 200
+    assert first.closed
+    assert len(send.calls) == 3 and len(sleeps) == 2
+    assert executor.get_stats()['classes']['default'] == {'calls': 1, 'retries': 2, 'giveups': 0,
+                                                          'short_circuited': 0}
+
+
+def test_executor_gives_up_after_max_retries(sleeps):
+    executor = make_executor(max_retries=2)
+    res = executor.call('default', 'GET', unique_url(), sender(503, 503, 503))
+    assert res.status_code == 503
+    assert len(sleeps) == 2
+    assert executor.get_stats()['classes']['default']['giveups'] == 1
+
+
+def test_executor_returns_response_when_retry_after_too_long(sleeps):
+    executor = make_executor(max_retry_after=10)
+    res = executor.call('default', 'GET', unique_url(), sender(FakeResponse(429, {'Retry-After': '3600'})))
+    assert res.status_code == 429
+    assert sleeps == []
+
+
+def test_executor_reraises_non_retryable_exception(sleeps):
+    executor = make_executor()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        executor.call('upload', 'POST', unique_url(), sender(requests.exceptions.ReadTimeout()))
+    assert sleeps == []
+
+
+def test_breaker_opens_and_short_circuits(sleeps):
+    executor = make_executor(threshold=2, max_retries=0)
+    url = unique_url()
+    for _ in range(2):
+        assert executor.call('default', 'GET', url, sender(500)).status_code == 500
+
+    send = sender(200)
+    with pytest.raises(CircuitOpenError):
+        executor.call('default', 'GET', url, send)
+    assert send.calls == []
+    assert executor.get_stats()['classes']['default']['short_circuited'] == 1
+
+
+def test_breaker_half_open_allows_single_probe():
+    breaker = CircuitBreaker('nexus.example', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker('nexus.example', failure_threshold=3, reset_timeout=0)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN